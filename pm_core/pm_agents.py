@@ -6,11 +6,14 @@ executing their tasks, and collecting their work output.
 """
 
 import json
+import os
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field, asdict
 
 try:
     import anthropic
@@ -22,9 +25,160 @@ from .pm_config import (
     PM_AGENTS_DIR,
     AGENTS_DIR,
     AGENT as AGENT_CONFIG,
-    get_api_key
+    ORCHESTRATOR as ORCH_CONFIG,
+    RATE_LIMIT,
+    BATCH,
+    get_api_key,
+    get_run_date
 )
-from .pm_tools import TOOL_DEFINITIONS, ToolExecutor
+from .pm_tools import TOOL_NAMES, ToolExecutor, ToolScheduler, get_tool_definitions
+from .pm_compaction import compact_messages
+from .pm_batch import BatchRunner
+from .pm_checkpoint import AgentCheckpoint, RunCheckpoint
+from .pm_deadline import Deadline, DeadlineExceeded
+from .pm_spool import open_spool
+from .pm_scheduler import AgentEstimate, TokenBudgetScheduler, preflight_tokens, request_budget, token_budget
+from .pm_replay import ReplayMiss, get_response_cache
+from .pm_prompts import get_prompt_cache
+from .pm_router import RouteSignals, get_model_router
+from .pm_usage import (
+    CallUsage,
+    calls_by_model,
+    fallback_summary,
+    format_cost,
+    format_tokens,
+    min_cacheable_tokens,
+    sum_usage,
+    usage_from_response
+)
+from .pm_ratelimit import (
+    THROTTLE_STATUS_CODES,
+    backoff_delay,
+    estimate_tokens,
+    get_concurrency_controller,
+    get_rate_limiter,
+    parse_retry_after
+)
+
+
+# System prompt shared by every agent. Kept byte-identical across agents
+# (no names, dates or backlog) so it can be served from the prompt cache.
+SHARED_SYSTEM_PROMPT = """You are an autonomous PM agent for Smart Agent (real estate AI platform).
+
+## Available Tools
+
+- read_file: Read any project file
+- read_files: Read several files (or a glob) in one call
+- edit_file: Edit files (string replacement)
+- multi_edit: Many replacements across files in one call
+- write_file: Create new files
+- run_command: Run npm/git commands
+- git_commit: Commit changes
+- run_tests: Run test suite
+- run_lint: Run linter
+- search_codebase: Find code patterns
+- read_output: Page/grep long command output by handle
+- log_work: Log accomplishments
+- create_handoff: Hand off to other PMs
+
+## Rules
+
+1. Pick ONE task from your backlog
+2. Read relevant files first
+3. Make small changes
+4. Run lint after edits
+5. Commit with clear message
+6. Log what you did
+
+Never modify: .env, secrets, node_modules, pm_core/
+"""
+
+
+# First-turn task selection, run for every agent in one batch (see plan_day)
+PLAN_PROMPT = """Pick the ONE task from your backlog you will work on today.
+
+Reply with its ID and title, then a plan of at most 3 steps naming the files to read first and what to change. No preamble."""
+
+# Condenses long work summaries for the daily report
+SUMMARY_PROMPT = """Summarize this PM agent's work log for a daily report in at most 3 short bullets: what was done, what changed, anything blocked. No preamble.
+
+Work log:
+
+{work_summary}"""
+
+# Work summaries shorter than this go into the report as they are
+SUMMARY_MIN_CHARS = 600
+
+
+def _with_message_cache_breakpoint(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy messages with a cache breakpoint on the last content block.
+    
+    This caches the whole conversation so far, so the next iteration only
+    pays full price for the newest turn. The stored history is left
+    untouched so breakpoints don't pile up past the API's limit of four.
+    """
+    if not messages:
+        return messages
+    
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    if not content:
+        return messages
+    
+    content = list(content)
+    content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+    return messages[:-1] + [{**last, "content": content}]
+
+
+def _total_input_tokens(usage) -> int:
+    """All input tokens of a call: uncached, cache writes and cache reads."""
+    return (
+        usage.input_tokens
+        + (getattr(usage, "cache_creation_input_tokens", None) or 0)
+        + (getattr(usage, "cache_read_input_tokens", None) or 0)
+    )
+
+
+def _run_usage(results: List["AgentResult"]) -> Dict[str, Any]:
+    """Usage totals across every agent in a run."""
+    return sum_usage(call for r in results for call in r.calls)
+
+
+def _run_cache_hit_rate(results: List["AgentResult"]) -> float:
+    """Share of input tokens served from the prompt cache across a run."""
+    read = sum(r.cache_read_tokens for r in results)
+    total = sum(r.input_tokens + r.cache_read_tokens + r.cache_write_tokens for r in results)
+    return read / total if total else 0.0
+
+
+# Serializes console output when agents run in parallel threads
+_PRINT_LOCK = threading.Lock()
+
+
+def _print_locked(text: str):
+    """Print a block of text without interleaving with other agent threads."""
+    with _PRINT_LOCK:
+        print(text, flush=True)
+
+
+# One client (and so one connection pool) per API key and endpoint
+_CLIENTS: Dict[Tuple[str, Optional[str]], Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_api_client(api_key: str):
+    """Shared Messages API client, so agents reuse warm connections.
+    
+    Retries are disabled: _call_api handles them so that throttling feeds
+    the shared limiter and AIMD controller.
+    """
+    key = (api_key, os.environ.get("ANTHROPIC_BASE_URL"))
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            _CLIENTS[key] = anthropic.Anthropic(api_key=api_key, max_retries=0)
+        return _CLIENTS[key]
 
 
 @dataclass
@@ -39,6 +193,54 @@ class AgentResult:
     errors: List[str]
     duration_seconds: float
     work_log: List[Dict[str, Any]]
+    
+    # Input token usage across all API calls, split by prompt-cache status
+    input_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    
+    # Per-iteration usage records and their totals
+    output_tokens: int = 0
+    api_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    cost_usd: float = 0.0
+    calls: List[CallUsage] = field(default_factory=list)
+    
+    # Condensed work summary for the report (batch mode)
+    report_summary: Optional[str] = None
+    
+    # Stopped by its time budget (partial results), or never started
+    # because the run was nearly out of time
+    timed_out: bool = False
+    skipped: bool = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentResult":
+        """Rebuild a result saved with to_dict (e.g. from a run checkpoint)."""
+        data = dict(data)
+        data["calls"] = [CallUsage(**call) for call in data.get("calls", [])]
+        return cls(**data)
+    
+    def add_calls(self, calls: List[CallUsage]):
+        """Attach usage from calls made outside the agent run and update totals."""
+        self.calls.extend(calls)
+        totals = sum_usage(self.calls)
+        self.input_tokens = totals["input_tokens"]
+        self.cache_read_tokens = totals["cache_read_tokens"]
+        self.cache_write_tokens = totals["cache_write_tokens"]
+        self.output_tokens = totals["output_tokens"]
+        self.api_seconds = totals["api_seconds"]
+        self.tool_seconds = totals["tool_seconds"]
+        self.cost_usd = totals["cost_usd"]
+    
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of input tokens served from the prompt cache."""
+        total = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        return self.cache_read_tokens / total if total else 0.0
 
 
 class PMAgent:
@@ -47,140 +249,342 @@ class PMAgent:
     def __init__(self, agent_name: str):
         self.agent_name = agent_name
         self.agent_dir = AGENTS_DIR / agent_name
-        self.agent_definition = None
-        self.vision = None
-        self.backlog = None
-        self.tool_executor = ToolExecutor(agent_name)
-        
-        # Load agent files
-        self._load_agent_files()
-    
-    def _load_agent_files(self):
-        """Load the agent's definition, vision, and backlog."""
-        agent_file = self.agent_dir / "AGENT.md"
-        vision_file = self.agent_dir / "VISION.md"
-        backlog_file = self.agent_dir / "BACKLOG.md"
-        
-        if agent_file.exists():
-            with open(agent_file) as f:
-                self.agent_definition = f.read()
-        
-        if vision_file.exists():
-            with open(vision_file) as f:
-                self.vision = f.read()
-        
-        if backlog_file.exists():
-            with open(backlog_file) as f:
-                self.backlog = f.read()
-    
-    def _extract_identity_summary(self) -> str:
-        """Extract a brief identity summary from AGENT.md."""
-        if not self.agent_definition:
-            return "You are a PM agent."
-        
-        # Extract just the key sections (Identity, Capability Ownership, File Ownership)
-        lines = self.agent_definition.split('\n')
-        summary_parts = []
-        in_section = False
-        section_count = 0
-        
-        for line in lines:
-            # Capture Identity section and first few key sections
-            if line.startswith('## 1. Identity') or line.startswith('## 2. Capability') or line.startswith('## 14. File'):
-                in_section = True
-                section_count += 1
-            elif line.startswith('## ') and in_section:
-                in_section = False
-                if section_count >= 3:
-                    break
-            
-            if in_section:
-                summary_parts.append(line)
+        self.last_response_replayed = False
+        self.last_call_timed_out = False
+        self.last_fallback_from = ""
         
-        return '\n'.join(summary_parts[:50])  # Limit to 50 lines
-    
-    def _extract_backlog_tasks(self) -> str:
-        """Extract just the ready tasks from backlog."""
-        if not self.backlog:
-            return "No tasks in backlog."
+        # (instructions, system prompt, user prompt) built by prewarm()
+        self._prepared: Optional[Tuple[Optional[str], List[Dict[str, Any]], str]] = None
+        
+        # Parsed AGENT.md / VISION.md / BACKLOG.md, shared and reused until they change
+        self.prompt_cache = get_prompt_cache()
+        self.prompt_artifact = self.prompt_cache.get(agent_name)
         
-        # Find the "Ready" section and extract tasks
-        lines = self.backlog.split('\n')
-        ready_section = []
-        in_ready = False
+        self.allowed_tools = self._resolve_allowed_tools()
+        self.tool_definitions = self._request_tools()
+        self.tool_executor = ToolExecutor(agent_name, self.allowed_tools)
+    
+    def _resolve_allowed_tools(self) -> Optional[List[str]]:
+        """Tools this agent may use (AGENT.md, then config), or None for all.
         
-        for line in lines:
-            if '## Ready' in line or '### ' in line and 'Ready' in line:
-                in_ready = True
+        A list naming no known tool (e.g. a typo) is ignored, so the agent
+        never ends up with no tools at all.
+        """
+        for source, declared in (
+            ("AGENT.md", self.prompt_artifact.declared_tools),
+            ("AGENT.agent_tools", AGENT_CONFIG.agent_tools.get(self.agent_name)),
+        ):
+            if declared is None:
                 continue
-            if in_ready and line.startswith('## ') and 'Ready' not in line:
-                break
-            if in_ready and line.strip():
-                ready_section.append(line)
+            
+            known = [name for name in TOOL_NAMES if name in declared]
+            if not known:
+                _print_locked(f"   ⚠️  [{self.agent_name}] {source} names no known tools ({', '.join(declared)}); ignoring it")
+                continue
+            unknown = [name for name in declared if name not in TOOL_NAMES]
+            if unknown:
+                _print_locked(f"   ⚠️  [{self.agent_name}] Ignoring unknown tools in {source}: {', '.join(unknown)}")
+            return known
+        return None
+    
+    def _request_tools(self) -> List[Dict[str, Any]]:
+        """Tool definitions sent with this agent's requests.
         
-        return '\n'.join(ready_section[:30])  # Limit to 30 lines
+        An agent with a tool subset is sent only those tools, in
+        TOOL_DEFINITIONS order, so agents with the same subset share a
+        cached prefix. If that prefix (tools + shared system prompt) would be
+        too short to cache, the agent gets the full list instead, which every
+        agent without a subset shares; ToolExecutor still refuses the rest.
+        """
+        full = get_tool_definitions()
+        if self.allowed_tools is None or not AGENT_CONFIG.tool_subsets_in_requests:
+            return full
+        subset = get_tool_definitions(self.allowed_tools)
+        if AGENT_CONFIG.prompt_caching:
+            models = [AGENT_CONFIG.model]
+            if AGENT_CONFIG.model_routing:
+                models.append(AGENT_CONFIG.strong_model)
+            minimum = max(min_cacheable_tokens(model) for model in models)
+            if estimate_tokens(subset, SHARED_SYSTEM_PROMPT) < minimum <= estimate_tokens(full, SHARED_SYSTEM_PROMPT):
+                return full
+        return subset
     
-    def _build_system_prompt(self) -> str:
-        """Build a concise system prompt for this agent."""
-        identity = self._extract_identity_summary()
-        tasks = self._extract_backlog_tasks()
+    def _build_system_prompt(self) -> List[Dict[str, Any]]:
+        """Build the system prompt as content blocks.
         
-        return f"""You are {self.agent_name}, an autonomous PM agent for Smart Agent (real estate AI platform).
-
-{identity}
-
-## Today's Tasks (pick ONE)
-
-{tasks}
-
-## Available Tools
-
-- read_file: Read any project file
-- edit_file: Edit files (string replacement)
-- write_file: Create new files
-- run_command: Run npm/git commands
-- git_commit: Commit changes
-- run_tests: Run test suite
-- run_lint: Run linter
-- search_codebase: Find code patterns
-- log_work: Log accomplishments
-- create_handoff: Hand off to other PMs
-
-## Rules
-
-1. Pick ONE task from your backlog
-2. Read relevant files first
-3. Make small changes
-4. Run lint after edits
-5. Commit with clear message
-6. Log what you did
-
-Never modify: .env, secrets, node_modules, pm_core/
-
-Today: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-
-Start by picking a task and reading the relevant files.
-"""
+        The first block is identical for every agent (rules, tools, project)
+        and carries the prompt-cache breakpoint, so tools + shared prompt are
+        cached once per tools list (see _request_tools) and reused across
+        iterations and agents. Per-agent identity, allowed tools, backlog and the date
+        come after it, rendered from the agent's prompt artifact (see
+        pm_prompts.py).
+        """
+        shared_block = {"type": "text", "text": SHARED_SYSTEM_PROMPT}
+        if AGENT_CONFIG.prompt_caching:
+            shared_block["cache_control"] = {"type": "ephemeral"}
+        
+        agent_prompt = self.prompt_cache.agent_prompt(self.prompt_artifact, self.allowed_tools, get_run_date())
+        return [shared_block, {"type": "text", "text": agent_prompt}]
     
     def _build_user_prompt(self, orchestrator_instructions: str = None) -> str:
         """Build a concise user prompt for today's work."""
         instructions = orchestrator_instructions or "Execute your highest priority task."
+        skip_note = ""
+        # Only needed when the request lists tools the agent may not use
+        if self.allowed_tools is not None and len(self.tool_definitions) > len(self.allowed_tools):
+            skip_note = "Skip any step whose tool is not in your tool list.\n\n"
         
         return f"""Instructions: {instructions}
 
 Your task:
 1. Pick ONE task from the backlog shown above
 2. Read the relevant files (use read_file tool)
-3. Make the changes (use edit_file or write_file)
+3. Make the changes (use edit_file or write_file; multi_edit for the same change in many places)
 4. Run lint (use run_lint tool)
 5. Commit (use git_commit tool)
 6. Log your work (use log_work tool)
 
-Begin now - start by reading a file related to your chosen task.
+{skip_note}Begin now - start by reading a file related to your chosen task.
 """
     
-    def run(self, instructions: str = None) -> AgentResult:
-        """Run the agent and return results."""
+    def prewarm(self, instructions: Optional[str] = None) -> int:
+        """Do the work that precedes the first request ahead of time.
+        
+        Builds the prompts run() will send, reads files the backlog
+        mentions into the shared file cache and opens a connection on the
+        shared client, so run() can send its first request immediately.
+        Returns the number of files read ahead.
+        """
+        self._prepared = (instructions, self._build_system_prompt(), self._build_user_prompt(instructions))
+        warmed = self.tool_executor.prewarm_files(
+            self.prompt_artifact.mentioned_files[:ORCH_CONFIG.prewarm_max_files]
+        )
+        
+        api_key = get_api_key()
+        if anthropic is not None and api_key:
+            try:
+                get_api_client(api_key).models.list(limit=1)
+            except Exception:
+                pass  # the first real request will connect (and report errors)
+        return warmed
+    
+    def _stream_message(
+        self,
+        client,
+        request: Dict[str, Any],
+        on_tool_use: Callable[[Any], None],
+        deadline: Deadline
+    ):
+        """Stream a response, handing each tool_use block off as soon as it completes.
+        
+        The stream is abandoned with DeadlineExceeded at the first event
+        after the deadline passes; a stream that stalls is ended by the
+        request timeout, which is the time left when it starts.
+        
+        Returns (message, response headers) once the stream has finished.
+        """
+        remaining = deadline.remaining()
+        options = {"timeout": remaining} if remaining is not None else {}
+        with client.messages.stream(**request, **options) as stream:
+            for event in stream:
+                if deadline.expired:
+                    raise DeadlineExceeded("stream cancelled at deadline")
+                if event.type == "content_block_stop":
+                    block = stream.current_message_snapshot.content[event.index]
+                    if block.type == "tool_use":
+                        on_tool_use(block)
+            return stream.get_final_message(), stream.response.headers
+    
+    def _call_api(
+        self,
+        client,
+        system_prompt: List[Dict[str, Any]],
+        messages: List[Dict[str, Any]],
+        errors: List[str],
+        on_tool_use: Optional[Callable[[Any], None]] = None,
+        model: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ):
+        """Call the Messages API, retrying when throttled.
+        
+        Each attempt waits for the shared per-minute budget and an in-flight
+        slot from the AIMD controller. Throttles (429/529) shrink the window
+        and pause the shared limiter for the server's retry-after; retries
+        sleep for that retry-after plus jitter. With AGENT.throttle_fallback,
+        a call to a throttled model goes to the other model straight away
+        instead; self.last_fallback_from then names the model it was meant
+        for.
+        
+        If on_tool_use is given the response is streamed and each tool_use
+        block is passed to it as soon as its input is complete. A stream that
+        fails after tools were dispatched is not retried, since those tools
+        may already have changed the working tree.
+        
+        Responses are served from / stored to the record/replay cache when
+        it is enabled; self.last_response_replayed tells the caller which.
+        self.last_api_seconds is the latency of the call that succeeded,
+        excluding rate-limit waits and failed attempts.
+        
+        With a deadline, waits for the limiter or a slot, the request itself
+        and retry sleeps all end when it passes; the call then gives up and
+        sets self.last_call_timed_out. The limiter and slot waits give up
+        early, as soon as the wait would outlast the deadline.
+        
+        Returns the response, or None after recording the failure in errors.
+        """
+        self.last_response_replayed = False
+        self.last_api_seconds = 0.0
+        self.last_call_timed_out = False
+        self.last_fallback_from = ""
+        deadline = deadline or Deadline()
+        dispatched = []
+        
+        def dispatch(block):
+            dispatched.append(block.id)
+            on_tool_use(block)
+        
+        rate_limiter = get_rate_limiter()
+        controller = get_concurrency_controller()
+        router = get_model_router()
+        max_retries = RATE_LIMIT.max_retries
+        
+        request_messages = messages
+        if AGENT_CONFIG.prompt_caching:
+            request_messages = _with_message_cache_breakpoint(messages)
+        
+        request = dict(
+            model=model or AGENT_CONFIG.model,
+            max_tokens=AGENT_CONFIG.max_tokens,
+            system=system_prompt,
+            tools=self.tool_definitions,
+            messages=request_messages
+        )
+        
+        # Identical request seen before: serve the recorded response. The key
+        # is the request as the agent issued it, even if a fallback model
+        # ends up serving it, so a replay of the same call finds it.
+        response_cache = get_response_cache()
+        replay_request = dict(request)
+        try:
+            cached = response_cache.get(replay_request)
+        except ReplayMiss as e:
+            errors.append(f"Replay error: {str(e)}")
+            return None
+        if cached is not None:
+            self.last_response_replayed = True
+            return anthropic.types.Message.model_validate(cached)
+        
+        # Another model has its own limits; use it instead of waiting
+        fallback = router.fallback_for(request["model"]) if router.is_throttled(request["model"]) else None
+        if fallback:
+            _print_locked(f"   🔀 [{self.agent_name}] {request['model']} throttled, using {fallback}")
+            self.last_fallback_from = request["model"]
+            request["model"] = fallback
+        
+        for attempt in range(max_retries + 1):
+            try:
+                # Wait for room in the shared per-minute budget
+                reserved_input = estimate_tokens(system_prompt, self.tool_definitions, messages)
+                reserved_output = AGENT_CONFIG.max_tokens
+                
+                with controller.slot(timeout=deadline.remaining()):
+                    rate_limiter.acquire(reserved_input, reserved_output, max_wait=deadline.remaining())
+                    call_start = time.perf_counter()
+                    if on_tool_use is not None:
+                        response, headers = self._stream_message(client, request, dispatch, deadline)
+                    else:
+                        remaining = deadline.remaining()
+                        options = {"timeout": remaining} if remaining is not None else {}
+                        raw = client.messages.with_raw_response.create(**request, **options)
+                        response, headers = raw.parse(), raw.headers
+                    self.last_api_seconds = time.perf_counter() - call_start
+                
+                controller.on_success(headers)
+                rate_limiter.reconcile(
+                    reserved_input,
+                    reserved_output,
+                    _total_input_tokens(response.usage),
+                    response.usage.output_tokens
+                )
+                response_cache.put(replay_request, response.model_dump(mode="json"))
+                return response
+            except anthropic.APIStatusError as e:
+                if e.status_code not in THROTTLE_STATUS_CODES or dispatched:
+                    errors.append(f"API error: {str(e)}")
+                    return None
+                
+                headers = e.response.headers if e.response is not None else None
+                retry_after = parse_retry_after(headers)
+                controller.on_throttle(headers)
+                
+                # Another model has its own limits; switch instead of waiting
+                router.on_throttle(request["model"], retry_after)
+                fallback = router.fallback_for(request["model"])
+                if fallback and attempt < max_retries:
+                    _print_locked(
+                        f"   🔀 [{self.agent_name}] {request['model']} throttled ({e.status_code}), "
+                        f"retrying on {fallback}"
+                    )
+                    self.last_fallback_from = self.last_fallback_from or request["model"]
+                    request["model"] = fallback
+                    continue
+                
+                if retry_after:
+                    # Hold back every agent and process, not just this one
+                    rate_limiter.block_for(retry_after)
+                
+                if attempt >= max_retries:
+                    errors.append(f"Rate limit exceeded after {max_retries} retries")
+                    return None
+                
+                wait_time = backoff_delay(attempt, retry_after)
+                _print_locked(
+                    f"   ⏳ [{self.agent_name}] Throttled ({e.status_code}, attempt {attempt+1}/{max_retries}), "
+                    f"waiting {wait_time:.1f}s (window {controller.window:.1f})..."
+                )
+                if not deadline.sleep(wait_time):
+                    errors.append(f"Out of time waiting to retry after throttle ({e.status_code})")
+                    self.last_call_timed_out = True
+                    return None
+            except anthropic.APIConnectionError as e:
+                if deadline.expired:
+                    errors.append(f"API call cancelled: out of time ({str(e)})")
+                    self.last_call_timed_out = True
+                    return None
+                if attempt >= max_retries or dispatched:
+                    errors.append(f"API connection error: {str(e)}")
+                    return None
+                if not deadline.sleep(backoff_delay(attempt)):
+                    errors.append(f"Out of time waiting to retry after connection error: {str(e)}")
+                    self.last_call_timed_out = True
+                    return None
+            except (DeadlineExceeded, TimeoutError) as e:
+                errors.append(f"API call cancelled: out of time ({str(e)})")
+                self.last_call_timed_out = True
+                return None
+            except anthropic.APIError as e:
+                errors.append(f"API error: {str(e)}")
+                return None
+        
+        return None
+    
+    def run(
+        self,
+        instructions: str = None,
+        checkpoint: Optional[AgentCheckpoint] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AgentResult:
+        """Run the agent and return results.
+        
+        With a checkpoint, the loop state is saved after every completed
+        iteration, and a run interrupted earlier continues from its last
+        saved iteration instead of starting over.
+        
+        The agent gets AGENT.timeout seconds, cut short by `deadline` (the
+        run's) if that passes first. Out of time, in-flight API calls and
+        tool subprocesses are cancelled and the result so far is returned
+        with timed_out set; the checkpoint stays resumable.
+        """
         start_time = time.time()
         errors = []
         commits = 0
@@ -216,67 +620,152 @@ Begin now - start by reading a file related to your chosen task.
                 work_log=[]
             )
         
-        # Initialize Anthropic client
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_api_client(api_key)
         
-        # Build prompts
-        system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(instructions)
+        # Build prompts, unless prewarm() already did
+        if self._prepared is not None and self._prepared[0] == instructions:
+            _, system_prompt, user_prompt = self._prepared
+        else:
+            system_prompt = self._build_system_prompt()
+            user_prompt = self._build_user_prompt(instructions)
         
         messages = [{"role": "user", "content": user_prompt}]
         
         iteration = 0
         work_summary_parts = []
-        retry_count = 0
-        max_retries = 3
+        calls: List[CallUsage] = []
+        
+        # Signals for picking each iteration's model
+        router = get_model_router()
+        task_effort = self.prompt_artifact.task_effort
+        previous_tools: List[str] = []
+        previous_errors = 0
+        
+        # Pick up an interrupted run at its last completed iteration
+        elapsed_before = 0.0
+        saved = checkpoint.state if checkpoint is not None else None
+        if saved and not saved.get("completed"):
+            messages = saved["messages"]
+            iteration = saved["iteration"]
+            work_summary_parts = saved["work_summary_parts"]
+            calls = [CallUsage(**call) for call in saved["calls"]]
+            commits = saved["commits"]
+            files_changed = set(saved["files_changed"])
+            handoffs = saved["handoffs"]
+            errors = saved["errors"]
+            previous_tools = saved["previous_tools"]
+            previous_errors = saved["previous_errors"]
+            elapsed_before = saved["elapsed_seconds"]
+            self.tool_executor.work_log = saved["work_log"]
+            self.tool_executor.files_written = saved["files_written"]
+            self.tool_executor.commits_today = commits
+            _print_locked(f"   ⏯️  [{self.agent_name}] Resuming after iteration {iteration}")
+        
+        def save_checkpoint(completed: bool):
+            if checkpoint is None:
+                return
+            checkpoint.save_state({
+                "completed": completed,
+                "iteration": iteration,
+                "messages": messages,
+                "work_summary_parts": work_summary_parts,
+                "calls": [call.to_dict() for call in calls],
+                "commits": commits,
+                "files_changed": sorted(files_changed),
+                "handoffs": handoffs,
+                "errors": errors,
+                "previous_tools": previous_tools,
+                "previous_errors": previous_errors,
+                "elapsed_seconds": elapsed_before + time.time() - start_time,
+                "work_log": self.tool_executor.work_log,
+                "files_written": self.tool_executor.files_written,
+            })
+        
+        # False if the loop is cut short by an API failure, crash or timeout
+        completed = True
+        timed_out = False
+        deadline = Deadline(AGENT_CONFIG.timeout, parent=deadline)
+        self.tool_executor.deadline = deadline
+        
+        # Tools requested in a streamed response start running here while
+        # the rest of the response is still arriving. Read-only tools run
+        # concurrently; mutating ones keep the order the model asked for.
+        scheduler = ToolScheduler(self.tool_executor, AGENT_CONFIG.max_parallel_tools)
         
         while iteration < AGENT_CONFIG.max_iterations:
+            if deadline.expired:
+                timed_out = True
+                break
+            
             iteration += 1
+            tool_futures: Dict[str, Future] = {}
+            tool_seconds_before = scheduler.tool_seconds
+            tool_calls_before = scheduler.tool_calls
+            
+            def dispatch(block):
+                tool_futures[block.id] = scheduler.submit(block.name, block.input, block.id)
             
             try:
+                # Replace stale tool results with summaries once history gets large
+                messages, compacted_ids = compact_messages(
+                    messages,
+                    AGENT_CONFIG.compaction_threshold_tokens,
+                    AGENT_CONFIG.compaction_keep_recent
+                )
+                if compacted_ids:
+                    _print_locked(f"   🗜️  [{self.agent_name}] Compacted {len(compacted_ids)} stale tool results")
+                    # Later reads of those files can't refer back to them
+                    self.tool_executor.read_tracker.forget(compacted_ids)
+                
+                model, route_reason = router.choose(RouteSignals(
+                    iteration=iteration,
+                    task_effort=task_effort,
+                    files_touched=len(files_changed),
+                    previous_errors=previous_errors,
+                    previous_tools=previous_tools
+                ))
+                if model != router.fast_model:
+                    _print_locked(f"   🧠 [{self.agent_name}] Iteration {iteration} on {model}: {route_reason}")
+                
                 # Call Claude API with retry logic for rate limits
-                response = None
-                for attempt in range(max_retries):
-                    try:
-                        # Add small delay between API calls
-                        if AGENT_CONFIG.api_call_delay > 0:
-                            time.sleep(AGENT_CONFIG.api_call_delay)
-                        
-                        response = client.messages.create(
-                            model=AGENT_CONFIG.model,
-                            max_tokens=AGENT_CONFIG.max_tokens,
-                            system=system_prompt,
-                            tools=TOOL_DEFINITIONS,
-                            messages=messages
-                        )
-                        break
-                    except anthropic.RateLimitError as e:
-                        # Parse retry-after header if available
-                        retry_after = 60  # Default
-                        error_msg = str(e)
-                        
-                        # Exponential backoff: 60s, 120s, 180s
-                        wait_time = retry_after * (attempt + 1)
-                        
-                        if attempt < max_retries - 1:
-                            print(f"   ⏳ Rate limited (attempt {attempt+1}/{max_retries}), waiting {wait_time}s...")
-                            time.sleep(wait_time)
-                        else:
-                            errors.append(f"Rate limit exceeded after {max_retries} retries")
-                            raise
-                    except anthropic.APIError as e:
-                        errors.append(f"API error: {str(e)}")
-                        break
+                response = self._call_api(
+                    client,
+                    system_prompt,
+                    messages,
+                    errors,
+                    on_tool_use=dispatch if AGENT_CONFIG.streaming else None,
+                    model=model,
+                    deadline=deadline
+                )
                 
                 if response is None:
                     if not errors:
                         errors.append("Failed to get response after retries")
+                    timed_out = self.last_call_timed_out
+                    completed = False
                     break
                 
+                usage = usage_from_response(
+                    iteration,
+                    response,
+                    self.last_api_seconds,
+                    replayed=self.last_response_replayed
+                )
+                usage.route_reason = route_reason
+                usage.fallback_from = self.last_fallback_from
+                calls.append(usage)
+                
+                # Schedule any tool calls not already started while streaming
+                for block in response.content:
+                    if block.type == "tool_use" and block.id not in tool_futures:
+                        dispatch(block)
+                
                 # Process response
                 assistant_content = []
                 tool_results = []
                 should_continue = False
+                errors_before = len(errors)
+                previous_tools = []
                 
                 for block in response.content:
                     if block.type == "text":
@@ -292,14 +781,17 @@ Begin now - start by reading a file related to your chosen task.
                             "input": block.input
                         })
                         
-                        # Execute the tool
-                        result = self.tool_executor.execute(block.name, block.input)
+                        # Collect results in the original block order
+                        result = tool_futures.pop(block.id).result()
+                        previous_tools.append(block.name)
                         
                         # Track changes
                         if block.name == "git_commit" and result.get("success"):
                             commits += 1
                         if block.name in ["write_file", "edit_file"] and result.get("success"):
                             files_changed.add(block.input.get("path", ""))
+                        if block.name == "multi_edit":
+                            files_changed.update(result.get("files_written", []))
                         if block.name == "create_handoff" and result.get("success"):
                             handoffs.append(result.get("handoff_id", ""))
                         if "error" in result:
@@ -311,6 +803,12 @@ Begin now - start by reading a file related to your chosen task.
                             "content": json.dumps(result)
                         })
                 
+                previous_errors = len(errors) - errors_before
+                
+                # Every tool of this turn has finished by now
+                usage.tool_seconds = scheduler.tool_seconds - tool_seconds_before
+                usage.tool_calls = scheduler.tool_calls - tool_calls_before
+                
                 # Add assistant response to messages
                 messages.append({"role": "assistant", "content": assistant_content})
                 
@@ -325,11 +823,29 @@ Begin now - start by reading a file related to your chosen task.
                 if not should_continue:
                     break
                 
+                save_checkpoint(completed=False)
+                
             except Exception as e:
                 errors.append(f"API error: {str(e)}")
+                completed = False
                 break
         
-        duration = time.time() - start_time
+        # Let any tool dispatched by an interrupted stream finish
+        scheduler.shutdown()
+        if timed_out:
+            completed = False
+            left = deadline.remaining()
+            cut_short = f", {left:.0f}s left but too little for the next call" if left else ""
+            errors.append(
+                f"Timed out after {deadline.elapsed():.0f}s ({iteration} iterations{cut_short}); "
+                f"kept partial results"
+            )
+            _print_locked(f"   ⏰ [{self.agent_name}] Out of time in iteration {iteration}, stopping")
+        if completed:
+            save_checkpoint(completed=True)
+        
+        duration = elapsed_before + time.time() - start_time
+        totals = sum_usage(calls)
         
         # Build work summary
         work_summary = "\n".join(work_summary_parts) if work_summary_parts else "No work summary provided"
@@ -343,7 +859,16 @@ Begin now - start by reading a file related to your chosen task.
             handoffs_created=handoffs,
             errors=errors,
             duration_seconds=duration,
-            work_log=self.tool_executor.get_work_log()
+            work_log=self.tool_executor.get_work_log(),
+            input_tokens=totals["input_tokens"],
+            cache_read_tokens=totals["cache_read_tokens"],
+            cache_write_tokens=totals["cache_write_tokens"],
+            output_tokens=totals["output_tokens"],
+            api_seconds=totals["api_seconds"],
+            tool_seconds=totals["tool_seconds"],
+            cost_usd=totals["cost_usd"],
+            calls=calls,
+            timed_out=timed_out
         )
 
 
@@ -353,6 +878,11 @@ class PMOrchestrator:
     def __init__(self):
         self.agent_dir = AGENTS_DIR / "PM-Orchestrator"
         self.definition = None
+        # Usage of batch calls made for each agent, added to its result
+        self.batch_calls: Dict[str, List[CallUsage]] = {}
+        self.deadline = Deadline()
+        # Progress of the current run, for --resume (None: not checkpointed)
+        self.checkpoint: Optional[RunCheckpoint] = None
         self._load_definition()
     
     def _load_definition(self):
@@ -362,47 +892,331 @@ class PMOrchestrator:
             with open(def_file) as f:
                 self.definition = f.read()
     
+    def _batch_client(self):
+        """Anthropic client for batch calls, or None if batches can't run."""
+        if not BATCH.enabled:
+            return None
+        if anthropic is None or not get_api_key():
+            print("⚠️  Batch mode needs the anthropic library and ANTHROPIC_API_KEY; skipping")
+            return None
+        return anthropic.Anthropic(api_key=get_api_key())
+    
+    def _record_batch_calls(self, runner: BatchRunner, messages: Dict[str, Any], purpose: str):
+        """Keep usage of a batch's results for the agents they belong to."""
+        for custom_id, message in messages.items():
+            agent_name = custom_id.split("-", 1)[1]
+            usage = usage_from_response(
+                0,
+                message,
+                0.0,
+                replayed=custom_id in runner.replayed,
+                batch=True
+            )
+            usage.route_reason = purpose
+            self.batch_calls.setdefault(agent_name, []).append(usage)
+    
     def plan_day(self, agent_names: List[str]) -> Dict[str, str]:
-        """Plan the day's work for each agent."""
-        # This could use Claude to intelligently assign tasks
-        # For now, return default instructions
-        return {name: None for name in agent_names}  # None means use default
+        """Plan the day's work for each agent.
+        
+        In batch mode every agent picks its task in one Message Batch and
+        the plan becomes its instructions; otherwise (or if planning fails)
+        agents get the default instructions.
+        """
+        instructions = {name: None for name in agent_names}  # None means use default
+        client = self._batch_client()
+        if client is None:
+            return instructions
+        
+        requests = {}
+        for name in agent_names:
+            requests[f"plan-{name}"] = dict(
+                model=AGENT_CONFIG.model,
+                max_tokens=BATCH.max_tokens,
+                system=PMAgent(name)._build_system_prompt(),
+                messages=[{"role": "user", "content": PLAN_PROMPT}]
+            )
+        
+        print(f"📦 Planning {len(requests)} agents in one batch...")
+        runner = BatchRunner(client, timeout=self.deadline.cap(BATCH.timeout))
+        messages = runner.run(requests)
+        self._record_batch_calls(runner, messages, "batch plan")
+        
+        for name in agent_names:
+            message = messages.get(f"plan-{name}")
+            text = "".join(b.text for b in message.content if b.type == "text").strip() if message else ""
+            if text:
+                instructions[name] = f"Work on this plan, chosen earlier today:\n\n{text}"
+        
+        print(f"   {len(messages)} planned, {len(runner.errors)} failed ({runner.elapsed:.1f}s)")
+        for custom_id, reason in runner.errors.items():
+            print(f"   ⚠️  {custom_id}: {reason}")
+        return instructions
     
-    def run_agents(self, agent_names: List[str]) -> List[AgentResult]:
-        """Run all specified agents and collect results."""
-        results = []
+    def summarize_results(self, results: List[AgentResult]):
+        """Condense long work summaries for the report in one batch (batch mode only)."""
+        client = self._batch_client()
+        if client is None:
+            return
+        
+        requests = {}
+        for result in results:
+            if len(result.work_summary) >= SUMMARY_MIN_CHARS:
+                requests[f"summary-{result.agent_name}"] = dict(
+                    model=AGENT_CONFIG.model,
+                    max_tokens=BATCH.max_tokens,
+                    messages=[{
+                        "role": "user",
+                        "content": SUMMARY_PROMPT.format(work_summary=result.work_summary)
+                    }]
+                )
+        if not requests:
+            return
+        
+        print(f"📦 Summarizing {len(requests)} results in one batch...")
+        runner = BatchRunner(client, timeout=self.deadline.cap(BATCH.timeout))
+        messages = runner.run(requests)
+        self._record_batch_calls(runner, messages, "batch summary")
+        print(f"   {len(messages)} summarized, {len(runner.errors)} failed ({runner.elapsed:.1f}s)")
+        
+        for result in results:
+            message = messages.get(f"summary-{result.agent_name}")
+            if message:
+                text = "".join(b.text for b in message.content if b.type == "text").strip()
+                result.report_summary = text or None
+    
+    def run_agents(self, agent_names: List[str], checkpoint: Optional[RunCheckpoint] = None) -> List[AgentResult]:
+        """Run all specified agents and collect results in priority order.
+        
+        With a checkpoint, progress is saved as the run goes. Resuming a
+        checkpointed run reuses the results of agents that already
+        finished and the instructions planned for the others.
+        
+        The whole call is bounded by ORCH_CONFIG.max_runtime: each agent's
+        own deadline ends no later than the run's, and agents that would
+        start with less than ORCH_CONFIG.min_agent_seconds left are skipped.
+        """
+        self.checkpoint = checkpoint
+        self.deadline = Deadline(ORCH_CONFIG.max_runtime)
+        # Same spool when resuming, so handles in saved history still resolve
+        open_spool(checkpoint.run_id if checkpoint is not None else None)
+        finished: Dict[str, AgentResult] = {}
+        instructions = None
+        if checkpoint is not None and checkpoint.exists:
+            finished = {
+                name: AgentResult.from_dict(data)
+                for name, data in checkpoint.finished_results(agent_names).items()
+            }
+            instructions = checkpoint.load_meta().get("instructions")
+            if finished:
+                print(f"⏭️  Skipping {len(finished)} agents already finished in run {checkpoint.run_id}")
+        
+        to_run = [name for name in agent_names if name not in finished]
         
         # Plan the day
-        instructions = self.plan_day(agent_names)
+        if instructions is None:
+            instructions = self.plan_day(to_run)
+            if checkpoint is not None:
+                checkpoint.save_meta({
+                    "agents": agent_names,
+                    "instructions": instructions,
+                    "run_date": get_run_date(),
+                    "started": datetime.now().isoformat()
+                })
         
-        for i, agent_name in enumerate(agent_names):
-            print(f"\n{'='*60}")
-            print(f"Running {agent_name}... ({i+1}/{len(agent_names)})")
-            print(f"{'='*60}")
-            
-            agent = PMAgent(agent_name)
-            result = agent.run(instructions.get(agent_name))
-            results.append(result)
-            
-            # Print summary
-            status = "✅" if result.success else "❌"
-            print(f"\n{status} {agent_name} completed")
-            print(f"   Commits: {result.commits}")
-            print(f"   Files changed: {len(result.files_changed)}")
-            print(f"   Duration: {result.duration_seconds:.1f}s")
-            if result.errors:
-                print(f"   Errors: {result.errors}")
+        results = []
+        if len(to_run) > 1 and AGENT_CONFIG.parallel_execution:
+            results = self._run_agents_parallel(to_run, instructions)
+        elif to_run:
+            results = self._run_agents_sequential(to_run, instructions)
+        
+        self.summarize_results(results)
+        for result in results:
+            result.add_calls(self.batch_calls.pop(result.agent_name, []))
+            if checkpoint is not None:
+                checkpoint.for_agent(result.agent_name).save_result(result.to_dict())
+        
+        by_name = {**finished, **{r.agent_name: r for r in results}}
+        return [by_name[name] for name in agent_names]
+    
+    def _run_agents_sequential(self, agent_names: List[str], instructions: Dict[str, str]) -> List[AgentResult]:
+        """Run agents one after another.
+        
+        Rate limiting is handled by the shared limiter inside PMAgent.run,
+        so there is no fixed delay between agents.
+        
+        With ORCH_CONFIG.prewarm_next_agent, the next agent is built and
+        prewarmed (see PMAgent.prewarm) on a background thread while the
+        current one spends its time waiting on the API.
+        """
+        results = []
+        prewarm = ORCH_CONFIG.prewarm_next_agent
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pm-prewarm") as pool:
+            next_agent = None
+            if prewarm and agent_names:
+                next_agent = pool.submit(self._prepare_agent, agent_names[0], instructions.get(agent_names[0]))
             
-            # Add delay between agents to avoid rate limits
-            if i < len(agent_names) - 1:
-                delay = AGENT_CONFIG.inter_agent_delay
-                print(f"   Waiting {delay}s before next agent (rate limit protection)...")
-                time.sleep(delay)
+            for i, agent_name in enumerate(agent_names):
+                print(f"\n{'='*60}")
+                print(f"Running {agent_name}... ({i+1}/{len(agent_names)})")
+                print(f"{'='*60}")
+                
+                agent = next_agent.result() if next_agent is not None else None
+                next_agent = None
+                if prewarm and i + 1 < len(agent_names):
+                    next_name = agent_names[i + 1]
+                    next_agent = pool.submit(self._prepare_agent, next_name, instructions.get(next_name))
+                
+                result = self._run_agent(agent_name, instructions.get(agent_name), agent)
+                results.append(result)
+                self._print_result(result)
         
         return results
     
+    def _prepare_agent(self, agent_name: str, instruction: Optional[str]) -> Optional["PMAgent"]:
+        """Build and prewarm an agent, or None if that fails (_run_agent reports why)."""
+        try:
+            agent = PMAgent(agent_name)
+            warmed = agent.prewarm(instruction)
+        except Exception:
+            return None
+        if warmed:
+            _print_locked(f"   🔥 [{agent_name}] Prewarmed, {warmed} backlog files read ahead")
+        return agent
+    
+    def _preflight(
+        self,
+        agent_names: List[str],
+        instructions: Dict[str, str]
+    ) -> Tuple[Dict[str, "PMAgent"], List[AgentEstimate]]:
+        """Build each agent and size its prompts before the run.
+        
+        Returns the built agents by name and one estimate per agent. An
+        agent that fails to build gets a zero estimate; building it again
+        when it runs fails too and records the error in its result.
+        """
+        client = None
+        if ORCH_CONFIG.preflight_token_count == "api" and anthropic is not None and get_api_key():
+            client = anthropic.Anthropic(api_key=get_api_key())
+        
+        agents = {}
+        estimates = []
+        for name in agent_names:
+            try:
+                agent = PMAgent(name)
+                estimates.append(preflight_tokens(agent, instructions.get(name), client))
+                agents[name] = agent
+            except Exception:
+                estimates.append(AgentEstimate(name, 0, 0))
+        return agents, estimates
+    
+    def _run_agents_parallel(self, agent_names: List[str], instructions: Dict[str, str]) -> List[AgentResult]:
+        """Run agents concurrently under the input-token budget.
+        
+        At most ORCH_CONFIG.max_agents_per_run run at once, and agents start
+        only while the running agents' expected tokens per minute fit the
+        budget (see pm_scheduler.py). Results are returned in the same
+        (priority) order as agent_names, regardless of completion order.
+        """
+        max_workers = max(1, min(ORCH_CONFIG.max_agents_per_run, len(agent_names)))
+        budget = token_budget()
+        
+        print(f"\n{'='*60}")
+        print(f"Running {len(agent_names)} agents in parallel (max {max_workers} at a time)")
+        if budget is not None:
+            print(f"Input token budget: {format_tokens(int(budget))}/min")
+        print(f"{'='*60}")
+        
+        agents, estimates = self._preflight(agent_names, instructions)
+        scheduler = TokenBudgetScheduler(
+            budget, max_workers, ORCH_CONFIG.expected_calls_per_minute, request_budget()
+        )
+        
+        def on_start(index: int, agent_name: str, load: float):
+            _print_locked(
+                f"▶ [{agent_name}] Starting ({index+1}/{len(agent_names)}, "
+                f"~{format_tokens(int(load))} tokens/min)"
+            )
+        
+        def run_one(index: int, agent_name: str) -> AgentResult:
+            return self._run_agent(agent_name, instructions.get(agent_name), agents.get(agent_name))
+        
+        return scheduler.run(
+            estimates,
+            run_one,
+            on_start=on_start,
+            on_done=lambda index, result: self._print_result(result)
+        )
+    
+    def _run_agent(self, agent_name: str, instruction: Optional[str], agent: Optional["PMAgent"] = None) -> AgentResult:
+        """Run a single agent, converting unexpected crashes into a failed result.
+        
+        Agents starting too close to the run's deadline are skipped.
+        """
+        start_time = time.time()
+        checkpoint = self.checkpoint.for_agent(agent_name) if self.checkpoint is not None else None
+        
+        remaining = self.deadline.remaining()
+        if remaining is not None and remaining < ORCH_CONFIG.min_agent_seconds:
+            _print_locked(f"⏭️  [{agent_name}] Skipped: {remaining:.0f}s left in the run")
+            return AgentResult(
+                agent_name=agent_name,
+                success=False,
+                work_summary="Skipped: run time budget exhausted",
+                commits=0,
+                files_changed=[],
+                handoffs_created=[],
+                errors=[f"Skipped: only {remaining:.0f}s of the run's {ORCH_CONFIG.max_runtime}s left"],
+                duration_seconds=0,
+                work_log=[],
+                skipped=True
+            )
+        
+        try:
+            if agent is None:
+                agent = PMAgent(agent_name)
+            result = agent.run(instruction, checkpoint, self.deadline)
+        except Exception as e:
+            result = AgentResult(
+                agent_name=agent_name,
+                success=False,
+                work_summary=f"Agent crashed: {str(e)}",
+                commits=0,
+                files_changed=[],
+                handoffs_created=[],
+                errors=[f"Agent crashed: {str(e)}"],
+                duration_seconds=time.time() - start_time,
+                work_log=[]
+            )
+        
+        # Keep the result even if the rest of the run dies
+        if checkpoint is not None:
+            checkpoint.save_result(result.to_dict())
+        return result
+    
+    def _print_result(self, result: AgentResult):
+        """Print a one-block summary of an agent's result."""
+        status = "✅" if result.success else "❌"
+        outcome = "skipped" if result.skipped else "timed out" if result.timed_out else "completed"
+        lines = [
+            f"\n{status} {result.agent_name} {outcome}",
+            f"   Commits: {result.commits}",
+            f"   Files changed: {len(result.files_changed)}",
+            f"   Duration: {result.duration_seconds:.1f}s "
+            f"(API {result.api_seconds:.1f}s, tools {result.tool_seconds:.1f}s)",
+            f"   Tokens: {format_tokens(result.input_tokens + result.cache_read_tokens + result.cache_write_tokens)} in / "
+            f"{format_tokens(result.output_tokens)} out, est. {format_cost(result.cost_usd)}",
+        ]
+        fallbacks = fallback_summary(result.calls)
+        if fallbacks:
+            lines.append(f"   Throttle fallbacks: {fallbacks}")
+        if result.errors:
+            lines.append(f"   Errors: {result.errors}")
+        _print_locked("\n".join(lines))
+    
     def generate_daily_report(self, results: List[AgentResult]) -> str:
         """Generate the daily report from all agent results."""
+        usage = _run_usage(results)
         report = f"""# PM Daily Report - {datetime.now().strftime('%Y-%m-%d')}
 
 > Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -413,9 +1227,15 @@ class PMOrchestrator:
 |--------|-------|
 | Agents Run | {len(results)} |
 | Successful | {sum(1 for r in results if r.success)} |
+| Timed Out / Skipped | {sum(1 for r in results if r.timed_out)} / {sum(1 for r in results if r.skipped)} |
 | Total Commits | {sum(r.commits for r in results)} |
 | Files Changed | {sum(len(r.files_changed) for r in results)} |
 | Handoffs Created | {sum(len(r.handoffs_created) for r in results)} |
+| Prompt Cache Hit Rate | {_run_cache_hit_rate(results):.0%} |
+| API Calls | {usage['api_calls']} |
+| Tokens (in / out) | {format_tokens(usage['input_tokens'] + usage['cache_read_tokens'] + usage['cache_write_tokens'])} / {format_tokens(usage['output_tokens'])} |
+| API Time / Tool Time | {usage['api_seconds']:.1f}s / {usage['tool_seconds']:.1f}s |
+| Estimated API Cost | {format_cost(usage['cost_usd'])} |
 
 ## Agent Reports
 
@@ -423,16 +1243,27 @@ class PMOrchestrator:
         
         for result in results:
             status = "✅ Success" if result.success else "❌ Failed"
+            if result.skipped:
+                status = "⏭️ Skipped (run ran out of time)"
+            elif result.timed_out:
+                status = "⏰ Timed out (partial results)"
+            fallbacks = fallback_summary(result.calls)
             
             report += f"""### {result.agent_name}
 
 **Status:** {status}
 **Duration:** {result.duration_seconds:.1f}s
 **Commits:** {result.commits}
+**Prompt Cache Hit Rate:** {result.cache_hit_rate:.0%}
+**Tokens:** {format_tokens(result.input_tokens + result.cache_read_tokens + result.cache_write_tokens)} in ({format_tokens(result.cache_read_tokens)} cached) / {format_tokens(result.output_tokens)} out
+**API Time:** {result.api_seconds:.1f}s over {len(result.calls)} calls · **Tool Time:** {result.tool_seconds:.1f}s
+**Estimated Cost:** {format_cost(result.cost_usd)}
+**Models:** {', '.join(f"{model} ×{count}" for model, count in calls_by_model(result.calls).items()) or "none"}
+**Throttle Fallbacks:** {fallbacks or "none"}
 
 #### Work Summary
 
-{result.work_summary[:1000]}
+{result.report_summary or result.work_summary[:1000]}
 
 """
             if result.files_changed:
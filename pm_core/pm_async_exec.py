@@ -0,0 +1,184 @@
+"""
+PM Async Exec - Tool subprocesses run on one shared event loop.
+
+run_command, search_codebase, run_tests, run_lint, git_status, git_diff
+and git_commit start their processes with
+asyncio.create_subprocess_exec/_shell on a single background event loop.
+Reading a process's pipes and waiting for
+it happens on that loop, however many agents and parallel tool calls are
+running. Code running on a thread (the tools) calls ProcessRunner.run;
+async code can await run_process directly.
+
+- timeouts kill the command's whole process group, and the output read
+  so far is kept on the TimeoutExpired
+- cancelling a run (or cancel_all, e.g. on Ctrl-C) kills the group too;
+  commands get their own session, so a terminal's Ctrl-C no longer
+  reaches them
+- output is read as it arrives and can be passed to an on_output callback
+"""
+
+import asyncio
+import codecs
+import os
+import signal
+import subprocess
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+
+# Bytes read from a pipe at a time
+CHUNK_BYTES = 64 * 1024
+
+# on_output("stdout" | "stderr", text), called on the event loop thread
+OutputCallback = Callable[[str, str], None]
+
+
+def _text(chunks: List[bytes]) -> str:
+    """Pipe bytes as text, like subprocess.run(text=True) gives it."""
+    text = b"".join(chunks).decode("utf-8", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _kill_group(process: asyncio.subprocess.Process):
+    """Kill a process started in its own session, and all its children."""
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+async def _pump(stream: asyncio.StreamReader, name: str, chunks: List[bytes], on_output: Optional[OutputCallback]):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        data = await stream.read(CHUNK_BYTES)
+        if not data:
+            break
+        chunks.append(data)
+        if on_output:
+            on_output(name, decoder.decode(data))
+
+
+async def run_process(
+    cmd,
+    cwd: Path,
+    timeout: Optional[float] = None,
+    shell: bool = False,
+    on_output: Optional[OutputCallback] = None
+) -> subprocess.CompletedProcess:
+    """Run a command to completion and capture its output as text.
+    
+    Raises subprocess.TimeoutExpired (carrying the output so far) after
+    `timeout` seconds. Either way, and on cancellation, the command's
+    process group is killed before this returns.
+    """
+    options = dict(
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+    if shell:
+        process = await asyncio.create_subprocess_shell(cmd, **options)
+    else:
+        process = await asyncio.create_subprocess_exec(*cmd, **options)
+    
+    stdout: List[bytes] = []
+    stderr: List[bytes] = []
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                _pump(process.stdout, "stdout", stdout, on_output),
+                _pump(process.stderr, "stderr", stderr, on_output),
+                process.wait()
+            ),
+            timeout
+        )
+    except asyncio.TimeoutError:
+        _kill_group(process)
+        await process.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout, output=_text(stdout), stderr=_text(stderr))
+    except BaseException:
+        # Cancelled: don't leave the command running
+        _kill_group(process)
+        raise
+    return subprocess.CompletedProcess(cmd, process.returncode, _text(stdout), _text(stderr))
+
+
+class ProcessRunner:
+    """An event loop on a background thread that runs every tool subprocess."""
+    
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="pm-exec", daemon=True)
+        self._thread.start()
+        self._running: Set[Future] = set()
+        self._lock = threading.Lock()
+    
+    def submit(
+        self,
+        cmd,
+        cwd: Path,
+        timeout: Optional[float] = None,
+        shell: bool = False,
+        on_output: Optional[OutputCallback] = None
+    ) -> Future:
+        """Start a command; cancelling the returned future kills it."""
+        future = asyncio.run_coroutine_threadsafe(
+            run_process(cmd, cwd, timeout, shell, on_output), self._loop
+        )
+        with self._lock:
+            self._running.add(future)
+        future.add_done_callback(self._done)
+        return future
+    
+    def _done(self, future: Future):
+        with self._lock:
+            self._running.discard(future)
+    
+    def run(
+        self,
+        cmd,
+        cwd: Path,
+        timeout: Optional[float] = None,
+        shell: bool = False,
+        on_output: Optional[OutputCallback] = None
+    ) -> subprocess.CompletedProcess:
+        """Run a command and wait for it (see run_process)."""
+        future = self.submit(cmd, cwd, timeout, shell, on_output)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+    
+    @property
+    def running(self) -> int:
+        with self._lock:
+            return len(self._running)
+    
+    def cancel_all(self) -> int:
+        """Kill every running command. Returns how many were running."""
+        with self._lock:
+            futures = list(self._running)
+        for future in futures:
+            future.cancel()
+        return len(futures)
+
+
+_RUNNER = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_process_runner() -> ProcessRunner:
+    """Get the process-wide subprocess runner."""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = ProcessRunner()
+        return _RUNNER
@@ -0,0 +1,171 @@
+"""
+PM Audit - Buffered writer for the tool audit log.
+
+Every tool call is recorded in logs/pm-tools-YYYY-MM-DD.jsonl. Recording
+a call only puts it on a queue. A background thread turns queued calls
+into JSON lines and appends them in batches: when AUDIT.flush_entries
+calls are waiting, or AUDIT.flush_seconds after the oldest one
+arrived. The file is opened once per batch, not once per call.
+
+String inputs longer than AUDIT.inline_chars (e.g. write_file
+content) are logged as {"sha256": ..., "chars": ...}, so the log's size
+doesn't depend on file sizes. A batch is written with one O_APPEND write
+under an exclusive flock, so orchestrator processes sharing logs/ never
+interleave lines.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .pm_config import AUDIT
+
+
+def condense(value: Any, max_chars: int) -> Any:
+    """Value with strings longer than max_chars replaced by their hash and length."""
+    if isinstance(value, str) and len(value) > max_chars:
+        return {
+            "sha256": hashlib.sha256(value.encode("utf-8", errors="replace")).hexdigest(),
+            "chars": len(value)
+        }
+    if isinstance(value, dict):
+        return {key: condense(item, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [condense(item, max_chars) for item in value]
+    return value
+
+
+def _append(path: Path, data: bytes):
+    """Append bytes to a file in one locked O_APPEND write."""
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if fcntl is None:
+            break
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        # Rotated away (see pm_logs.py) while we waited for the lock
+        if os.fstat(fd).st_nlink > 0:
+            break
+        os.close(fd)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+class AuditLog:
+    """Queue of tool calls, appended to the daily log by a background thread."""
+    
+    def __init__(
+        self,
+        logs_dir: Path,
+        flush_entries: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+        inline_chars: Optional[int] = None
+    ):
+        self.logs_dir = Path(logs_dir)
+        self.flush_entries = flush_entries or AUDIT.flush_entries
+        self.flush_seconds = flush_seconds if flush_seconds is not None else AUDIT.flush_seconds
+        self.inline_chars = inline_chars or AUDIT.inline_chars
+        self.written = 0
+        self.batches = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="pm-audit", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def record(
+        self,
+        agent: str,
+        tool: str,
+        inputs: Dict[str, Any],
+        success: bool,
+        duration_ms: float
+    ):
+        """Queue one tool call. Serializing and writing happen later, on the writer thread."""
+        self._queue.put({
+            "timestamp": datetime.now().isoformat(),
+            "agent": agent,
+            "tool": tool,
+            "inputs": inputs,
+            "success": success,
+            "duration_ms": round(duration_ms, 1)
+        })
+    
+    def flush(self):
+        """Wait until everything recorded so far is on disk."""
+        self._queue.join()
+    
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is None:
+                self._queue.task_done()
+                break
+            batch = [entry]
+            due = time.monotonic() + self.flush_seconds
+            while len(batch) < self.flush_entries:
+                try:
+                    entry = self._queue.get(timeout=max(0.0, due - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(entry)
+            
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"⚠️ Tool audit log write failed ({len(batch)} entries): {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _write(self, batch: List[Dict[str, Any]]):
+        by_file: Dict[Path, List[str]] = {}
+        for entry in batch:
+            entry["inputs"] = condense(entry["inputs"], self.inline_chars)
+            path = self.logs_dir / f"pm-tools-{entry['timestamp'][:10]}.jsonl"
+            by_file.setdefault(path, []).append(json.dumps(entry, default=str) + "\n")
+        
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        for path, lines in by_file.items():
+            _append(path, "".join(lines).encode("utf-8"))
+        self.written += len(batch)
+        self.batches += 1
+
+
+_AUDIT_LOGS: Dict[Path, AuditLog] = {}
+_AUDIT_LOCK = threading.Lock()
+
+
+def get_audit_log(logs_dir: Path) -> AuditLog:
+    """Get the process-wide audit log writing to logs_dir."""
+    logs_dir = Path(logs_dir)
+    with _AUDIT_LOCK:
+        if logs_dir not in _AUDIT_LOGS:
+            _AUDIT_LOGS[logs_dir] = AuditLog(logs_dir)
+        return _AUDIT_LOGS[logs_dir]
@@ -0,0 +1,101 @@
+"""
+PM Batch - Run independent Messages requests through the Message Batches API.
+
+Planning each agent's task and summarizing results for the report need no
+tool loop, so the orchestrator can send them for all agents as one batch:
+one round trip instead of one call per agent, at batch pricing, and
+outside the per-minute limits the agents' own calls share.
+
+Requests already in the record/replay cache are served from it and left
+out of the batch; new results are recorded.
+"""
+
+import time
+from typing import Any, Dict, Optional, Set
+
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
+from .pm_config import BATCH
+from .pm_replay import ReplayMiss, get_response_cache
+
+
+class BatchRunner:
+    """Submit a set of requests as one Message Batch and collect the results.
+    
+    After run():
+        errors: custom_id -> reason, for requests without a result
+        replayed: custom_ids served from the replay cache
+        elapsed: seconds from submission until results were collected
+    """
+    
+    def __init__(self, client, poll_interval: Optional[float] = None, timeout: Optional[float] = None):
+        self.client = client
+        self.poll_interval = BATCH.poll_interval if poll_interval is None else poll_interval
+        self.timeout = BATCH.timeout if timeout is None else timeout
+        self.errors: Dict[str, str] = {}
+        self.replayed: Set[str] = set()
+        self.elapsed = 0.0
+        self.batch_id: Optional[str] = None
+    
+    def run(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Run requests (custom_id -> Messages params) and return custom_id -> Message.
+        
+        Never raises for API failures; failed requests are listed in
+        self.errors so callers can fall back to their non-batch behavior.
+        """
+        response_cache = get_response_cache()
+        messages: Dict[str, Any] = {}
+        pending: Dict[str, Dict[str, Any]] = {}
+        
+        for custom_id, params in requests.items():
+            try:
+                cached = response_cache.get(params)
+            except ReplayMiss as e:
+                self.errors[custom_id] = f"Replay error: {str(e)}"
+                continue
+            if cached is not None:
+                messages[custom_id] = anthropic.types.Message.model_validate(cached)
+                self.replayed.add(custom_id)
+            else:
+                pending[custom_id] = params
+        
+        if not pending:
+            return messages
+        
+        start = time.time()
+        try:
+            batch = self.client.messages.batches.create(requests=[
+                {"custom_id": custom_id, "params": params}
+                for custom_id, params in pending.items()
+            ])
+            self.batch_id = batch.id
+            
+            while batch.processing_status != "ended":
+                if time.time() - start > self.timeout:
+                    self.client.messages.batches.cancel(batch.id)
+                    for custom_id in pending:
+                        self.errors[custom_id] = f"Batch {batch.id} timed out after {self.timeout:.0f}s"
+                    return messages
+                time.sleep(self.poll_interval)
+                batch = self.client.messages.batches.retrieve(batch.id)
+            
+            for entry in self.client.messages.batches.results(batch.id):
+                result = entry.result
+                if result.type == "succeeded":
+                    messages[entry.custom_id] = result.message
+                    response_cache.put(pending[entry.custom_id], result.message.model_dump(mode="json"))
+                elif result.type == "errored":
+                    self.errors[entry.custom_id] = f"errored: {result.error.error.message}"
+                else:
+                    self.errors[entry.custom_id] = result.type
+        except anthropic.APIError as e:
+            for custom_id in pending:
+                if custom_id not in messages:
+                    self.errors[custom_id] = f"Batch API error: {str(e)}"
+        finally:
+            self.elapsed = time.time() - start
+        
+        return messages
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+PM Bench - Orchestrator throughput benchmark against the local mock API.
+
+Drives PMOrchestrator.run_agents end to end (real agents, prompts, tools
+and scheduler) against pm_mock_server, so pm_core's own overhead can be
+measured without spending API quota. For each combination of agent count
+and concurrency it reports:
+
+- wall time of the run
+- tool time (sum of ToolExecutor.execute durations)
+- sleep share (time.sleep seconds / summed agent time): backoff and
+  rate-limiter waits
+- throughput (agents/min and API calls/s)
+
+Usage:
+    python -m pm_core.pm_bench
+    python -m pm_core.pm_bench --agents 1,4,12 --concurrency 1,4 --latency 0.5
+    python -m pm_core.pm_bench --throttle-rate 0.2 --json bench.json
+    python -m pm_core.pm_bench --baseline bench.json --tolerance 0.25
+
+With --baseline the run fails (exit 1) if any scenario's wall time grew by
+more than the tolerance, which makes it usable as a scheduler regression
+check in CI.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pm_core import pm_agents, pm_prompts, pm_ratelimit, pm_replay, pm_router, pm_spool, pm_tools
+from pm_core.pm_config import (
+    AGENT as AGENT_CONFIG,
+    ORCHESTRATOR as ORCH_CONFIG,
+    RATE_LIMIT,
+    REPLAY,
+)
+from pm_core.pm_mock_server import MockAnthropicServer, load_transcript
+
+
+class _Timers:
+    """Thread-safe accumulators for instrumented calls."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tool_seconds = 0.0
+        self.tool_calls = 0
+        self.sleep_seconds = 0.0
+    
+    def add_tool(self, seconds: float):
+        with self._lock:
+            self.tool_seconds += seconds
+            self.tool_calls += 1
+    
+    def add_sleep(self, seconds: float):
+        with self._lock:
+            self.sleep_seconds += seconds
+
+
+def _reset_shared_state(state_dir: Path):
+    """Fresh limiter, AIMD controller, model router, response, file and prompt caches for each scenario.
+    
+    Everything a run would keep under PM_STATE_DIR goes to state_dir, so a
+    benchmark never leaves prompt artifacts or spools for a real run to reuse.
+    """
+    RATE_LIMIT.state_file = state_dir / f"ratelimit-{time.time_ns()}.json"
+    REPLAY.cache_dir = state_dir / "replay"
+    pm_ratelimit._LIMITER = None
+    pm_ratelimit._CONTROLLER = None
+    pm_router._ROUTER = None
+    pm_replay._CACHE = None
+    pm_tools._FILE_CACHE = None
+    pm_prompts._PROMPT_CACHE = pm_prompts.PromptArtifactCache(state_dir / f"prompts-{time.time_ns()}")
+    pm_spool.SPOOL_DIR = state_dir / "spool"
+
+
+def run_scenario(
+    server: MockAnthropicServer,
+    agent_count: int,
+    concurrency: int,
+    state_dir: Path,
+) -> Dict[str, Any]:
+    """Run one orchestration against the mock server and collect timings."""
+    _reset_shared_state(state_dir)
+    AGENT_CONFIG.parallel_execution = concurrency > 1
+    ORCH_CONFIG.max_agents_per_run = concurrency
+    
+    roster = ORCH_CONFIG.active_agents
+    agent_names = [roster[i % len(roster)] for i in range(agent_count)]
+    
+    timers = _Timers()
+    real_execute = pm_tools.ToolExecutor.execute
+    real_sleep = time.sleep
+    
+    def timed_execute(self, tool_name, tool_input, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return real_execute(self, tool_name, tool_input, *args, **kwargs)
+        finally:
+            timers.add_tool(time.perf_counter() - start)
+    
+    def timed_sleep(seconds):
+        timers.add_sleep(max(0.0, seconds))
+        real_sleep(seconds)
+    
+    requests_before = server.stats["requests"]
+    throttled_before = server.stats["throttled"]
+    
+    with mock.patch.object(pm_tools.ToolExecutor, "execute", timed_execute), \
+            mock.patch("time.sleep", timed_sleep), \
+            contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = pm_agents.PMOrchestrator().run_agents(agent_names)
+        wall = time.perf_counter() - start
+    
+    api_calls = server.stats["requests"] - requests_before
+    agent_seconds = sum(r.duration_seconds for r in results) or wall
+    return {
+        "agents": agent_count,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "tool_seconds": round(timers.tool_seconds, 3),
+        "tool_calls": timers.tool_calls,
+        "sleep_seconds": round(timers.sleep_seconds, 3),
+        "sleep_share": round(timers.sleep_seconds / agent_seconds, 3),
+        "api_calls": api_calls,
+        "throttled": server.stats["throttled"] - throttled_before,
+        "agents_per_minute": round(agent_count / wall * 60, 2) if wall else 0.0,
+        "api_calls_per_second": round(api_calls / wall, 2) if wall else 0.0,
+        "failed_agents": [r.agent_name for r in results if not r.success],
+    }
+
+
+def print_table(rows: List[Dict[str, Any]]):
+    """Print scenario results as a fixed-width table."""
+    header = f"{'agents':>6} {'conc':>4} {'wall s':>8} {'tool s':>8} {'sleep %':>8} {'calls':>6} {'429s':>5} {'agents/min':>10} {'calls/s':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['agents']:>6} {row['concurrency']:>4} {row['wall_seconds']:>8.2f} "
+            f"{row['tool_seconds']:>8.2f} {row['sleep_share']*100:>7.1f}% {row['api_calls']:>6} "
+            f"{row['throttled']:>5} {row['agents_per_minute']:>10.1f} {row['api_calls_per_second']:>8.1f}"
+        )
+        if row["failed_agents"]:
+            print(f"       failed: {', '.join(row['failed_agents'])}")
+
+
+def compare_to_baseline(rows: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """Return descriptions of scenarios whose wall time regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["agents"], r["concurrency"]): r for r in baseline.get("results", [])}
+    
+    regressions = []
+    for row in rows:
+        before = previous.get((row["agents"], row["concurrency"]))
+        if not before or not before["wall_seconds"]:
+            continue
+        change = row["wall_seconds"] / before["wall_seconds"] - 1
+        if change > tolerance:
+            regressions.append(
+                f"agents={row['agents']} concurrency={row['concurrency']}: "
+                f"{before['wall_seconds']:.2f}s -> {row['wall_seconds']:.2f}s (+{change:.0%})"
+            )
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark pm_core orchestration against a mock API")
+    parser.add_argument("--agents", type=_int_list, default=[1, 3, 6], help="Agent counts, e.g. 1,3,6")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 3], help="Concurrency caps, e.g. 1,3")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock API seconds per response")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="retry-after for injected 429s")
+    parser.add_argument("--transcript", type=str, help="JSON transcript for the mock server")
+    parser.add_argument("--rpm", type=int, default=100000, help="Rate limiter requests/minute budget")
+    parser.add_argument("--seed", type=int, default=1234, help="Seed for 429 injection")
+    parser.add_argument("--json", type=str, help="Write results to this JSON file")
+    parser.add_argument("--baseline", type=str, help="Compare against a previous --json output")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed wall-time growth vs baseline")
+    args = parser.parse_args()
+    
+    transcript = load_transcript(args.transcript) if args.transcript else None
+    state_dir = Path(tempfile.mkdtemp(prefix="pm-bench-"))
+    
+    # Point everything at the mock server and keep benchmark side effects
+    # (tool audit logs, limiter state) out of the project
+    os.environ["ANTHROPIC_API_KEY"] = "mock-key"
+    REPLAY.mode = "off"
+    RATE_LIMIT.requests_per_minute = args.rpm
+    RATE_LIMIT.input_tokens_per_minute = args.rpm * 10000
+    RATE_LIMIT.output_tokens_per_minute = args.rpm * 10000
+    pm_tools.LOGS_DIR = state_dir
+    
+    rows = []
+    with MockAnthropicServer(
+        transcript=transcript,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    ) as server:
+        os.environ["ANTHROPIC_BASE_URL"] = server.base_url
+        print(f"Mock API: {server.base_url} (latency {args.latency}s, 429 rate {args.throttle_rate:.0%})\n")
+        for agent_count in args.agents:
+            for concurrency in args.concurrency:
+                rows.append(run_scenario(server, agent_count, concurrency, state_dir))
+    
+    print_table(rows)
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "settings": {
+                    "latency": args.latency,
+                    "throttle_rate": args.throttle_rate,
+                    "retry_after": args.retry_after,
+                    "streaming": AGENT_CONFIG.streaming,
+                },
+                "results": rows,
+            }, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    
+    if args.baseline:
+        regressions = compare_to_baseline(rows, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ Wall-time regressions beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+PM Checkpoint - Persist run progress so an interrupted run can resume.
+
+Each orchestration run gets an id and a directory under
+PM_STATE_DIR/runs/<run-id>/:
+
+    run.json         agents, their instructions, start time
+    <agent>.json     loop state after the last completed iteration
+                     (messages, counters, usage) and, once the agent's
+                     loop has ended, its AgentResult
+
+Files are written atomically (temp file + rename), so a run killed
+mid-write leaves the previous checkpoint intact. `--resume <run-id>`
+skips agents whose loop ended and continues the others from their last
+completed iteration.
+"""
+
+import copy
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .pm_config import PM_STATE_DIR, ORCHESTRATOR as ORCH_CONFIG
+
+
+RUNS_DIR = PM_STATE_DIR / "runs"
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """Write JSON atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def new_run_id() -> str:
+    """Run id from the current time, e.g. 2026-02-15-080012."""
+    return datetime.now().strftime("%Y-%m-%d-%H%M%S")
+
+
+def list_runs(runs_dir: Optional[Path] = None) -> List[str]:
+    """Run ids with checkpoints, oldest first."""
+    runs_dir = runs_dir or RUNS_DIR
+    if not runs_dir.exists():
+        return []
+    return sorted(p.name for p in runs_dir.iterdir() if (p / "run.json").exists())
+
+
+def prune_runs(keep_days: int, runs_dir: Optional[Path] = None) -> int:
+    """Delete run checkpoints older than keep_days. Returns how many were removed."""
+    runs_dir = runs_dir or RUNS_DIR
+    cutoff = time.time() - keep_days * 86400
+    removed = 0
+    for run_id in list_runs(runs_dir):
+        path = runs_dir / run_id
+        if (path / "run.json").stat().st_mtime < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class AgentCheckpoint:
+    """Checkpoint file of one agent within a run."""
+    
+    def __init__(self, path: Path, agent_name: str):
+        self.path = path
+        self.agent_name = agent_name
+        self._data = _read_json(path) or {"agent": agent_name, "state": None, "result": None}
+    
+    @property
+    def state(self) -> Optional[Dict[str, Any]]:
+        """Loop state saved after the last completed iteration, if any."""
+        return self._data.get("state")
+    
+    @property
+    def result(self) -> Optional[Dict[str, Any]]:
+        return self._data.get("result")
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the agent's loop ended (as opposed to being interrupted)."""
+        state = self.state or {}
+        return bool(state.get("completed")) and self.result is not None
+    
+    def save_state(self, state: Dict[str, Any]):
+        # Snapshot: the caller keeps mutating its lists after this returns
+        self._data["state"] = copy.deepcopy(state)
+        _write_json(self.path, self._data)
+    
+    def save_result(self, result: Dict[str, Any]):
+        self._data["result"] = result
+        _write_json(self.path, self._data)
+
+
+class RunCheckpoint:
+    """All checkpoints of one orchestration run."""
+    
+    def __init__(self, run_id: str, runs_dir: Optional[Path] = None):
+        self.run_id = run_id
+        self.run_dir = (runs_dir or RUNS_DIR) / run_id
+        self._agents: Dict[str, AgentCheckpoint] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def exists(self) -> bool:
+        return (self.run_dir / "run.json").exists()
+    
+    def load_meta(self) -> Dict[str, Any]:
+        return _read_json(self.run_dir / "run.json") or {}
+    
+    def save_meta(self, meta: Dict[str, Any]):
+        _write_json(self.run_dir / "run.json", {"run_id": self.run_id, **meta})
+    
+    def for_agent(self, agent_name: str) -> AgentCheckpoint:
+        with self._lock:
+            if agent_name not in self._agents:
+                self._agents[agent_name] = AgentCheckpoint(self.run_dir / f"{agent_name}.json", agent_name)
+            return self._agents[agent_name]
+    
+    def finished_results(self, agent_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Saved results of agents whose loop already ended."""
+        finished = {}
+        for name in agent_names:
+            checkpoint = self.for_agent(name)
+            if checkpoint.finished:
+                finished[name] = checkpoint.result
+        return finished
+
+
+def open_run(run_id: Optional[str] = None) -> RunCheckpoint:
+    """Checkpoint for a new run, or an existing one to resume.
+    
+    run_id "latest" resumes the most recent run. Raises ValueError if the
+    run to resume has no checkpoint.
+    """
+    if run_id is None:
+        prune_runs(ORCH_CONFIG.checkpoint_keep_days)
+        return RunCheckpoint(new_run_id())
+    
+    if run_id == "latest":
+        runs = list_runs()
+        if not runs:
+            raise ValueError("No checkpointed runs to resume")
+        run_id = runs[-1]
+    
+    checkpoint = RunCheckpoint(run_id)
+    if not checkpoint.exists:
+        raise ValueError(f"No checkpoint for run {run_id} (available: {', '.join(list_runs()[-5:]) or 'none'})")
+    return checkpoint
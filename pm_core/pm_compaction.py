@@ -0,0 +1,142 @@
+"""
+PM Compaction - Keep agent conversation history bounded.
+
+Every tool result stays in `messages` and is resent on each later API
+call, so a few `read_file` results can dominate the payload of a long
+tool-use loop. Once the history passes a token threshold, stale tool
+results (and large tool inputs such as `write_file` content) are replaced
+with short summaries, while the most recent turns are kept verbatim.
+
+Messages are only rewritten, never dropped, so every tool_use block keeps
+its matching tool_result.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+from .pm_ratelimit import estimate_tokens
+
+
+# Tool results/inputs shorter than this are cheaper to keep than to stub
+MIN_COMPACT_CHARS = 400
+
+# Marker so already-compacted results are left alone
+COMPACTED_KEY = "compacted"
+
+
+def _summarize_result(tool_name: str, tool_input: Dict[str, Any], content: str) -> str:
+    """Build a one-line stand-in for a tool result."""
+    try:
+        result = json.loads(content)
+    except (TypeError, ValueError):
+        result = None
+    
+    if not isinstance(result, dict):
+        summary = f"{len(content)} chars omitted: {content[:150]}"
+    elif "error" in result:
+        summary = f"error: {str(result['error'])[:200]}"
+    elif tool_name == "read_file":
+        summary = (
+            f"read {result.get('path', tool_input.get('path', '?'))} "
+            f"({result.get('lines', '?')} lines); content omitted, call read_file again if needed"
+        )
+    elif tool_name == "read_files":
+        paths = [entry.get("path", "?") for entry in result.get("files", [])]
+        summary = (
+            f"read {len(paths)} files ({', '.join(paths[:5])}{', ...' if len(paths) > 5 else ''}); "
+            f"content omitted, call read_files again if needed"
+        )
+    elif tool_name == "search_codebase":
+        matches = result.get("matches", [])
+        summary = f"{result.get('count', len(matches))} matches, first: {matches[:3]}"
+    elif tool_name in ("run_command", "run_tests", "run_lint"):
+        output = result.get("stdout", "")
+        summary = (
+            f"exit_code={result.get('exit_code')}, "
+            f"output tail: {output[-200:]}"
+        )
+    elif tool_name == "git_diff":
+        summary = f"diff of {len(result.get('diff', ''))} chars omitted"
+    else:
+        summary = json.dumps(result)[:200]
+    
+    # Spooled output stays readable after compaction
+    handle = isinstance(result, dict) and (result.get("output_handle") or result.get("stdout_handle"))
+    if handle:
+        summary += f" (full output: read_output handle={handle})"
+    
+    return json.dumps({COMPACTED_KEY: True, "tool": tool_name, "summary": summary})
+
+
+def _compact_input(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Shorten large string arguments (e.g. write_file content, multi_edit edits)."""
+    compacted = {}
+    for key, value in tool_input.items():
+        if isinstance(value, str) and len(value) > MIN_COMPACT_CHARS:
+            compacted[key] = f"{value[:100]}... [{len(value)} chars compacted]"
+        elif isinstance(value, list):
+            compacted[key] = [_compact_input(item) if isinstance(item, dict) else item for item in value]
+        else:
+            compacted[key] = value
+    return compacted
+
+
+def compact_messages(
+    messages: List[Dict[str, Any]],
+    threshold_tokens: int,
+    keep_recent: int,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Compact stale tool traffic once history exceeds `threshold_tokens`.
+    
+    The first message (the task instructions) and the last `keep_recent`
+    messages are never touched. Everything in between has large tool
+    results replaced by summaries and large tool inputs shortened. All
+    eligible messages are compacted in one pass, so the prompt-cache prefix
+    is only invalidated occasionally rather than on every iteration.
+    
+    Returns the (possibly new) message list and the tool_use ids whose
+    results were compacted.
+    """
+    if estimate_tokens(messages) <= threshold_tokens:
+        return messages, []
+    
+    # Map tool_use ids to the call that produced them
+    calls: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for message in messages:
+        if message["role"] == "assistant" and isinstance(message["content"], list):
+            for block in message["content"]:
+                if block.get("type") == "tool_use":
+                    calls[block["id"]] = (block["name"], block.get("input") or {})
+    
+    stale_end = max(1, len(messages) - keep_recent)
+    compacted_ids: List[str] = []
+    result: List[Dict[str, Any]] = [messages[0]]
+    
+    for message in messages[1:stale_end]:
+        content = message["content"]
+        if not isinstance(content, list):
+            result.append(message)
+            continue
+        
+        new_content = []
+        for block in content:
+            block_type = block.get("type")
+            
+            if block_type == "tool_result":
+                text = block.get("content")
+                if isinstance(text, str) and len(text) > MIN_COMPACT_CHARS and COMPACTED_KEY not in text[:20]:
+                    name, tool_input = calls.get(block["tool_use_id"], ("unknown", {}))
+                    block = {**block, "content": _summarize_result(name, tool_input, text)}
+                    compacted_ids.append(block["tool_use_id"])
+            
+            elif block_type == "tool_use":
+                tool_input = block.get("input") or {}
+                if len(json.dumps(tool_input)) > MIN_COMPACT_CHARS:
+                    block = {**block, "input": _compact_input(tool_input)}
+            
+            new_content.append(block)
+        
+        result.append({**message, "content": new_content})
+    
+    result.extend(messages[stale_end:])
+    return result, compacted_ids
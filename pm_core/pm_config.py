@@ -3,9 +3,10 @@ PM Configuration - Settings and safety guardrails for autonomous agents.
 """
 
 import os
+from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -13,6 +14,8 @@ PM_AGENTS_DIR = PROJECT_ROOT / "docs" / "pm-agents"
 AGENTS_DIR = PM_AGENTS_DIR / "agents"
 REPORTS_DIR = PM_AGENTS_DIR / "reports"
 LOGS_DIR = PROJECT_ROOT / "logs"
+# Runtime state shared between orchestrator processes (rate limits, caches)
+PM_STATE_DIR = PROJECT_ROOT / ".pm-state"
 
 @dataclass
 class SafetyConfig:
@@ -29,6 +32,7 @@ class SafetyConfig:
         "credentials",
         "secrets",
         ".ssh/",
+        ".pm-state/",
     })
     
     # File patterns agents CANNOT modify
@@ -96,6 +100,23 @@ class AgentConfig:
     # Options: "claude-sonnet-4-20250514" (best), "claude-3-haiku-20240307" (fast/cheap)
     model: str = "claude-3-haiku-20240307"  # Use Haiku for better rate limits
     
+    # Stronger model for iterations the router judges hard (see pm_router.py)
+    strong_model: str = "claude-sonnet-4-20250514"
+    
+    # Route hard iterations to strong_model and the rest to `model`.
+    # Off by default: strong_model costs more, and RATE_LIMIT is sized for
+    # the fast model's budget.
+    model_routing: bool = False
+    
+    # While one of `model` / strong_model is throttled, send calls to the
+    # other instead of waiting out the retry-after. Off by default for the
+    # same cost and budget reasons; fallback calls are listed in reports.
+    throttle_fallback: bool = False
+    
+    # Routing score needed for strong_model (large task +2/+3, earlier tool
+    # errors +2, many files touched +1, acting on file reads +1)
+    strong_model_threshold: int = 3
+    
     # Maximum tokens for agent responses
     max_tokens: int = 2048  # Reduced to stay under limits
     
@@ -105,17 +126,177 @@ class AgentConfig:
     # Maximum iterations per agent task
     max_iterations: int = 5  # Reduced for efficiency
     
+    # Once conversation history passes this many (estimated) tokens, stale
+    # tool results are replaced with short summaries
+    compaction_threshold_tokens: int = 30000
+    
+    # Most recent messages always kept verbatim during compaction
+    compaction_keep_recent: int = 4
+    
     # Timeout for each agent run (seconds)
     timeout: int = 300
     
-    # Whether to run agents in parallel
+    # Stream responses and start each tool call as soon as its block is
+    # complete, instead of waiting for the whole response
+    streaming: bool = True
+    
+    # Repeat read_file calls return "unchanged since <tool_use>" or a diff
+    # against the earlier result instead of the whole file again
+    dedupe_reads: bool = True
+    
+    # Combined size of file contents one read_files call may return; files
+    # past it are listed as omitted
+    read_files_budget: int = 60000
+    
+    # Total size of file contents kept in memory for read_file, shared by
+    # all agents (entries are dropped when the file's size or mtime changes)
+    file_cache_bytes: int = 20 * 1024 * 1024
+    
+    # Max read-only tool calls (read_file, search_codebase, ...) from one
+    # response running at once; mutating tools always run in order
+    max_parallel_tools: int = 4
+    
+    # Mark the shared system prompt and conversation history with
+    # cache_control so repeated prefixes are served from the prompt cache
+    prompt_caching: bool = True
+    
+    # Tools each agent may use; agents not listed get every tool. A
+    # "**Tools**" row in the agent's AGENT.md identity table overrides this.
+    # Calls to other tools are refused (see tool_subsets_in_requests).
+    agent_tools: Dict[str, List[str]] = field(default_factory=lambda: {
+        "PM-Research": [
+            "read_file", "read_files", "write_file", "search_codebase", "list_directory",
+            "update_backlog", "create_handoff", "log_work",
+        ],
+        "PM-QA": [
+            "read_file", "read_files", "search_codebase", "list_directory", "run_command",
+            "run_tests", "run_lint", "git_status", "git_diff", "read_output",
+            "update_backlog", "create_handoff", "log_work",
+        ],
+    })
+    
+    # Send agents listed in agent_tools (or with a "**Tools**" row) only
+    # their own tools. An agent whose subset would make the cached prefix
+    # (tools + shared system prompt) shorter than the model's minimum
+    # cacheable length (MIN_CACHEABLE_TOKENS) is sent the full list instead.
+    tool_subsets_in_requests: bool = True
+    
+    # Whether to run agents in parallel (up to ORCHESTRATOR.max_agents_per_run at once)
     parallel_execution: bool = False  # Sequential for rate limit safety
+
+
+# List prices in USD per million tokens as (input, output), matched by the
+# longest prefix of the model name. Used for the cost estimates in reports.
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-haiku-4-5": (1.00, 5.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-opus-4": (15.00, 75.00),
+    "claude-opus-4-5": (5.00, 25.00),
+}
+
+# Shortest prompt prefix the API will cache, in tokens, matched by the
+# longest prefix of the model name (1024 for models not listed)
+MIN_CACHEABLE_TOKENS: Dict[str, int] = {
+    "claude-3-haiku": 2048,
+    "claude-3-5-haiku": 2048,
+    "claude-haiku-4-5": 4096,
+    "claude-opus-4-5": 4096,
+}
+
+# Prompt cache writes and reads are billed relative to the input price
+CACHE_WRITE_PRICE_MULTIPLIER = 1.25
+CACHE_READ_PRICE_MULTIPLIER = 0.1
+
+# Message Batches are billed at half the standard price
+BATCH_PRICE_MULTIPLIER = 0.5
+
+
+@dataclass
+class RateLimitConfig:
+    """Shared API budget for all agents and orchestrator processes on this host.
+    
+    Defaults match the Anthropic tier-1 limits for Haiku; raise them to
+    your organization's limits.
+    """
     
-    # Delay between API calls (seconds) for rate limit protection
-    api_call_delay: int = 2
+    # Turn the shared limiter off entirely (e.g. against a local stub server)
+    enabled: bool = True
     
-    # Delay between agents (seconds)
-    inter_agent_delay: int = 30
+    # Requests per minute
+    requests_per_minute: int = 50
+    
+    # Input tokens per minute
+    input_tokens_per_minute: int = 50000
+    
+    # Output tokens per minute (reserved at max_tokens, corrected after each call)
+    output_tokens_per_minute: int = 10000
+    
+    # Bucket state file shared across processes (default: PM_STATE_DIR/ratelimit.json)
+    state_file: Optional[Path] = None
+    
+    # AIMD window on in-flight requests per process: halves on 429/529,
+    # grows back by ~1 per window of successful calls
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 16
+    
+    # Retries per API call when throttled
+    max_retries: int = 5
+    
+    # Backoff when the server gives no retry-after (seconds, jittered)
+    backoff_base: float = 2.0
+    backoff_cap: float = 60.0
+
+
+@dataclass
+class ReplayConfig:
+    """Record/replay cache for Claude API responses (see pm_replay.py)."""
+    
+    # "off", "record" (serve hits, store misses) or "replay" (hits only, for CI)
+    mode: str = field(default_factory=lambda: os.environ.get("PM_REPLAY_MODE", "off"))
+    
+    # Where responses are stored (default: PM_STATE_DIR/replay)
+    cache_dir: Optional[Path] = None
+    
+    # Least recently used responses are evicted beyond this size
+    max_bytes: int = 500 * 1024 * 1024
+
+
+@dataclass
+class BatchConfig:
+    """Message Batches API for work that needs no tool loop (see pm_batch.py)."""
+    
+    # Plan every agent's task, and summarize their results, in one batch each
+    enabled: bool = False
+    
+    # Seconds between batch status checks
+    poll_interval: float = 10.0
+    
+    # Give up on a batch (and cancel it) after this many seconds; the run
+    # carries on with default instructions and unsummarized results
+    timeout: float = 900.0
+    
+    # Max tokens for planning and summary replies
+    max_tokens: int = 400
+
+
+@dataclass
+class AuditConfig:
+    """Tool audit log, logs/pm-tools-YYYY-MM-DD.jsonl (see pm_audit.py)."""
+    
+    # String inputs longer than this are logged as their sha256 and length,
+    # not their text
+    inline_chars: int = 1000
+    
+    # Entries are written in batches of up to this many...
+    flush_entries: int = 256
+    
+    # ...and never wait longer than this (seconds) to be written
+    flush_seconds: float = 1.0
 
 
 @dataclass
@@ -153,17 +334,57 @@ class OrchestratorConfig:
     # Maximum runtime for entire orchestration (seconds)
     max_runtime: int = 3600  # 1 hour
     
+    # Agents not yet started when less than this much of max_runtime is
+    # left are skipped (lowest priority first, since agents start in order)
+    min_agent_seconds: int = 60
+    
     # Where to save daily reports
     report_to_desktop: bool = True
     desktop_path: Path = Path.home() / "Desktop"
     
-    # Rate limit protection: max agents per run
+    # Rate limit protection: max agents running at once when
+    # AGENT.parallel_execution is enabled
     max_agents_per_run: int = 3  # Run 3 at a time to stay under limits
+    
+    # In sequential runs, prepare the next agent (prompts, files its
+    # backlog mentions, API connection) while the current one runs
+    prewarm_next_agent: bool = True
+    
+    # Most backlog-mentioned files read ahead per agent
+    prewarm_max_files: int = 20
+    
+    # Days to keep per-run checkpoints (PM_STATE_DIR/runs) for --resume
+    checkpoint_keep_days: int = 7
+    
+    # Earlier days' logs are compressed at the start of each run:
+    # "gzip", or "zstd" (needs the zstandard package, else gzip is used)
+    log_compression: str = "gzip"
+    
+    # Days to keep compressed logs and their indexes (see pm_logs.py)
+    log_keep_days: int = 90
+    
+    # Parallel runs start agents so their combined input tokens/minute stay
+    # within this share of RATE_LIMIT.input_tokens_per_minute (see pm_scheduler.py)
+    token_budget_utilization: float = 0.9
+    
+    # How agent prompts are sized before the run: "estimate" (local,
+    # ~4 chars per token) or "api" (count_tokens endpoint, exact)
+    preflight_token_count: str = "estimate"
+    
+    # Conversation history each iteration adds to an agent's prompt
+    expected_tokens_per_iteration: int = 1500
+    
+    # API calls per minute of one running agent, until measured in the run
+    expected_calls_per_minute: float = 6.0
 
 
 # Global configuration instances
 SAFETY = SafetyConfig()
 AGENT = AgentConfig()
+RATE_LIMIT = RateLimitConfig()
+REPLAY = ReplayConfig()
+BATCH = BatchConfig()
+AUDIT = AuditConfig()
 ORCHESTRATOR = OrchestratorConfig()
 
 
@@ -206,6 +427,11 @@ def is_command_safe(command: str) -> bool:
     return True
 
 
+def get_run_date() -> str:
+    """Date shown to agents. Set PM_RUN_DATE to pin it for reproducible replays."""
+    return os.environ.get("PM_RUN_DATE") or datetime.now().strftime('%Y-%m-%d')
+
+
 def get_api_key() -> str:
     """Get the Anthropic API key from environment."""
     key = os.environ.get("ANTHROPIC_API_KEY")
@@ -0,0 +1,60 @@
+"""
+PM Deadline - Time budgets passed down from the run to agents, API calls and tools.
+
+The orchestration run has a deadline (ORCHESTRATOR.max_runtime). Each
+agent gets its own (AGENT.timeout) that never outlasts the run's, and
+everything that can block takes its time limit from the agent's deadline:
+rate-limiter waits, retry sleeps, API calls (streams are closed when time
+runs out) and tool subprocesses (killed when time runs out).
+"""
+
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work is cut off because its deadline passed."""
+
+
+class Deadline:
+    """A point in time, optionally bounded by a parent deadline.
+    
+    Args:
+        seconds: budget from now (None: no limit of its own)
+        parent: a deadline this one can never outlast
+    """
+    
+    def __init__(self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None):
+        self.started = time.monotonic()
+        self._at = self.started + seconds if seconds is not None else None
+        if parent is not None and parent._at is not None:
+            self._at = parent._at if self._at is None else min(self._at, parent._at)
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None if unlimited."""
+        if self._at is None:
+            return None
+        return max(0.0, self._at - time.monotonic())
+    
+    @property
+    def expired(self) -> bool:
+        return self._at is not None and time.monotonic() >= self._at
+    
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+    
+    def cap(self, timeout: Optional[float]) -> Optional[float]:
+        """A timeout shortened so it ends no later than this deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+    
+    def sleep(self, seconds: float) -> bool:
+        """Sleep, but not past the deadline. Returns False if it has passed."""
+        seconds = self.cap(seconds)
+        if seconds > 0:
+            time.sleep(seconds)
+        return not self.expired
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+PM Logs - Rotation, compression and indexed queries for logs/.
+
+logs/ gets a pm-tools-YYYY-MM-DD.jsonl (tool audit log) and an
+orchestrator-YYYY-MM-DD.log every day. At the start of each run, earlier
+days' files are compressed (ORCHESTRATOR.log_compression) and deleted
+once older than ORCHESTRATOR.log_keep_days. An orchestrator log that a
+running orchestrator still writes to (it holds a shared flock on it) is
+left for a later run. Compressing a tool log also
+writes a small sidecar, pm-tools-YYYY-MM-DD.index.json, with call counts,
+failures and durations per agent, tool and outcome. Queries over days
+read only those indexes (plus today's uncompressed log), and listing
+entries only decompresses days whose index has a match.
+
+Usage:
+    python -m pm_core.pm_logs query --agent PM-QA --days 30 --sort avg
+    python -m pm_core.pm_logs query --by agent --tool run_tests
+    python -m pm_core.pm_logs query --agent PM-QA --tool run_tests --failed --entries
+    python -m pm_core.pm_logs rotate
+    python -m pm_core.pm_logs prune --keep-days 30
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pm_core.pm_config import LOGS_DIR, ORCHESTRATOR as ORCH_CONFIG
+
+
+# Bump when the index layout changes; older indexes are rebuilt on query
+INDEX_VERSION = 1
+
+# pm-tools-2026-02-15.jsonl, orchestrator-2026-02-15.log.gz, ...
+_LOG_NAME = re.compile(r"^(pm-tools|orchestrator)-(\d{4}-\d{2}-\d{2})\.(jsonl|log)(\.gz|\.zst)?$")
+
+SORT_KEYS = ("avg", "max", "total", "calls", "failed")
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """Write JSON atomically."""
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _compression() -> str:
+    if ORCH_CONFIG.log_compression == "zstd" and zstandard is not None:
+        return ".zst"
+    return ".gz"
+
+
+def _compress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data)
+
+
+def _open_text(path: Path) -> io.TextIOBase:
+    """A log file as text, decompressing .gz/.zst (which may hold several frames)."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", errors="replace")
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} is zstd-compressed; install zstandard to read it")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        return io.TextIOWrapper(reader, errors="replace")
+    return open(path, errors="replace")
+
+
+def _group_key(entry: Dict[str, Any]) -> str:
+    return f"{entry.get('agent')}|{entry.get('tool')}|{bool(entry.get('success'))}"
+
+
+def build_index(lines: Iterator[str], day: str) -> Dict[str, Any]:
+    """Per agent/tool/outcome counts and durations of one day's tool log."""
+    groups: Dict[str, Dict[str, Any]] = {}
+    entries = 0
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        entries += 1
+        group = groups.setdefault(_group_key(entry), {
+            "agent": entry.get("agent"),
+            "tool": entry.get("tool"),
+            "success": bool(entry.get("success")),
+            "count": 0,
+            "timed": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+        })
+        group["count"] += 1
+        # Entries logged before durations were recorded have none
+        if isinstance(entry.get("duration_ms"), (int, float)):
+            group["timed"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+    return {"version": INDEX_VERSION, "date": day, "entries": entries, "groups": list(groups.values())}
+
+
+def merge_indexes(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """One index covering the entries of both."""
+    groups = {_group_key(group): dict(group) for group in first["groups"]}
+    for group in second["groups"]:
+        merged = groups.setdefault(_group_key(group), {**group, "count": 0, "timed": 0, "total_ms": 0.0, "max_ms": 0.0})
+        merged["count"] += group["count"]
+        merged["timed"] += group["timed"]
+        merged["total_ms"] += group["total_ms"]
+        merged["max_ms"] = max(merged["max_ms"], group["max_ms"])
+    return {
+        "version": INDEX_VERSION,
+        "date": first["date"],
+        "entries": first["entries"] + second["entries"],
+        "groups": list(groups.values()),
+    }
+
+
+def _index_path(logs_dir: Path, day: str) -> Path:
+    return logs_dir / f"pm-tools-{day}.index.json"
+
+
+def _read_index(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == INDEX_VERSION else None
+
+
+def _log_files(logs_dir: Path) -> Iterator[tuple]:
+    """(path, kind, day, compressed) of every daily log in logs_dir."""
+    if not logs_dir.exists():
+        return
+    for path in sorted(logs_dir.iterdir()):
+        match = _LOG_NAME.match(path.name)
+        if match:
+            yield path, match.group(1), match.group(2), bool(match.group(4))
+
+
+def _rotate(path: Path, kind: str, day: str, logs_dir: Path) -> bool:
+    """Compress one day's log (indexing tool logs), then delete it.
+    
+    Returns False, leaving the file alone, if a running orchestrator still
+    has it open.
+    """
+    suffix = _compression()
+    fd = os.open(path, os.O_RDWR)
+    try:
+        if fcntl is None:
+            pass
+        elif kind == "orchestrator":
+            # Loggers hold a shared lock for as long as they run
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+        else:
+            # Audit writers append whole batches under the same lock
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        with os.fdopen(os.dup(fd), "rb") as f:
+            data = f.read()
+        if not data and fcntl is None:
+            return False
+        
+        if kind == "pm-tools":
+            index = build_index(data.decode("utf-8", errors="replace").splitlines(), day)
+            existing = _read_index(_index_path(logs_dir, day))
+            if existing is not None:
+                index = merge_indexes(existing, index)
+        
+        # A log that reappeared after its day was rotated is appended as
+        # another frame; both gzip and zstd read concatenated frames
+        target = path.with_name(path.name + suffix)
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as out:
+            if target.exists():
+                out.write(target.read_bytes())
+            out.write(_compress(data, suffix))
+        os.replace(tmp_path, target)
+        if kind == "pm-tools":
+            _write_json(_index_path(logs_dir, day), index)
+        if fcntl is None and kind == "orchestrator":
+            # Can't tell whether a logger still has it open: copy-truncate
+            os.ftruncate(fd, 0)
+        else:
+            path.unlink()
+        return True
+    finally:
+        os.close(fd)
+
+
+def rotate_logs(logs_dir: Optional[Path] = None, today: Optional[date] = None) -> int:
+    """Compress logs of days before today. Returns how many files were compressed."""
+    logs_dir = logs_dir or LOGS_DIR
+    today = (today or date.today()).isoformat()
+    rotated = 0
+    for path, kind, day, compressed in list(_log_files(logs_dir)):
+        if compressed or day >= today:
+            continue
+        try:
+            if _rotate(path, kind, day, logs_dir):
+                rotated += 1
+        except OSError as e:
+            print(f"⚠️ Could not rotate {path.name}: {e}", file=sys.stderr)
+    return rotated
+
+
+def prune_logs(keep_days: int, logs_dir: Optional[Path] = None, today: Optional[date] = None) -> int:
+    """Delete compressed logs and indexes older than keep_days. Returns how many files were removed."""
+    logs_dir = logs_dir or LOGS_DIR
+    cutoff = ((today or date.today()) - timedelta(days=keep_days)).isoformat()
+    removed = 0
+    for path, kind, day, compressed in list(_log_files(logs_dir)):
+        if compressed and day < cutoff:
+            path.unlink(missing_ok=True)
+            _index_path(logs_dir, day).unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def _tool_logs(logs_dir: Path, days: int, today: Optional[date] = None) -> Dict[str, List[Path]]:
+    """day -> that day's tool log files (rotated and/or live) within the last `days` days."""
+    since = ((today or date.today()) - timedelta(days=days - 1)).isoformat()
+    by_day: Dict[str, List[Path]] = {}
+    for path, kind, day, compressed in _log_files(logs_dir):
+        if kind == "pm-tools" and day >= since:
+            by_day.setdefault(day, []).append(path)
+    return by_day
+
+
+def day_index(logs_dir: Path, day: str, paths: List[Path]) -> Dict[str, Any]:
+    """A day's index: the sidecar for its compressed log, built on the fly for the rest."""
+    index = {"version": INDEX_VERSION, "date": day, "entries": 0, "groups": []}
+    compressed = [path for path in paths if path.suffix in (".gz", ".zst")]
+    # One sidecar covers all of a day's compressed files
+    stored = _read_index(_index_path(logs_dir, day)) if compressed else None
+    if stored is not None:
+        index = merge_indexes(index, stored)
+    for path in paths:
+        if stored is not None and path in compressed:
+            continue
+        with _open_text(path) as f:
+            index = merge_indexes(index, build_index(f, day))
+    return index
+
+
+def _matches(group: Dict[str, Any], agent: Optional[str], tool: Optional[str], failed: bool) -> bool:
+    return (
+        (agent is None or group["agent"] == agent)
+        and (tool is None or group["tool"] == tool)
+        and (not failed or not group["success"])
+    )
+
+
+def summarize(
+    logs_dir: Optional[Path] = None,
+    days: int = 30,
+    agent: Optional[str] = None,
+    tool: Optional[str] = None,
+    failed: bool = False,
+    by: str = "tool",
+    sort: str = "avg",
+    today: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Tool call stats over the last `days` days, one row per tool (or agent), sorted descending."""
+    logs_dir = logs_dir or LOGS_DIR
+    rows: Dict[str, Dict[str, Any]] = {}
+    for day, paths in _tool_logs(logs_dir, days, today).items():
+        for group in day_index(logs_dir, day, paths)["groups"]:
+            if not _matches(group, agent, tool, failed):
+                continue
+            row = rows.setdefault(group[by], {by: group[by], "calls": 0, "failed": 0, "timed": 0, "total_ms": 0.0, "max_ms": 0.0})
+            row["calls"] += group["count"]
+            row["failed"] += 0 if group["success"] else group["count"]
+            row["timed"] += group["timed"]
+            row["total_ms"] += group["total_ms"]
+            row["max_ms"] = max(row["max_ms"], group["max_ms"])
+    
+    for row in rows.values():
+        row["avg_ms"] = row["total_ms"] / row["timed"] if row["timed"] else 0.0
+    sort_field = {"avg": "avg_ms", "max": "max_ms", "total": "total_ms"}.get(sort, sort)
+    return sorted(rows.values(), key=lambda row: row[sort_field], reverse=True)
+
+
+def entries(
+    logs_dir: Optional[Path] = None,
+    days: int = 30,
+    agent: Optional[str] = None,
+    tool: Optional[str] = None,
+    failed: bool = False,
+    today: Optional[date] = None
+) -> Iterator[Dict[str, Any]]:
+    """Matching log entries, oldest first. Days whose index has no match are not read."""
+    logs_dir = logs_dir or LOGS_DIR
+    for day, paths in sorted(_tool_logs(logs_dir, days, today).items()):
+        if not any(_matches(group, agent, tool, failed) for group in day_index(logs_dir, day, paths)["groups"]):
+            continue
+        for path in paths:
+            with _open_text(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    group = {"agent": entry.get("agent"), "tool": entry.get("tool"), "success": bool(entry.get("success"))}
+                    if _matches(group, agent, tool, failed):
+                        yield entry
+
+
+def _print_summary(rows: List[Dict[str, Any]], by: str, limit: int):
+    if not rows:
+        print("No matching tool calls.")
+        return
+    print(f"{by:<24} {'calls':>7} {'failed':>7} {'avg ms':>9} {'max ms':>9} {'total s':>9}")
+    print("-" * 70)
+    for row in rows[:limit]:
+        print(
+            f"{str(row[by]):<24} {row['calls']:>7} {row['failed']:>7} "
+            f"{row['avg_ms']:>9.1f} {row['max_ms']:>9.1f} {row['total_ms'] / 1000:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rotate, prune and query PM logs")
+    parser.add_argument("--logs-dir", type=Path, default=LOGS_DIR, help="Logs directory (default: logs/)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    query = commands.add_parser("query", help="Tool call stats (or entries) over recent days")
+    query.add_argument("--agent", help="Only this agent's calls")
+    query.add_argument("--tool", help="Only calls of this tool")
+    query.add_argument("--failed", action="store_true", help="Only failed calls")
+    query.add_argument("--days", type=int, default=30, help="Days to look back, including today (default: 30)")
+    query.add_argument("--by", choices=("tool", "agent"), default="tool", help="Row per tool or per agent")
+    query.add_argument("--sort", choices=SORT_KEYS, default="avg", help="Sort rows by (descending, default: avg)")
+    query.add_argument("--limit", type=int, default=20, help="Rows or entries to show (default: 20)")
+    query.add_argument("--entries", action="store_true", help="List matching entries instead of stats")
+    
+    commands.add_parser("rotate", help="Compress and index logs of earlier days")
+    
+    prune = commands.add_parser("prune", help="Delete old compressed logs")
+    prune.add_argument("--keep-days", type=int, default=ORCH_CONFIG.log_keep_days)
+    
+    args = parser.parse_args()
+    
+    if args.command == "rotate":
+        print(f"Compressed {rotate_logs(args.logs_dir)} log file(s)")
+    elif args.command == "prune":
+        print(f"Removed {prune_logs(args.keep_days, args.logs_dir)} log file(s)")
+    elif args.entries:
+        shown = 0
+        for entry in entries(args.logs_dir, args.days, args.agent, args.tool, args.failed):
+            print(json.dumps(entry))
+            shown += 1
+            if shown >= args.limit:
+                break
+    else:
+        rows = summarize(args.logs_dir, args.days, args.agent, args.tool, args.failed, args.by, args.sort)
+        _print_summary(rows, args.by, args.limit)
+
+
+if __name__ == "__main__":
+    main()
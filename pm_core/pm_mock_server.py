@@ -0,0 +1,416 @@
+"""
+PM Mock Server - Local stand-in for the Anthropic Messages API.
+
+Replays a scripted tool-use transcript so the orchestrator can be driven
+end to end without network access or API quota. Used by pm_bench.py and
+handy for manual testing:
+
+    python -m pm_core.pm_mock_server --port 8765 --latency 0.5 --throttle-rate 0.1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=mock \\
+        python -m pm_core.pm_orchestrator --agents PM-QA
+
+Each conversation advances through the transcript by counting the
+assistant turns already in the request, so any number of agents can use
+the server at once. Requests without tools get a plain text reply.
+Supports plain and streamed (SSE) responses, 429 injection with
+retry-after, anthropic-ratelimit-* headers, the Message Batches
+endpoints (batches end `batch_latency` seconds after creation), and a
+one-model /v1/models list (used to open connections ahead of time).
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+# Default transcript: one turn of read-only exploration, one log_work, then
+# done. Only uses tools every agent is allowed (see AGENT.agent_tools).
+DEFAULT_TRANSCRIPT: List[List[Dict[str, Any]]] = [
+    [
+        {"type": "text", "text": "I'll start by looking at the project layout."},
+        {"type": "tool_use", "name": "read_file", "input": {"path": "package.json"}},
+        {"type": "tool_use", "name": "list_directory", "input": {"path": "pm_core"}},
+        {"type": "tool_use", "name": "search_codebase", "input": {"pattern": "def run", "file_pattern": "*.py"}},
+    ],
+    [
+        {"type": "text", "text": "Logging what I found."},
+        {"type": "tool_use", "name": "log_work", "input": {"summary": "Reviewed project layout"}},
+    ],
+    [
+        {"type": "text", "text": "Done for today."},
+    ],
+]
+
+# Reply to requests sent without tools (planning, summaries)
+DEFAULT_TEXT_REPLY = "I'll work on the first Ready task in my backlog."
+
+
+def _sleep(seconds: float):
+    # Not time.sleep, so benchmarks that instrument time.sleep only see
+    # the orchestrator's own sleeps
+    if seconds > 0:
+        threading.Event().wait(seconds)
+
+
+class MockAnthropicServer:
+    """Threaded HTTP server speaking enough of the Messages API for pm_core.
+    
+    Args:
+        transcript: list of turns; each turn is a list of content blocks
+            (tool_use blocks need no id, one is generated)
+        latency: seconds per response; half before the first byte, the
+            rest spread across streamed content blocks
+        throttle_rate: probability (0-1) of answering with a 429
+        retry_after: retry-after seconds sent with injected 429s
+        seed: random seed for reproducible 429 injection
+        batch_latency: seconds before a message batch reports "ended"
+    """
+    
+    def __init__(
+        self,
+        transcript: Optional[List[List[Dict[str, Any]]]] = None,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+        batch_latency: float = 0.0,
+    ):
+        self.transcript = transcript or DEFAULT_TRANSCRIPT
+        self.batch_latency = batch_latency
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "throttled": 0, "streamed": 0, "batches": 0, "batch_requests": 0, "model_lists": 0}
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        
+        server = self
+        
+        class Handler(_MockHandler):
+            mock = server
+        
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> "MockAnthropicServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+    
+    def __enter__(self) -> "MockAnthropicServer":
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+    
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+    
+    def should_throttle(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.throttle_rate
+    
+    def build_message(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Next scripted assistant message for the conversation in `body`."""
+        turn = sum(1 for m in body.get("messages", []) if m.get("role") == "assistant")
+        if not body.get("tools"):
+            blocks = [{"type": "text", "text": DEFAULT_TEXT_REPLY}]
+        elif turn < len(self.transcript):
+            blocks = self.transcript[turn]
+        else:
+            blocks = [{"type": "text", "text": "Done."}]
+        
+        content = []
+        for i, block in enumerate(blocks):
+            block = dict(block)
+            if block["type"] == "tool_use":
+                block.setdefault("id", f"toolu_mock_{turn}_{i}")
+                block.setdefault("input", {})
+            content.append(block)
+        
+        has_tools = any(b["type"] == "tool_use" for b in content)
+        output_tokens = sum(len(json.dumps(b)) for b in content) // 4 + 1
+        return {
+            "id": f"msg_mock_{turn}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "mock"),
+            "content": content,
+            "stop_reason": "tool_use" if has_tools else "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": len(json.dumps(body)) // 4,
+                "output_tokens": output_tokens,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        }
+    
+    def create_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a batch's requests; results are built when it is fetched."""
+        with self._lock:
+            batch_id = f"msgbatch_mock_{len(self._batches)}"
+            self._batches[batch_id] = {
+                "created": time.time(),
+                "requests": body.get("requests", []),
+                "canceled": False,
+            }
+            self.stats["batches"] += 1
+            self.stats["batch_requests"] += len(body.get("requests", []))
+        return self.batch_status(batch_id)
+    
+    def batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """MessageBatch object for a stored batch, or None if unknown."""
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            return None
+        
+        created = datetime.fromtimestamp(batch["created"], timezone.utc)
+        ended = batch["canceled"] or time.time() - batch["created"] >= self.batch_latency
+        count = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended and not batch["canceled"] else 0,
+                "errored": 0,
+                "canceled": count if batch["canceled"] else 0,
+                "expired": 0,
+            },
+            "created_at": created.isoformat(),
+            "expires_at": (created + timedelta(hours=24)).isoformat(),
+            "ended_at": datetime.now(timezone.utc).isoformat() if ended else None,
+            "cancel_initiated_at": None,
+            "archived_at": None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+    
+    def cancel_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if batch_id in self._batches:
+                self._batches[batch_id]["canceled"] = True
+        return self.batch_status(batch_id)
+    
+    def batch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        """One result line per request, as the results endpoint returns them."""
+        batch = self._batches[batch_id]
+        lines = []
+        for request in batch["requests"]:
+            if batch["canceled"]:
+                result = {"type": "canceled"}
+            else:
+                result = {"type": "succeeded", "message": self.build_message(request.get("params", {}))}
+            lines.append({"custom_id": request.get("custom_id"), "result": result})
+        return lines
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mock: MockAnthropicServer = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("content-length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+    
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _ratelimit_headers(self) -> Dict[str, str]:
+        return {
+            "anthropic-ratelimit-requests-limit": "1000",
+            "anthropic-ratelimit-requests-remaining": "999",
+            "request-id": f"req_mock_{self.mock.stats['requests']}",
+        }
+    
+    def _send_not_found(self, path: str):
+        self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": path}})
+    
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        parts = path.strip("/").split("/")
+        
+        if parts == ["v1", "models"]:
+            self.mock._count("model_lists")
+            model = {"type": "model", "id": "mock-model", "display_name": "Mock", "created_at": "2025-01-01T00:00:00Z"}
+            self._send_json(200, {"data": [model], "has_more": False, "first_id": model["id"], "last_id": model["id"]})
+            return
+        
+        # /v1/messages/batches/<id> and /v1/messages/batches/<id>/results
+        if parts[:3] != ["v1", "messages", "batches"] or len(parts) not in (4, 5):
+            self._send_not_found(path)
+            return
+        
+        status = self.mock.batch_status(parts[3])
+        if status is None:
+            self._send_not_found(path)
+            return
+        if len(parts) == 4:
+            self._send_json(200, status)
+            return
+        if parts[4] != "results" or status["processing_status"] != "ended":
+            self._send_not_found(path)
+            return
+        
+        data = "".join(json.dumps(line) + "\n" for line in self.mock.batch_results(parts[3])).encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "application/binary")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        body = self._read_json()
+        
+        if path == "/v1/messages/batches":
+            self._send_json(200, self.mock.create_batch(body))
+            return
+        
+        if path.startswith("/v1/messages/batches/") and path.endswith("/cancel"):
+            status = self.mock.cancel_batch(path.split("/")[4])
+            if status is None:
+                self._send_not_found(path)
+            else:
+                self._send_json(200, status)
+            return
+        
+        if path == "/v1/messages/count_tokens":
+            self._send_json(200, {"input_tokens": len(json.dumps(body)) // 4})
+            return
+        
+        if path != "/v1/messages":
+            self._send_not_found(path)
+            return
+        
+        self.mock._count("requests")
+        if self.mock.should_throttle():
+            self.mock._count("throttled")
+            self._send_json(
+                429,
+                {"type": "error", "error": {"type": "rate_limit_error", "message": "Mock rate limit"}},
+                {"retry-after": str(self.mock.retry_after)},
+            )
+            return
+        
+        message = self.mock.build_message(body)
+        _sleep(self.mock.latency / 2)
+        
+        if body.get("stream"):
+            self.mock._count("streamed")
+            self._stream(message)
+        else:
+            _sleep(self.mock.latency / 2)
+            self._send_json(200, message, self._ratelimit_headers())
+    
+    def _event(self, name: str, data: Dict[str, Any]):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+    
+    def _stream(self, message: Dict[str, Any]):
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("connection", "close")
+        for name, value in self._ratelimit_headers().items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.close_connection = True
+        
+        content = message["content"]
+        block_delay = (self.mock.latency / 2) / max(1, len(content))
+        
+        self._event("message_start", {
+            "type": "message_start",
+            "message": {**message, "content": [], "stop_reason": None, "usage": {**message["usage"], "output_tokens": 1}},
+        })
+        for index, block in enumerate(content):
+            if block["type"] == "text":
+                start = {"type": "text", "text": ""}
+                delta = {"type": "text_delta", "text": block["text"]}
+            else:
+                start = {"type": "tool_use", "id": block["id"], "name": block["name"], "input": {}}
+                delta = {"type": "input_json_delta", "partial_json": json.dumps(block["input"])}
+            self._event("content_block_start", {"type": "content_block_start", "index": index, "content_block": start})
+            _sleep(block_delay)
+            self._event("content_block_delta", {"type": "content_block_delta", "index": index, "delta": delta})
+            self._event("content_block_stop", {"type": "content_block_stop", "index": index})
+        
+        self._event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+            "usage": {"output_tokens": message["usage"]["output_tokens"]},
+        })
+        self._event("message_stop", {"type": "message_stop"})
+
+
+def load_transcript(path: str) -> List[List[Dict[str, Any]]]:
+    """Load a transcript: a JSON list of turns, each a list of content blocks."""
+    with open(path) as f:
+        transcript = json.load(f)
+    if not isinstance(transcript, list) or not all(isinstance(turn, list) for turn in transcript):
+        raise ValueError("Transcript must be a JSON list of turns (lists of content blocks)")
+    return transcript
+
+
+def main():
+    """Run the mock server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local mock Anthropic Messages API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--transcript", type=str, help="JSON transcript file (default: built-in)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after for injected 429s")
+    parser.add_argument("--batch-latency", type=float, default=0.0, help="Seconds until a message batch ends")
+    args = parser.parse_args()
+    
+    transcript = load_transcript(args.transcript) if args.transcript else None
+    server = MockAnthropicServer(
+        transcript=transcript,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        port=args.port,
+        batch_latency=args.batch_latency,
+    )
+    print(f"Mock Anthropic API listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
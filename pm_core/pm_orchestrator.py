@@ -13,8 +13,13 @@ Usage:
     python -m pm_core.pm_orchestrator [--test] [--agents PM-X,PM-Y]
 
 Options:
-    --test      Run in test mode (limited execution)
-    --agents    Comma-separated list of specific agents to run
+    --test         Run in test mode (limited execution)
+    --agents       Comma-separated list of specific agents to run
+    --parallel     Run agents concurrently (see ORCHESTRATOR.max_agents_per_run)
+    --concurrency  Max agents running at once (implies --parallel)
+    --replay-mode  off | record | replay (API response cache, see pm_replay.py)
+    --batch        Plan tasks and summarize results via the Message Batches API
+    --resume       Resume an interrupted run by id (or "latest")
 """
 
 import os
@@ -25,6 +30,11 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Optional
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -35,10 +45,17 @@ from pm_core.pm_config import (
     LOGS_DIR,
     ORCHESTRATOR as ORCH_CONFIG,
     AGENT as AGENT_CONFIG,
+    REPLAY,
+    BATCH,
     SAFETY,
     get_api_key
 )
 from pm_core.pm_agents import PMAgent, PMOrchestrator, AgentResult
+from pm_core.pm_async_exec import get_process_runner
+from pm_core.pm_replay import REPLAY_MODES, get_response_cache
+from pm_core.pm_checkpoint import open_run
+from pm_core.pm_logs import prune_logs, rotate_logs
+from pm_core.pm_usage import format_cost, format_tokens, sum_usage
 
 
 def setup_logging():
@@ -51,6 +68,9 @@ def setup_logging():
         def __init__(self, log_path):
             self.log_path = log_path
             self.log_file = open(log_path, 'a')
+            # Tells log rotation (pm_logs.py) this file is still being written
+            if fcntl is not None:
+                fcntl.flock(self.log_file.fileno(), fcntl.LOCK_SH)
         
         def log(self, message: str):
             timestamp = datetime.now().strftime('%H:%M:%S')
@@ -109,6 +129,7 @@ def update_system_state(results: List[AgentResult]):
     total_commits = sum(r.commits for r in results)
     total_files = sum(len(r.files_changed) for r in results)
     success_count = sum(1 for r in results if r.success)
+    usage = sum_usage(call for r in results for call in r.calls)
     
     health = "🟢 Healthy" if success_count == len(results) else "🟡 Degraded" if success_count > 0 else "🔴 Failed"
     
@@ -126,16 +147,22 @@ def update_system_state(results: List[AgentResult]):
 | **Agents Successful** | {success_count} |
 | **Total Commits Today** | {total_commits} |
 | **Files Changed Today** | {total_files} |
+| **API Calls Today** | {usage['api_calls']} |
+| **Estimated API Cost Today** | {format_cost(usage['cost_usd'])} |
 
 ## Agent Status
 
-| Agent | Status | Commits | Files | Duration |
-|-------|--------|---------|-------|----------|
+| Agent | Status | Commits | Files | Duration | Tokens (in / out) | Est. Cost |
+|-------|--------|---------|-------|----------|-------------------|-----------|
 """
     
     for r in results:
         status = "✅" if r.success else "❌"
-        state_content += f"| {r.agent_name} | {status} | {r.commits} | {len(r.files_changed)} | {r.duration_seconds:.1f}s |\n"
+        tokens_in = format_tokens(r.input_tokens + r.cache_read_tokens + r.cache_write_tokens)
+        state_content += (
+            f"| {r.agent_name} | {status} | {r.commits} | {len(r.files_changed)} | {r.duration_seconds:.1f}s "
+            f"| {tokens_in} / {format_tokens(r.output_tokens)} | {format_cost(r.cost_usd)} |\n"
+        )
     
     state_content += """
 ## Current Priorities
@@ -180,9 +207,14 @@ def save_report(report: str, logger):
 def run_orchestration(
     test_mode: bool = False,
     specific_agents: List[str] = None,
-    logger = None
+    logger = None,
+    resume: Optional[str] = None
 ):
-    """Run the full orchestration cycle."""
+    """Run the full orchestration cycle.
+    
+    Progress is checkpointed per run; pass resume (a run id or "latest")
+    to continue an interrupted run.
+    """
     if logger is None:
         logger = setup_logging()
     
@@ -190,14 +222,33 @@ def run_orchestration(
     logger.log("PM ORCHESTRATOR - Daily Run Starting")
     logger.log("=" * 60)
     
+    # Compress earlier days' logs, drop the oldest
+    rotated = rotate_logs()
+    pruned = prune_logs(ORCH_CONFIG.log_keep_days)
+    if rotated or pruned:
+        logger.log(f"Logs: compressed {rotated}, removed {pruned} older than {ORCH_CONFIG.log_keep_days} days")
+    
     # Check API key
     if not get_api_key():
         logger.log("ERROR: ANTHROPIC_API_KEY not set!")
         logger.log("Please set the environment variable or add to .env file")
         return False
     
+    try:
+        checkpoint = open_run(resume)
+    except ValueError as e:
+        logger.log(f"ERROR: {e}")
+        return False
+    
     # Determine which agents to run
-    if specific_agents:
+    if resume:
+        meta = checkpoint.load_meta()
+        agents_to_run = meta.get("agents", [])
+        # Same date as the interrupted run, so prompts (and caches) match
+        if meta.get("run_date"):
+            os.environ.setdefault("PM_RUN_DATE", meta["run_date"])
+        logger.log(f"RESUMING run {checkpoint.run_id}")
+    elif specific_agents:
         agents_to_run = specific_agents
     elif test_mode:
         # In test mode, only run first 2 agents
@@ -207,6 +258,7 @@ def run_orchestration(
         agents_to_run = ORCH_CONFIG.active_agents
     
     logger.log(f"Agents to run: {', '.join(agents_to_run)}")
+    logger.log(f"Run ID: {checkpoint.run_id} (resume with --resume {checkpoint.run_id})")
     
     # Create working branch
     branch = create_work_branch()
@@ -216,7 +268,13 @@ def run_orchestration(
     orchestrator = PMOrchestrator()
     
     start_time = datetime.now()
-    results = orchestrator.run_agents(agents_to_run)
+    try:
+        results = orchestrator.run_agents(agents_to_run, checkpoint)
+    except KeyboardInterrupt:
+        # Tool commands run in their own session, out of Ctrl-C's reach
+        killed = get_process_runner().cancel_all()
+        logger.log(f"Interrupted; killed {killed} running command(s). Resume with --resume {checkpoint.run_id}")
+        raise
     end_time = datetime.now()
     
     duration = (end_time - start_time).total_seconds()
@@ -236,6 +294,7 @@ def run_orchestration(
     # Summary
     success_count = sum(1 for r in results if r.success)
     total_commits = sum(r.commits for r in results)
+    usage = sum_usage(call for r in results for call in r.calls)
     
     logger.log("\n" + "=" * 60)
     logger.log("ORCHESTRATION COMPLETE")
@@ -243,6 +302,14 @@ def run_orchestration(
     logger.log(f"Agents: {success_count}/{len(results)} successful")
     logger.log(f"Total commits: {total_commits}")
     logger.log(f"Duration: {duration:.1f}s")
+    logger.log(
+        f"API: {usage['api_calls']} calls, {usage['api_seconds']:.1f}s, "
+        f"estimated {format_cost(usage['cost_usd'])}"
+    )
+    
+    response_cache = get_response_cache()
+    if response_cache.enabled:
+        logger.log(f"Replay cache ({response_cache.mode}): {response_cache.hits} hits, {response_cache.misses} misses")
     
     return success_count == len(results)
 
@@ -267,6 +334,36 @@ def main():
         type=str,
         help='Comma-separated list of specific agents to run'
     )
+    parser.add_argument(
+        '--parallel',
+        action='store_true',
+        help='Run agents concurrently instead of one after another'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='Max agents running at once (implies --parallel)'
+    )
+    parser.add_argument(
+        '--replay-mode',
+        choices=REPLAY_MODES,
+        help='Serve/record API responses from the on-disk cache (default: $PM_REPLAY_MODE or off)'
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Plan every agent\'s task and summarize results in Message Batches'
+    )
+    parser.add_argument(
+        '--model-routing',
+        action='store_true',
+        help='Run iterations the router judges hard on the strong model (costs more)'
+    )
+    parser.add_argument(
+        '--resume',
+        metavar='RUN_ID',
+        help='Resume an interrupted run: skip finished agents, continue the rest ("latest" for the last run)'
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -282,18 +379,39 @@ def main():
     elif args.quick:
         specific_agents = ORCH_CONFIG.quick_agents
     
+    if args.replay_mode:
+        REPLAY.mode = args.replay_mode
+    
+    if args.batch:
+        BATCH.enabled = True
+    
+    if args.model_routing:
+        AGENT_CONFIG.model_routing = True
+    
+    if args.parallel or args.concurrency:
+        AGENT_CONFIG.parallel_execution = True
+    if args.concurrency:
+        ORCH_CONFIG.max_agents_per_run = max(1, args.concurrency)
+    
     if args.dry_run:
         agents_to_show = specific_agents or (ORCH_CONFIG.active_agents[:1] if args.test else ORCH_CONFIG.active_agents)
         print("DRY RUN MODE")
         print(f"Model: {AGENT_CONFIG.model}")
         print(f"Would run agents: {agents_to_show}")
+        if AGENT_CONFIG.parallel_execution:
+            print(f"Parallel: up to {ORCH_CONFIG.max_agents_per_run} agents at once")
+        if BATCH.enabled:
+            print("Batch: planning and summaries via Message Batches")
+        if AGENT_CONFIG.model_routing:
+            print(f"Model routing: hard iterations on {AGENT_CONFIG.strong_model}")
         print(f"API key set: {'Yes' if get_api_key() else 'No'}")
         return
     
     # Run orchestration
     success = run_orchestration(
         test_mode=args.test,
-        specific_agents=specific_agents
+        specific_agents=specific_agents,
+        resume=args.resume
     )
     
     sys.exit(0 if success else 1)
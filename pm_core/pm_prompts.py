@@ -0,0 +1,306 @@
+"""
+PM Prompts - Parsed agent files and rendered prompts, cached by content hash.
+
+Building an agent's system prompt means reading its AGENT.md, VISION.md
+and BACKLOG.md and scanning them for the identity sections, the ready
+tasks and the declared tools. The results form a prompt artifact keyed by
+a hash of the three files. Artifacts are shared by every agent in the
+process and kept on disk (PM_STATE_DIR/prompts) across runs:
+
+- a file whose size and mtime are unchanged is not read again
+  (its content hash is remembered in prompts/files.json)
+- a file is parsed again only when its content hash changes
+- rendered agent prompts are stored with the artifact, so the same files,
+  tools and run date always give byte-identical prompts, which keeps the
+  provider-side prompt cache warm
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pm_config import AGENTS_DIR, PM_STATE_DIR
+from .pm_router import task_effort_from_backlog
+
+
+PROMPTS_DIR = PM_STATE_DIR / "prompts"
+
+# Bump when parsing or the agent prompt template changes, so stored
+# artifacts built by older code are not reused
+PROMPT_FORMAT_VERSION = 2
+
+# Files each agent is built from, in key order
+AGENT_FILES = ("AGENT.md", "VISION.md", "BACKLOG.md")
+
+# "| **Tools** | read_file, log_work |" row (or "**Tools:** ..." line) in AGENT.md
+_TOOLS_DECLARATION = re.compile(r"^\|?\s*\*\*Tools:?\*\*:?\s*\|?\s*(.+?)\s*\|?\s*$", re.MULTILINE)
+
+# Relative file paths like src/pages/Chat.tsx
+_FILE_MENTION = re.compile(r"(?<![\w/.:-])((?:[\w.-]+/)+[\w.-]+\.\w+)")
+
+AGENT_PROMPT_TEMPLATE = """## Your Identity
+
+You are {agent_name}.
+
+{identity}
+{tools_note}
+## Today's Tasks (pick ONE)
+
+{tasks}
+
+Today: {run_date}
+
+Start by picking a task and reading the relevant files.
+"""
+
+
+def declared_tools(agent_definition: Optional[str]) -> Optional[List[str]]:
+    """Tool names declared in an AGENT.md, or None if it declares none."""
+    if not agent_definition:
+        return None
+    match = _TOOLS_DECLARATION.search(agent_definition)
+    if not match:
+        return None
+    return [name.strip(" `") for name in match.group(1).split(",") if name.strip(" `")]
+
+
+def mentioned_files(*texts: Optional[str]) -> List[str]:
+    """Relative file paths mentioned in the texts, in order of first mention."""
+    paths: List[str] = []
+    for text in texts:
+        for match in _FILE_MENTION.finditer(text or ""):
+            path = match.group(1)
+            if path.startswith("./"):
+                path = path[2:]
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def identity_summary(agent_definition: Optional[str]) -> str:
+    """Extract a brief identity summary from AGENT.md."""
+    if not agent_definition:
+        return "You are a PM agent."
+    
+    # Extract just the key sections (Identity, Capability Ownership, File Ownership)
+    lines = agent_definition.split('\n')
+    summary_parts = []
+    in_section = False
+    section_count = 0
+    
+    for line in lines:
+        # Capture Identity section and first few key sections
+        if line.startswith('## 1. Identity') or line.startswith('## 2. Capability') or line.startswith('## 14. File'):
+            in_section = True
+            section_count += 1
+        elif line.startswith('## ') and in_section:
+            in_section = False
+            if section_count >= 3:
+                break
+        
+        if in_section:
+            summary_parts.append(line)
+    
+    return '\n'.join(summary_parts[:50])  # Limit to 50 lines
+
+
+def ready_tasks(backlog: Optional[str]) -> str:
+    """Extract just the ready tasks from backlog."""
+    if not backlog:
+        return "No tasks in backlog."
+    
+    # Find the "Ready" section and extract tasks
+    lines = backlog.split('\n')
+    ready_section = []
+    in_ready = False
+    
+    for line in lines:
+        if '## Ready' in line or '### ' in line and 'Ready' in line:
+            in_ready = True
+            continue
+        if in_ready and line.startswith('## ') and 'Ready' not in line:
+            break
+        if in_ready and line.strip():
+            ready_section.append(line)
+    
+    return '\n'.join(ready_section[:30])  # Limit to 30 lines
+
+
+@dataclass
+class PromptArtifact:
+    """Everything an agent's prompts need from its files."""
+    key: str
+    agent_name: str
+    identity: str
+    tasks: str
+    task_effort: Optional[str]
+    declared_tools: Optional[List[str]]
+    
+    # Files the backlog mentions, ready tasks first (read ahead by prewarm)
+    mentioned_files: List[str] = field(default_factory=list)
+    
+    # Rendered agent prompts: "<run date>|<tools>" -> text
+    rendered: Dict[str, str] = field(default_factory=dict)
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """Write JSON atomically (concurrent runs may share PROMPTS_DIR)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class PromptArtifactCache:
+    """Process-wide, disk-backed store of prompt artifacts.
+    
+    After lookups:
+        parsed: artifacts built by parsing files
+        loaded: artifacts read from disk
+        hits: artifacts served from memory
+    """
+    
+    def __init__(self, cache_dir: Path, agents_dir: Path = AGENTS_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.agents_dir = Path(agents_dir)
+        self.parsed = 0
+        self.loaded = 0
+        self.hits = 0
+        self._artifacts: Dict[str, PromptArtifact] = {}
+        self._lock = threading.Lock()
+        
+        # path -> (mtime_ns, size, sha256) of files already hashed
+        index = self._read(self.cache_dir / "files.json") or {}
+        self._file_hashes: Dict[str, Tuple[int, int, str]] = {
+            path: tuple(entry) for path, entry in index.items()
+        }
+    
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _hash_file(self, path: Path, texts: Dict[str, Optional[str]]) -> str:
+        """Content hash of a file, reading it only if its stat changed.
+        
+        Files read along the way are left in texts for parsing.
+        """
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            texts[path.name] = None
+            return "missing"
+        
+        cached = self._file_hashes.get(str(path))
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        
+        data = path.read_bytes()
+        texts[path.name] = data.decode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        self._file_hashes[str(path)] = (stat.st_mtime_ns, stat.st_size, digest)
+        _write_json(self.cache_dir / "files.json", self._file_hashes)
+        return digest
+    
+    def get(self, agent_name: str) -> PromptArtifact:
+        """The agent's artifact, parsing its files only if they changed."""
+        agent_dir = self.agents_dir / agent_name
+        with self._lock:
+            texts: Dict[str, Optional[str]] = {}
+            digests = [self._hash_file(agent_dir / name, texts) for name in AGENT_FILES]
+            key = hashlib.sha256(
+                json.dumps([PROMPT_FORMAT_VERSION, agent_name, digests]).encode("utf-8")
+            ).hexdigest()
+            
+            artifact = self._artifacts.get(key)
+            if artifact is not None:
+                self.hits += 1
+                return artifact
+            
+            path = self.cache_dir / f"{agent_name}-{key[:16]}.json"
+            stored = self._read(path)
+            if stored is not None and stored.get("key") == key:
+                artifact = PromptArtifact(**stored)
+                self.loaded += 1
+            else:
+                artifact = self._parse(agent_name, key, agent_dir, texts)
+                self._save(artifact)
+                self.parsed += 1
+            
+            self._artifacts[key] = artifact
+            return artifact
+    
+    def _parse(self, agent_name: str, key: str, agent_dir: Path, texts: Dict[str, Optional[str]]) -> PromptArtifact:
+        for name in AGENT_FILES:
+            if name not in texts:
+                path = agent_dir / name
+                texts[name] = path.read_text() if path.exists() else None
+        
+        tasks = ready_tasks(texts["BACKLOG.md"])
+        return PromptArtifact(
+            key=key,
+            agent_name=agent_name,
+            identity=identity_summary(texts["AGENT.md"]),
+            tasks=tasks,
+            task_effort=task_effort_from_backlog(tasks),
+            declared_tools=declared_tools(texts["AGENT.md"]),
+            mentioned_files=mentioned_files(tasks, texts["BACKLOG.md"]),
+        )
+    
+    def _save(self, artifact: PromptArtifact):
+        """Store an artifact, replacing the agent's artifacts for older file versions."""
+        path = self.cache_dir / f"{artifact.agent_name}-{artifact.key[:16]}.json"
+        for old in self.cache_dir.glob(f"{artifact.agent_name}-*.json"):
+            if old != path and old.stem.rsplit("-", 1)[0] == artifact.agent_name:
+                old.unlink(missing_ok=True)
+        _write_json(path, asdict(artifact))
+    
+    def agent_prompt(self, artifact: PromptArtifact, allowed_tools: Optional[List[str]], run_date: str) -> str:
+        """The agent's block of the system prompt, rendered once per date and tool list."""
+        render_key = f"{run_date}|{','.join(allowed_tools) if allowed_tools is not None else '*'}"
+        with self._lock:
+            text = artifact.rendered.get(render_key)
+            if text is not None:
+                return text
+            
+            tools_note = ""
+            if allowed_tools is not None:
+                tools_note = f"\n## Your Tools\n\nOnly these tools are available to you: {', '.join(allowed_tools)}\n"
+            text = AGENT_PROMPT_TEMPLATE.format(
+                agent_name=artifact.agent_name,
+                identity=artifact.identity,
+                tools_note=tools_note,
+                tasks=artifact.tasks,
+                run_date=run_date,
+            )
+            
+            # Earlier dates will not be asked for again
+            artifact.rendered = {
+                key: value for key, value in artifact.rendered.items()
+                if key.startswith(f"{run_date}|")
+            }
+            artifact.rendered[render_key] = text
+            self._save(artifact)
+            return text
+
+
+_PROMPT_CACHE = None
+_PROMPT_CACHE_LOCK = threading.Lock()
+
+
+def get_prompt_cache() -> PromptArtifactCache:
+    """Get the process-wide prompt artifact cache."""
+    global _PROMPT_CACHE
+    with _PROMPT_CACHE_LOCK:
+        if _PROMPT_CACHE is None:
+            _PROMPT_CACHE = PromptArtifactCache(PROMPTS_DIR)
+        return _PROMPT_CACHE
@@ -0,0 +1,386 @@
+"""
+PM Rate Limiting - Shared token-bucket limiter for Claude API calls.
+
+Budgets requests-per-minute and input/output tokens-per-minute against
+the organization's limits. The bucket state lives in a JSON file under
+PM_STATE_DIR and is guarded by an exclusive file lock, so every agent
+thread and every orchestrator process on the host draws from the same
+budget (e.g. a quick run and a full run side by side).
+
+On top of the buckets, an AIMD controller caps how many requests this
+process keeps in flight. It shrinks the window when the API throttles
+us (429/529) and grows it back as calls succeed.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Non-POSIX: falls back to an in-process lock only
+
+from .pm_config import RATE_LIMIT, PM_STATE_DIR
+
+
+# Rough chars-per-token ratio used for pre-request estimates
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(*parts: Any) -> int:
+    """Estimate the token count of prompt parts (strings or JSON-able objects)."""
+    total_chars = 0
+    for part in parts:
+        if part is None:
+            continue
+        if isinstance(part, str):
+            total_chars += len(part)
+        else:
+            total_chars += len(json.dumps(part, default=str))
+    return total_chars // CHARS_PER_TOKEN + 1
+
+
+class SharedRateLimiter:
+    """Token buckets for requests, input tokens and output tokens.
+    
+    Each bucket holds up to one minute's worth of budget and refills
+    continuously. `acquire()` blocks until all three buckets can cover a
+    request, then deducts from them. Output tokens are reserved at
+    `max_tokens` up front and corrected with `reconcile()` once the real
+    usage is known, which mirrors how the API enforces OTPM.
+    """
+    
+    BUCKETS = ("requests", "input_tokens", "output_tokens")
+    
+    def __init__(
+        self,
+        requests_per_minute: int,
+        input_tokens_per_minute: int,
+        output_tokens_per_minute: int,
+        state_file: Path,
+    ):
+        self.limits = {
+            "requests": requests_per_minute,
+            "input_tokens": input_tokens_per_minute,
+            "output_tokens": output_tokens_per_minute,
+        }
+        self.state_file = Path(state_file)
+        self.lock_file = self.state_file.with_suffix(".lock")
+        self._thread_lock = threading.Lock()
+        
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    @contextmanager
+    def _locked(self):
+        """Hold both the in-process lock and the cross-process file lock."""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+    
+    def _load(self, now: float) -> Dict[str, Dict[str, float]]:
+        """Load bucket levels from disk and refill them up to `now`."""
+        state = {}
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        
+        for name in self.BUCKETS:
+            capacity = float(self.limits[name])
+            bucket = state.get(name) or {"level": capacity, "updated": now}
+            elapsed = max(0.0, now - bucket.get("updated", now))
+            level = bucket.get("level", capacity) + elapsed * capacity / 60.0
+            state[name] = {"level": min(capacity, level), "updated": now}
+        
+        state.setdefault("blocked_until", 0.0)
+        return state
+    
+    def _save(self, state: Dict[str, Any]):
+        """Write bucket levels atomically."""
+        tmp_file = self.state_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+    
+    def acquire(self, input_tokens: int, output_tokens: int, max_wait: Optional[float] = None) -> float:
+        """Block until the request fits the budget, then reserve it.
+        
+        Returns the number of seconds spent waiting. Raises TimeoutError if
+        `max_wait` elapses first.
+        """
+        cost = {
+            "requests": 1,
+            # A single request bigger than a minute's budget can still run,
+            # it just drains the bucket completely.
+            "input_tokens": min(input_tokens, self.limits["input_tokens"]),
+            "output_tokens": min(output_tokens, self.limits["output_tokens"]),
+        }
+        start = time.time()
+        
+        while True:
+            with self._locked():
+                now = time.time()
+                state = self._load(now)
+                
+                wait = max(0.0, state["blocked_until"] - now)
+                for name in self.BUCKETS:
+                    deficit = cost[name] - state[name]["level"]
+                    if deficit > 0:
+                        rate = self.limits[name] / 60.0
+                        wait = max(wait, deficit / rate)
+                
+                if wait <= 0:
+                    for name in self.BUCKETS:
+                        state[name]["level"] -= cost[name]
+                    self._save(state)
+                    return time.time() - start
+            
+            if max_wait is not None and time.time() - start + wait > max_wait:
+                raise TimeoutError(f"Rate limiter could not admit request within {max_wait:.0f}s")
+            
+            # Re-check at least every few seconds: other processes may
+            # reconcile over-reservations back into the buckets.
+            time.sleep(min(wait, 5.0))
+    
+    def reconcile(self, reserved_input: int, reserved_output: int, actual_input: int, actual_output: int):
+        """Correct a reservation with the usage the API actually reported."""
+        with self._locked():
+            state = self._load(time.time())
+            for name, reserved, actual in (
+                ("input_tokens", reserved_input, actual_input),
+                ("output_tokens", reserved_output, actual_output),
+            ):
+                capacity = float(self.limits[name])
+                reserved = min(reserved, self.limits[name])
+                # Levels may go negative (debt) when we under-estimated
+                state[name]["level"] = min(capacity, state[name]["level"] + reserved - actual)
+            self._save(state)
+    
+    def block_for(self, seconds: float):
+        """Pause all admissions, across processes, for `seconds`."""
+        with self._locked():
+            state = self._load(time.time())
+            state["blocked_until"] = max(state["blocked_until"], time.time() + seconds)
+            self._save(state)
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Current bucket levels (for logging and dry runs)."""
+        with self._locked():
+            state = self._load(time.time())
+        return {name: round(state[name]["level"], 1) for name in self.BUCKETS}
+
+
+class _NoopRateLimiter:
+    """Stand-in used when rate limiting is disabled."""
+    
+    def acquire(self, input_tokens: int, output_tokens: int, max_wait: Optional[float] = None) -> float:
+        return 0.0
+    
+    def reconcile(self, reserved_input: int, reserved_output: int, actual_input: int, actual_output: int):
+        pass
+    
+    def block_for(self, seconds: float):
+        pass
+    
+    def snapshot(self) -> Dict[str, float]:
+        return {}
+
+
+# Status codes that mean "slow down" rather than "this request is broken"
+THROTTLE_STATUS_CODES = (429, 529)
+
+# Limit names used in anthropic-ratelimit-<name>-{limit,remaining,reset}
+RATELIMIT_HEADER_NAMES = ("requests", "tokens", "input-tokens", "output-tokens")
+
+
+def _header(headers: Optional[Mapping[str, str]], name: str) -> Optional[str]:
+    if not headers:
+        return None
+    return headers.get(name) or headers.get(name.title())
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds the server asked us to wait, from retry-after(-ms) headers."""
+    value = _header(headers, "retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+    
+    value = _header(headers, "retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_ratelimit_headers(headers: Optional[Mapping[str, str]]) -> Dict[str, Dict[str, float]]:
+    """Parse anthropic-ratelimit-* headers.
+    
+    Returns e.g. {"requests": {"limit": 50, "remaining": 12, "reset_in": 8.5}}
+    with only the limits the server actually reported.
+    """
+    limits: Dict[str, Dict[str, float]] = {}
+    for name in RATELIMIT_HEADER_NAMES:
+        prefix = f"anthropic-ratelimit-{name}"
+        info: Dict[str, float] = {}
+        for field_name in ("limit", "remaining"):
+            value = _header(headers, f"{prefix}-{field_name}")
+            if value:
+                try:
+                    info[field_name] = float(value)
+                except ValueError:
+                    pass
+        reset = _header(headers, f"{prefix}-reset")
+        if reset:
+            try:
+                when = datetime.fromisoformat(reset.replace("Z", "+00:00"))
+                info["reset_in"] = max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+            except ValueError:
+                pass
+        if info:
+            limits[name] = info
+    return limits
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Delay before retry number `attempt` (0-based).
+    
+    Honors the server's retry-after when given, plus a little jitter so
+    agents throttled together don't all retry in the same instant.
+    Otherwise uses capped exponential backoff with full jitter.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, max(0.5, retry_after * 0.2))
+    ceiling = min(RATE_LIMIT.backoff_cap, RATE_LIMIT.backoff_base * (2 ** attempt))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class AdaptiveConcurrencyController:
+    """AIMD window on the number of in-flight API requests.
+    
+    - Additive increase: each success grows the window by 1/window, i.e.
+      roughly +1 per window's worth of successful calls.
+    - Multiplicative decrease: a throttle shrinks the window by
+      `decrease_factor`, at most once per `cooldown` seconds so one burst
+      of 429s doesn't collapse it to the minimum.
+    
+    Growth pauses while the rate-limit headers report less than 10% of any
+    budget remaining.
+    """
+    
+    def __init__(
+        self,
+        initial: float,
+        minimum: float = 1.0,
+        maximum: float = 16.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 5.0,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = max(minimum, min(maximum, initial))
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+    
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None):
+        """Hold one in-flight slot for the duration of an API call.
+        
+        Raises TimeoutError if no slot frees up within `timeout` seconds.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self.window), timeout):
+                raise TimeoutError(f"No in-flight slot free within {timeout:.0f}s")
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+    
+    def on_success(self, headers: Optional[Mapping[str, str]] = None):
+        """Record a successful call; grow the window unless budgets run low."""
+        for info in parse_ratelimit_headers(headers).values():
+            limit = info.get("limit")
+            remaining = info.get("remaining")
+            if limit and remaining is not None and remaining < 0.1 * limit:
+                return
+        
+        with self._cond:
+            self.window = min(self.maximum, self.window + 1.0 / self.window)
+            self._cond.notify_all()
+    
+    def on_throttle(self, headers: Optional[Mapping[str, str]] = None):
+        """Record a 429/529; shrink the window."""
+        with self._cond:
+            now = time.time()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.window = max(self.minimum, self.window * self.decrease_factor)
+
+
+_LIMITER = None
+_CONTROLLER = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter():
+    """Get the process-wide limiter built from RATE_LIMIT config."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            if RATE_LIMIT.enabled:
+                _LIMITER = SharedRateLimiter(
+                    requests_per_minute=RATE_LIMIT.requests_per_minute,
+                    input_tokens_per_minute=RATE_LIMIT.input_tokens_per_minute,
+                    output_tokens_per_minute=RATE_LIMIT.output_tokens_per_minute,
+                    state_file=RATE_LIMIT.state_file or PM_STATE_DIR / "ratelimit.json",
+                )
+            else:
+                _LIMITER = _NoopRateLimiter()
+        return _LIMITER
+
+
+def get_concurrency_controller() -> AdaptiveConcurrencyController:
+    """Get the process-wide AIMD controller built from RATE_LIMIT config."""
+    global _CONTROLLER
+    with _LIMITER_LOCK:
+        if _CONTROLLER is None:
+            _CONTROLLER = AdaptiveConcurrencyController(
+                initial=RATE_LIMIT.initial_concurrency,
+                minimum=RATE_LIMIT.min_concurrency,
+                maximum=RATE_LIMIT.max_concurrency,
+            )
+        return _CONTROLLER
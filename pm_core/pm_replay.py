@@ -0,0 +1,157 @@
+"""
+PM Replay - Content-addressed record/replay cache for Claude API responses.
+
+Each request is keyed by a hash of everything that determines the answer
+(model, system, tools, messages, sampling settings). Responses are stored
+as JSON files on disk and served back when the same request repeats, so
+rerunning a failed orchestration doesn't pay again for identical early
+turns, and CI can run the orchestrator deterministically with no network.
+
+Modes:
+    off     - always call the API
+    record  - serve cached responses, call the API and store on a miss
+    replay  - serve cached responses only; a miss is an error
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .pm_config import REPLAY, PM_STATE_DIR
+
+
+REPLAY_MODES = ("off", "record", "replay")
+
+# Request fields that affect the response
+KEY_FIELDS = ("model", "system", "tools", "messages", "max_tokens", "temperature", "tool_choice")
+
+
+class ReplayMiss(Exception):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+class ResponseCache:
+    """On-disk response store with LRU eviction by total size.
+    
+    Files live at <cache_dir>/<key[:2]>/<key>.json. A hit refreshes the
+    file's mtime, and eviction removes the least recently used files until
+    the cache is back under `max_bytes`.
+    """
+    
+    def __init__(self, cache_dir: Path, mode: str = "record", max_bytes: int = 500 * 1024 * 1024):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode: {mode} (expected one of {REPLAY_MODES})")
+        self.cache_dir = Path(cache_dir)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+    
+    @staticmethod
+    def key(request: Dict[str, Any]) -> str:
+        """Content hash of the parts of a request that determine its response."""
+        material = {name: request.get(name) for name in KEY_FIELDS}
+        encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the recorded response for a request, if any.
+        
+        Raises ReplayMiss in replay mode when nothing was recorded.
+        """
+        if not self.enabled:
+            return None
+        
+        key = self.key(request)
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            now = time.time()
+            os.utime(path, (now, now))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            if self.mode == "replay":
+                raise ReplayMiss(f"No recorded response for request {key[:12]}")
+            return None
+        
+        with self._lock:
+            self.hits += 1
+        return data
+    
+    def put(self, request: Dict[str, Any], response: Dict[str, Any]):
+        """Record a response (record mode only) and evict if over budget."""
+        if self.mode != "record":
+            return
+        
+        path = self._path(self.key(request))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(response, f)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += path.stat().st_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+    
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self.cache_dir.glob("*/*.json"))
+    
+    def _evict(self):
+        """Delete least recently used entries until under max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                # Another process may have evicted it already
+                pass
+            total -= size
+        self._total_bytes = total
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache built from REPLAY config."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResponseCache(
+                cache_dir=REPLAY.cache_dir or PM_STATE_DIR / "replay",
+                mode=REPLAY.mode,
+                max_bytes=REPLAY.max_bytes,
+            )
+        return _CACHE
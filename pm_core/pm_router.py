@@ -0,0 +1,170 @@
+"""
+PM Router - Pick a model for each agent iteration.
+
+Most iterations are mechanical (read a file, log work, commit) and run
+fine on the fast model. The router scores each iteration from a few
+signals and sends only the hard ones to the strong model:
+
+- size of the backlog task the agent is working on (Effort column)
+- tool errors in the previous iteration
+- number of files the agent has already touched
+- what the previous iteration did (reads usually precede an edit,
+  bookkeeping usually precedes the end of the run)
+
+It also remembers which models are currently throttled. With
+AGENT.throttle_fallback on, a call to a throttled model goes to the other
+model instead of waiting out the retry-after.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .pm_config import AGENT as AGENT_CONFIG
+
+
+# Effort values in BACKLOG.md tables, scored toward the strong model
+EFFORT_SCORES = {"XS": 0, "S": 0, "M": 1, "L": 2, "XL": 3}
+
+# Tools whose results the model mostly has to read and act on
+READ_TOOLS = {"read_file", "read_files", "search_codebase", "list_directory", "git_diff", "read_output"}
+
+# Tools that only record or wrap up work
+BOOKKEEPING_TOOLS = {"log_work", "git_commit", "git_status", "update_backlog", "create_handoff"}
+
+# Files touched before every later iteration gets a point toward the strong model
+MANY_FILES = 3
+
+
+def task_effort_from_backlog(tasks: str) -> Optional[str]:
+    """Effort of the first task in a backlog table, e.g. "M", or None."""
+    effort_column = None
+    for line in tasks.splitlines():
+        if not line.strip().startswith("|"):
+            continue
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if effort_column is None:
+            if "Effort" in cells:
+                effort_column = cells.index("Effort")
+            continue
+        if set("".join(cells)) <= set("-: "):
+            continue  # header separator
+        if effort_column < len(cells):
+            effort = cells[effort_column].upper()
+            return effort if effort in EFFORT_SCORES else None
+    return None
+
+
+@dataclass
+class RouteSignals:
+    """What the router knows about an agent before an iteration."""
+    iteration: int
+    task_effort: Optional[str] = None
+    files_touched: int = 0
+    previous_errors: int = 0
+    previous_tools: List[str] = field(default_factory=list)
+
+
+class ModelRouter:
+    """Choose between a fast and a strong model, with throttle fallback.
+    
+    Args:
+        fast_model: default model for routine iterations
+        strong_model: model for iterations scoring >= threshold
+        threshold: routing score needed for the strong model
+        enabled: when False every iteration uses fast_model
+        throttle_fallback: whether fallback_for offers the other model
+            while one is throttled
+    """
+    
+    def __init__(
+        self,
+        fast_model: str,
+        strong_model: str,
+        threshold: int = 3,
+        enabled: bool = True,
+        throttle_fallback: bool = False
+    ):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.threshold = threshold
+        self.enabled = enabled
+        self.throttle_fallback = throttle_fallback
+        self._throttled_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def score(self, signals: RouteSignals) -> Tuple[int, List[str]]:
+        """Routing score for an iteration and the reasons behind it."""
+        score = 0
+        reasons = []
+        
+        effort_score = EFFORT_SCORES.get(signals.task_effort or "", 0)
+        if effort_score:
+            score += effort_score
+            reasons.append(f"effort {signals.task_effort}")
+        
+        if signals.previous_errors:
+            score += 2
+            reasons.append(f"{signals.previous_errors} tool errors")
+        
+        if signals.files_touched >= MANY_FILES:
+            score += 1
+            reasons.append(f"{signals.files_touched} files touched")
+        
+        previous = set(signals.previous_tools)
+        if previous & READ_TOOLS:
+            score += 1
+            reasons.append("acting on reads")
+        elif previous and previous <= BOOKKEEPING_TOOLS:
+            score -= 2
+            reasons.append("bookkeeping only")
+        
+        return score, reasons
+    
+    def choose(self, signals: RouteSignals) -> Tuple[str, str]:
+        """Model for the next iteration and a short reason for the log."""
+        if not self.enabled or self.fast_model == self.strong_model:
+            model, reason = self.fast_model, "routing off"
+        else:
+            score, reasons = self.score(signals)
+            model = self.strong_model if score >= self.threshold else self.fast_model
+            reason = f"score {score}" + (f" ({', '.join(reasons)})" if reasons else "")
+        return model, reason
+    
+    def fallback_for(self, model: str) -> Optional[str]:
+        """The other model, if fallback is on and it isn't throttled too."""
+        if not self.throttle_fallback:
+            return None
+        other = self.strong_model if model == self.fast_model else self.fast_model
+        if other == model or self.is_throttled(other):
+            return None
+        return other
+    
+    def on_throttle(self, model: str, retry_after: Optional[float] = None):
+        """Mark a model throttled for its retry-after (default 10s)."""
+        with self._lock:
+            self._throttled_until[model] = time.time() + (retry_after or 10.0)
+    
+    def is_throttled(self, model: str) -> bool:
+        with self._lock:
+            return self._throttled_until.get(model, 0.0) > time.time()
+
+
+_ROUTER = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Get the process-wide router built from AGENT config."""
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            _ROUTER = ModelRouter(
+                fast_model=AGENT_CONFIG.model,
+                strong_model=AGENT_CONFIG.strong_model,
+                threshold=AGENT_CONFIG.strong_model_threshold,
+                enabled=AGENT_CONFIG.model_routing,
+                throttle_fallback=AGENT_CONFIG.throttle_fallback,
+            )
+        return _ROUTER
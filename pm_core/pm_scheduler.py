@@ -0,0 +1,180 @@
+"""
+PM Scheduler - Start parallel agents so their combined token rate fits the budget.
+
+Each agent's load is its expected input tokens per minute: the size of its
+prompt (measured before it starts, with the count_tokens endpoint or the
+local estimator) grown by the history an average iteration adds, times the
+API calls an agent makes per minute. Agents start in priority order while
+the running agents' combined load stays under the input-token budget; an
+agent that doesn't fit is skipped for a lighter one further down the list,
+so small agents are packed together and heavy ones are spread out. An
+agent that doesn't fit even on its own still runs, alone.
+
+Calls per minute start from config and are replaced by the rate measured
+on finished agents as the run goes on. The measured rate is taken over at
+least a minute (an agent that finished in seconds made all its calls in
+one minute) and never exceeds the request rate the shared limiter admits.
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .pm_config import (
+    AGENT as AGENT_CONFIG,
+    ORCHESTRATOR as ORCH_CONFIG,
+    RATE_LIMIT
+)
+from .pm_ratelimit import estimate_tokens
+
+
+@dataclass
+class AgentEstimate:
+    """Expected prompt size of one agent."""
+    agent_name: str
+    first_call_tokens: int
+    per_call_tokens: int
+    counted: bool = False  # measured with count_tokens rather than estimated
+
+
+def preflight_tokens(agent, instruction: Optional[str], client=None) -> AgentEstimate:
+    """Size an agent's first request and its average request over the run.
+    
+    With a client the first request is measured with the count_tokens
+    endpoint; otherwise (or if that fails) it is estimated locally.
+    """
+    system = agent._build_system_prompt()
+    messages = [{"role": "user", "content": agent._build_user_prompt(instruction)}]
+    
+    first_call = None
+    if client is not None:
+        try:
+            first_call = client.messages.count_tokens(
+                model=AGENT_CONFIG.model,
+                system=system,
+                tools=agent.tool_definitions,
+                messages=messages
+            ).input_tokens
+        except Exception:
+            first_call = None
+    counted = first_call is not None
+    if first_call is None:
+        first_call = estimate_tokens(system, agent.tool_definitions, messages)
+    
+    # History grows by about one iteration's worth per call
+    growth = ORCH_CONFIG.expected_tokens_per_iteration * (AGENT_CONFIG.max_iterations - 1) // 2
+    return AgentEstimate(agent.agent_name, first_call, first_call + growth, counted)
+
+
+class TokenBudgetScheduler:
+    """Run agents in parallel under an input-tokens-per-minute budget.
+    
+    Args:
+        tokens_per_minute: input token budget for all running agents
+            (None: no budget, only max_concurrent applies)
+        max_concurrent: most agents running at once
+        calls_per_minute: initial guess of API calls one agent makes per minute
+        max_calls_per_minute: most calls per minute the rate limiter admits
+            (None: unlimited)
+    """
+    
+    def __init__(
+        self,
+        tokens_per_minute: Optional[float],
+        max_concurrent: int,
+        calls_per_minute: float,
+        max_calls_per_minute: Optional[float] = None
+    ):
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_calls_per_minute = max_calls_per_minute
+        self.calls_per_minute = self._capped(calls_per_minute)
+        self._observed: List[float] = []
+        self._lock = threading.Lock()
+    
+    def load(self, estimate: AgentEstimate) -> float:
+        """Expected input tokens per minute while the agent runs."""
+        return estimate.per_call_tokens * self.calls_per_minute
+    
+    def _capped(self, calls_per_minute: float) -> float:
+        if self.max_calls_per_minute is None:
+            return calls_per_minute
+        return min(calls_per_minute, self.max_calls_per_minute)
+    
+    def observe(self, api_calls: int, duration_seconds: float):
+        """Learn calls per minute from a finished agent.
+        
+        A run shorter than a minute counts as a minute: its calls all fit
+        in one minute, and scaling them up to a full minute would overstate
+        the agent's load many times over.
+        """
+        if api_calls <= 0 or duration_seconds <= 0:
+            return
+        with self._lock:
+            self._observed.append(self._capped(api_calls / max(duration_seconds, 60.0) * 60))
+            self.calls_per_minute = sum(self._observed) / len(self._observed)
+    
+    def _fits(self, load: float, running_load: float, running: int) -> bool:
+        if running >= self.max_concurrent:
+            return False
+        if running == 0 or self.tokens_per_minute is None:
+            return True
+        return running_load + load <= self.tokens_per_minute
+    
+    def run(
+        self,
+        estimates: List[AgentEstimate],
+        run_agent: Callable[[int, str], Any],
+        on_start: Optional[Callable[[int, str, float], None]] = None,
+        on_done: Optional[Callable[[int, Any], None]] = None
+    ) -> List[Any]:
+        """Run every agent; results come back in the order of `estimates`.
+        
+        run_agent(index, name) runs one agent and returns its result, which
+        must have `calls` and `duration_seconds` for rate learning.
+        """
+        results: List[Any] = [None] * len(estimates)
+        pending = list(range(len(estimates)))
+        running: Dict[Any, tuple] = {}
+        running_load = 0.0
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="pm-agent") as pool:
+            while pending or running:
+                # Highest-priority agents that fit, skipping ones that don't
+                for index in list(pending):
+                    load = self.load(estimates[index])
+                    if not self._fits(load, running_load, len(running)):
+                        continue
+                    pending.remove(index)
+                    running_load += load
+                    if on_start:
+                        on_start(index, estimates[index].agent_name, load)
+                    future = pool.submit(run_agent, index, estimates[index].agent_name)
+                    running[future] = (index, load)
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, load = running.pop(future)
+                    running_load -= load
+                    result = future.result()
+                    results[index] = result
+                    self.observe(len(result.calls), result.duration_seconds)
+                    if on_done:
+                        on_done(index, result)
+        
+        return results
+
+
+def token_budget() -> Optional[float]:
+    """Input tokens per minute the scheduler may plan for, or None if unlimited."""
+    if not RATE_LIMIT.enabled:
+        return None
+    return RATE_LIMIT.input_tokens_per_minute * ORCH_CONFIG.token_budget_utilization
+
+
+def request_budget() -> Optional[float]:
+    """API calls per minute the shared limiter admits, or None if unlimited."""
+    if not RATE_LIMIT.enabled:
+        return None
+    return float(RATE_LIMIT.requests_per_minute)
@@ -0,0 +1,141 @@
+"""
+PM Spool - Keep full tool output on disk instead of truncating it.
+
+run_command, run_tests, run_lint and git_diff return at most a few
+thousand characters. Output longer than that is written to the run's
+spool and the tool returns a head/tail preview plus a handle; the
+read_output tool pages through or greps the full text by handle, so an
+agent never has to rerun a command to see what was cut.
+
+Spools live at PM_STATE_DIR/spool/<run-id>/, so a resumed run can still
+read the handles in its checkpointed history. Handles are derived from
+the content, which keeps conversations (and record/replay keys)
+deterministic.
+"""
+
+import hashlib
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .pm_config import PM_STATE_DIR, ORCHESTRATOR as ORCH_CONFIG
+
+
+SPOOL_DIR = PM_STATE_DIR / "spool"
+
+# Most text one read_output call returns
+MAX_PAGE_CHARS = 10000
+
+# Handles look like "run_tests-3fa2b1c9d0"
+_HANDLE = re.compile(r"^[a-z_]+-[0-9a-f]{10}$")
+
+
+class OutputSpool:
+    """Full tool outputs of one run, stored by handle."""
+    
+    def __init__(self, spool_dir: Path):
+        self.spool_dir = Path(spool_dir)
+    
+    def _path(self, handle: str) -> Path:
+        if not _HANDLE.match(handle):
+            raise ValueError(f"Invalid output handle: {handle}")
+        return self.spool_dir / f"{handle}.txt"
+    
+    def store(self, text: str, label: str) -> str:
+        """Save text and return its handle."""
+        handle = f"{label}-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}"
+        path = self._path(handle)
+        if not path.exists():
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+        return handle
+    
+    def preview(self, text: str, label: str, limit: int, head: int, tail: int) -> Tuple[str, Optional[str]]:
+        """Text as is if it fits in `limit`, else its head and tail and a spool handle."""
+        if len(text) <= limit:
+            return text, None
+        handle = self.store(text, label)
+        omitted = len(text) - head - tail
+        marker = f"\n... [{omitted} chars omitted; read_output handle={handle}] ...\n"
+        return text[:head] + marker + text[len(text) - tail:], handle
+    
+    def read(
+        self,
+        handle: str,
+        offset: int = 1,
+        limit: int = 200,
+        pattern: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Lines [offset, offset+limit) of a stored output, or its lines matching pattern."""
+        path = self._path(handle)
+        if not path.exists():
+            return {"error": f"Unknown output handle: {handle}"}
+        lines = path.read_text().splitlines()
+        
+        if pattern:
+            try:
+                regex = re.compile(pattern)
+            except re.error as e:
+                return {"error": f"Invalid pattern: {e}"}
+            matches = [f"{number}: {line}" for number, line in enumerate(lines, 1) if regex.search(line)]
+            shown = matches[:limit]
+            text = "\n".join(shown)[:MAX_PAGE_CHARS]
+            return {
+                "handle": handle,
+                "matches": text,
+                "count": len(matches),
+                "truncated": len(shown) < len(matches) or len(text) < len("\n".join(shown)),
+                "total_lines": len(lines),
+            }
+        
+        start = max(1, offset)
+        page = lines[start - 1:start - 1 + limit]
+        text = "\n".join(page)[:MAX_PAGE_CHARS]
+        return {
+            "handle": handle,
+            "content": text,
+            "start_line": start,
+            "end_line": start + len(page) - 1,
+            "total_lines": len(lines),
+            "more": start - 1 + len(page) < len(lines) or len(text) < len("\n".join(page)),
+        }
+
+
+def prune_spools(keep_days: int, spool_dir: Optional[Path] = None) -> int:
+    """Delete spools older than keep_days. Returns how many were removed."""
+    spool_dir = spool_dir or SPOOL_DIR
+    if not spool_dir.exists():
+        return 0
+    cutoff = time.time() - keep_days * 86400
+    removed = 0
+    for path in spool_dir.iterdir():
+        if path.is_dir() and path.stat().st_mtime < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+_SPOOL = None
+_SPOOL_LOCK = threading.Lock()
+
+
+def open_spool(run_id: Optional[str] = None) -> OutputSpool:
+    """Make the spool of run_id (or a new one) the process-wide spool."""
+    global _SPOOL
+    with _SPOOL_LOCK:
+        if run_id is None:
+            run_id = datetime.now().strftime("%Y-%m-%d-%H%M%S")
+        prune_spools(ORCH_CONFIG.checkpoint_keep_days)
+        _SPOOL = OutputSpool(SPOOL_DIR / run_id)
+        return _SPOOL
+
+
+def get_spool() -> OutputSpool:
+    """Get the process-wide spool, opening a new one if no run opened it."""
+    with _SPOOL_LOCK:
+        spool = _SPOOL
+    return spool if spool is not None else open_spool()
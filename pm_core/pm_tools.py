@@ -9,20 +9,262 @@ These tools allow agents to interact with the codebase:
 - Search codebase
 """
 
+import difflib
+import fnmatch
+import hashlib
+import io
 import os
 import subprocess
-import json
-from pathlib import Path
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
 
 from .pm_config import (
     PROJECT_ROOT, 
     SAFETY, 
+    AGENT as AGENT_CONFIG,
     is_path_safe, 
     is_command_safe,
     LOGS_DIR
 )
+from .pm_async_exec import get_process_runner
+from .pm_audit import get_audit_log
+from .pm_deadline import Deadline
+from .pm_spool import get_spool
+
+# Agents running in parallel share one working tree and git index,
+# so staging and committing must not interleave between them.
+_GIT_LOCK = threading.Lock()
+
+# Seconds git add / git commit (including hooks) may take. Not capped by the
+# agent's deadline: a commit should finish once it has started.
+GIT_COMMIT_TIMEOUT = 120
+
+# Most glob matches one read_files call reads
+MAX_GLOB_FILES = 50
+
+# Directories a read_files glob never walks into (dependencies, build
+# output, VCS and runtime state). Other hidden directories are skipped
+# unless the glob names one.
+GLOB_SKIP_DIRS = {"node_modules", ".git", "dist", "build", "coverage", ".pm-state"}
+
+# Tools that never change the working tree, git state or agent state.
+# These may run concurrently; everything else is an ordering barrier.
+# run_tests and run_lint are barriers too: test runners and linters write
+# caches, snapshots and coverage files, and two in one tree contend for them.
+READ_ONLY_TOOLS = {
+    "read_file",
+    "read_files",
+    "search_codebase",
+    "list_directory",
+    "git_status",
+    "git_diff",
+    "read_output",
+}
+
+
+class FileCache:
+    """Contents of recently read files, shared by all agents.
+    
+    An entry is used only while the file's size and mtime match what was
+    read, so edits by agents, commands or people are always seen. Least
+    recently used entries are dropped beyond `max_bytes`.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def read(self, path: Path) -> str:
+        """The file's text, from memory if it hasn't changed since it was cached."""
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+        
+        with open(path, "r") as f:
+            text = f.read()
+        
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if stat.st_size <= self.max_bytes:
+                self._entries[key] = (stat.st_mtime_ns, stat.st_size, text)
+                self._bytes += stat.st_size
+            while self._bytes > self.max_bytes:
+                _, (_, size, _) = self._entries.popitem(last=False)
+                self._bytes -= size
+        return text
+
+
+_FILE_CACHE = None
+_FILE_CACHE_LOCK = threading.Lock()
+
+
+class ReadTracker:
+    """What the read_file results in one agent's history showed.
+    
+    Per file (and line range) it keeps the content hash, the content and
+    the tool_use ids the model needs to see it: the last full read plus any
+    diffs since. A repeat read then becomes a reference to the full read if
+    nothing changed since it, or a unified diff against the last result,
+    whichever the file allows. An unchanged file that was last shown as a
+    diff is sent in full again, so a reference never points at a diff.
+    Results that compaction replaces are forgotten, so the next read is
+    sent in full.
+    """
+    
+    def __init__(self):
+        self._records: Dict[Tuple[str, Any, Any], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.deduped = 0
+        self.diffed = 0
+    
+    def check(self, key: Tuple[str, Any, Any], path: str, content: str, tool_use_id: str) -> Optional[Dict[str, Any]]:
+        """Compact result for a repeat read, or None to send the content in full."""
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                self._records[key] = {"sha": digest, "content": content, "full": tool_use_id, "ids": [tool_use_id]}
+                return None
+            
+            previous = record["ids"][-1]
+            if record["sha"] == digest:
+                if previous != record["full"]:
+                    # Last shown as a diff: no single result holds this text
+                    self._records[key] = {"sha": digest, "content": content, "full": tool_use_id, "ids": [tool_use_id]}
+                    return None
+                self.deduped += 1
+                return {
+                    "path": path,
+                    "lines": len(content.splitlines()),
+                    "unchanged_since": previous,
+                    "note": f"Content unchanged since tool_use {previous}; refer to that result",
+                }
+            
+            diff = "".join(difflib.unified_diff(
+                record["content"].splitlines(keepends=True),
+                content.splitlines(keepends=True),
+                fromfile=f"{path} (tool_use {previous})",
+                tofile=path,
+            ))
+            if len(diff) >= len(content):
+                self._records[key] = {"sha": digest, "content": content, "full": tool_use_id, "ids": [tool_use_id]}
+                return None
+            
+            record.update(sha=digest, content=content)
+            record["ids"].append(tool_use_id)
+            self.diffed += 1
+            return {
+                "path": path,
+                "lines": len(content.splitlines()),
+                "changed_since": previous,
+                "diff": diff,
+                "note": f"Only the changes since tool_use {previous} are shown (unified diff)",
+            }
+    
+    def forget(self, tool_use_ids: Iterable[str]):
+        """Drop files whose earlier results are no longer in the history."""
+        gone = set(tool_use_ids)
+        if not gone:
+            return
+        with self._lock:
+            self._records = {
+                key: record for key, record in self._records.items()
+                if not gone.intersection(record["ids"])
+            }
+
+
+def get_file_cache() -> FileCache:
+    """Get the process-wide file cache."""
+    global _FILE_CACHE
+    with _FILE_CACHE_LOCK:
+        if _FILE_CACHE is None:
+            _FILE_CACHE = FileCache(AGENT_CONFIG.file_cache_bytes)
+        return _FILE_CACHE
+
+
+def _glob_match(parts: Tuple[str, ...], pattern: Tuple[str, ...]) -> bool:
+    """Whether path parts match glob parts, where "**" matches any number of directories."""
+    if not pattern:
+        return not parts
+    if pattern[0] == "**":
+        return any(_glob_match(parts[i:], pattern[1:]) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatch.fnmatchcase(parts[0], pattern[0]) and _glob_match(parts[1:], pattern[1:])
+
+
+def _glob_project(pattern: str) -> List[str]:
+    """Relative paths of project files matching a glob, sorted, skipping GLOB_SKIP_DIRS."""
+    pattern_parts = PurePosixPath(pattern).parts
+    hidden_ok = any(part.startswith(".") for part in pattern_parts)
+    matches = []
+    for root, dirs, files in os.walk(PROJECT_ROOT):
+        dirs[:] = [
+            name for name in dirs
+            if name not in GLOB_SKIP_DIRS and (hidden_ok or not name.startswith("."))
+        ]
+        relative = Path(root).relative_to(PROJECT_ROOT).parts
+        for name in files:
+            parts = relative + (name,)
+            if _glob_match(parts, pattern_parts):
+                matches.append("/".join(parts))
+    return sorted(matches)
+
+
+def _write_atomic(path: Path, content: str):
+    """Replace a file's content via a temp file and rename, keeping its permissions."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        if path.exists():
+            os.chmod(tmp_path, path.stat().st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _run_process(cmd, cwd: Path, timeout: Optional[float] = None, shell: bool = False) -> subprocess.CompletedProcess:
+    """subprocess.run(capture_output=True, text=True) that kills the whole process tree on timeout.
+    
+    Commands like `npm run test` start children that inherit the output
+    pipes; killing only the shell would leave them running and the pipes
+    open. The command gets its own process group, and the group is killed.
+    The process is run on the shared event loop (see pm_async_exec.py).
+    """
+    return get_process_runner().run(cmd, cwd, timeout=timeout, shell=shell)
+
+
+def _partial_output(error: subprocess.TimeoutExpired, label: str, limit: int, head: int, tail: int) -> Dict[str, Any]:
+    """What a timed-out command printed before it was killed."""
+    output = {}
+    if error.stdout:
+        output["stdout"], handle = get_spool().preview(error.stdout, label, limit, head=head, tail=tail)
+        if handle:
+            output["output_handle"] = handle
+    return output
+
+
+def is_read_only_tool(tool_name: str, tool_input: Dict[str, Any]) -> bool:
+    """Whether a tool call can safely run alongside other read-only calls."""
+    return tool_name in READ_ONLY_TOOLS
 
 
 # Tool definitions for Claude API
@@ -49,6 +291,32 @@ TOOL_DEFINITIONS = [
             "required": ["path"]
         }
     },
+    {
+        "name": "read_files",
+        "description": "Read several files (or line ranges) in one call, e.g. everything a change touches. Prefer this over repeated read_file calls. Results share one size budget; files past it are listed as omitted.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "files": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "path": {"type": "string"},
+                            "start_line": {"type": "integer"},
+                            "end_line": {"type": "integer"}
+                        },
+                        "required": ["path"]
+                    },
+                    "description": "Files to read, relative to project root, each with an optional line range"
+                },
+                "glob": {
+                    "type": "string",
+                    "description": "Optional: Also read files matching this pattern, e.g. src/hooks/useDeals* or src/components/**/*.tsx (node_modules, dist, build and hidden directories are not searched)"
+                }
+            }
+        }
+    },
     {
         "name": "write_file",
         "description": "Write content to a file. Creates the file if it doesn't exist. Use for creating new files.",
@@ -89,6 +357,33 @@ TOOL_DEFINITIONS = [
             "required": ["path", "old_string", "new_string"]
         }
     },
+    {
+        "name": "multi_edit",
+        "description": "Make many string replacements, in one or more files, in one call (e.g. a rename across call sites). All edits are checked first; if any fails, no file is changed. Edits to the same file apply in order.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "edits": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "path": {"type": "string"},
+                            "old_string": {"type": "string"},
+                            "new_string": {"type": "string"},
+                            "replace_all": {
+                                "type": "boolean",
+                                "description": "Replace every occurrence (default: old_string must occur exactly once)"
+                            }
+                        },
+                        "required": ["path", "old_string", "new_string"]
+                    },
+                    "description": "Replacements to make, relative to project root"
+                }
+            },
+            "required": ["edits"]
+        }
+    },
     {
         "name": "run_command",
         "description": "Run a shell command. Use for npm commands, tests, linting, etc.",
@@ -281,51 +576,128 @@ TOOL_DEFINITIONS = [
             },
             "required": ["summary"]
         }
+    },
+    {
+        "name": "read_output",
+        "description": "Read the full output of an earlier run_command, run_tests, run_lint or git_diff that was cut short. Pass the handle from that result; page by line or grep instead of rerunning the command.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "Output handle, e.g. run_tests-3fa2b1c9d0"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Optional: First line to return (1-indexed, default 1)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Optional: Max lines to return (default 200)"
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "Optional: Regex; return only matching lines, with line numbers"
+                }
+            },
+            "required": ["handle"]
+        }
     }
 ]
 
 
+TOOL_NAMES = [tool["name"] for tool in TOOL_DEFINITIONS]
+
+
+@lru_cache(maxsize=None)
+def _compile_tool_definitions(names: Tuple[str, ...]) -> Tuple[Dict[str, Any], ...]:
+    return tuple(tool for tool in TOOL_DEFINITIONS if tool["name"] in names)
+
+
+def get_tool_definitions(allowed_tools: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Tool definitions for an agent, in TOOL_DEFINITIONS order.
+    
+    None means every tool. Each distinct subset is built once and reused,
+    so agents sharing a subset send byte-identical tool blocks.
+    """
+    if allowed_tools is None:
+        return TOOL_DEFINITIONS
+    return list(_compile_tool_definitions(tuple(sorted(set(allowed_tools)))))
+
+
 class ToolExecutor:
     """Executes tools called by agents."""
     
-    def __init__(self, agent_name: str):
+    def __init__(self, agent_name: str, allowed_tools: Optional[List[str]] = None):
         self.agent_name = agent_name
+        # None allows every tool
+        self.allowed_tools = set(allowed_tools) if allowed_tools is not None else None
         self.work_log: List[Dict[str, Any]] = []
         self.commits_today = 0
+        self.files_written: List[str] = []
+        self.read_tracker = ReadTracker()
         self.start_time = datetime.now()
+        # Set by the agent for each run; subprocesses are killed when it passes
+        self.deadline: Optional[Deadline] = None
         
         # Ensure logs directory exists
         LOGS_DIR.mkdir(exist_ok=True)
+        self.audit_log = get_audit_log(LOGS_DIR)
     
-    def execute(self, tool_name: str, tool_input: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a tool and return the result."""
+    def execute(self, tool_name: str, tool_input: Dict[str, Any], tool_use_id: Optional[str] = None) -> Dict[str, Any]:
+        """Execute a tool and return the result.
+        
+        tool_use_id identifies the call in the conversation; with it, repeat
+        reads of a file are shortened (see ReadTracker).
+        """
         try:
+            if self.allowed_tools is not None and tool_name not in self.allowed_tools:
+                return {"error": f"Tool not available to {self.agent_name}: {tool_name}"}
+            
             method = getattr(self, f"_tool_{tool_name}", None)
             if not method:
                 return {"error": f"Unknown tool: {tool_name}"}
             
+            if self.deadline is not None and self.deadline.expired:
+                return {"error": f"Not run: {self.agent_name} is out of time"}
+            
+            start = time.perf_counter()
             result = method(**tool_input)
+            duration_ms = (time.perf_counter() - start) * 1000
+            
+            if tool_use_id and AGENT_CONFIG.dedupe_reads:
+                if tool_name == "read_file" and "content" in result:
+                    result = self._dedupe_read(tool_input, result, tool_use_id)
+                elif tool_name == "read_files" and "files" in result:
+                    result["files"] = [
+                        self._dedupe_read(entry, entry, tool_use_id)
+                        if "content" in entry and not entry.get("truncated") else entry
+                        for entry in result["files"]
+                    ]
             
             # Log the tool execution
-            self._log_execution(tool_name, tool_input, result)
+            self._log_execution(tool_name, tool_input, result, duration_ms)
             
             return result
         except Exception as e:
             return {"error": str(e)}
     
-    def _log_execution(self, tool_name: str, inputs: Dict, result: Dict):
-        """Log tool execution for audit trail."""
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "agent": self.agent_name,
-            "tool": tool_name,
-            "inputs": inputs,
-            "success": "error" not in result
-        }
+    def _log_execution(self, tool_name: str, inputs: Dict, result: Dict, duration_ms: float):
+        """Log tool execution for audit trail (written in the background, see pm_audit.py)."""
+        self.audit_log.record(self.agent_name, tool_name, inputs, "error" not in result, duration_ms)
+    
+    def _dedupe_read(self, request: Dict[str, Any], result: Dict[str, Any], tool_use_id: str) -> Dict[str, Any]:
+        """Replace a file's read result with a reference or diff if the model already saw the file.
         
-        log_file = LOGS_DIR / f"pm-tools-{datetime.now().strftime('%Y-%m-%d')}.jsonl"
-        with open(log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        request has the path and optional start_line/end_line that were read.
+        """
+        key = (
+            str(self._resolve_path(request["path"]).resolve()),
+            request.get("start_line"),
+            request.get("end_line"),
+        )
+        compact = self.read_tracker.check(key, result["path"], result["content"], tool_use_id)
+        return compact if compact is not None else result
     
     def _resolve_path(self, path: str) -> Path:
         """Resolve a relative path to absolute, ensuring it's within project."""
@@ -342,6 +714,36 @@ class ToolExecutor:
         
         return full_path
     
+    def prewarm_files(self, paths: List[str]) -> int:
+        """Read files into the shared file cache ahead of time. Returns how many were read.
+        
+        Paths that don't exist, aren't allowed or are too large are skipped.
+        """
+        warmed = 0
+        for path in paths:
+            try:
+                if not is_path_safe(path):
+                    continue
+                full_path = self._resolve_path(path)
+                if not full_path.is_file() or full_path.stat().st_size > SAFETY.max_file_read_size:
+                    continue
+                get_file_cache().read(full_path)
+                warmed += 1
+            except (OSError, ValueError):
+                continue
+        return warmed
+    
+    def _timeout(self, seconds: Optional[float] = None) -> Optional[float]:
+        """A subprocess timeout that also ends at the agent's deadline."""
+        if self.deadline is None:
+            return seconds
+        return self.deadline.cap(seconds)
+    
+    def _track_write(self, path: str):
+        """Remember files this agent changed so parallel commits stay scoped."""
+        if path not in self.files_written:
+            self.files_written.append(path)
+    
     def _tool_read_file(self, path: str, start_line: int = None, end_line: int = None) -> Dict[str, Any]:
         """Read a file's contents."""
         if not is_path_safe(path):
@@ -356,8 +758,7 @@ class ToolExecutor:
             return {"error": f"File too large: {path}"}
         
         try:
-            with open(full_path, "r") as f:
-                lines = f.readlines()
+            lines = io.StringIO(get_file_cache().read(full_path)).readlines()
             
             if start_line or end_line:
                 start = (start_line or 1) - 1
@@ -373,6 +774,69 @@ class ToolExecutor:
         except Exception as e:
             return {"error": f"Failed to read file: {str(e)}"}
     
+    def _tool_read_files(self, files: List[Dict[str, Any]] = None, glob: str = None) -> Dict[str, Any]:
+        """Read many files concurrently, within one combined size budget."""
+        requests = [dict(entry) for entry in (files or [])]
+        glob_note = None
+        if glob:
+            if glob.startswith("/") or ".." in Path(glob).parts:
+                return {"error": f"Glob must be relative to the project: {glob}"}
+            requested = {entry.get("path") for entry in requests}
+            matches = _glob_project(glob)
+            # Forbidden files are dropped before the cap, so they can't use it up
+            allowed = [path for path in matches if is_path_safe(path)]
+            for path in allowed[:MAX_GLOB_FILES]:
+                if path not in requested:
+                    requests.append({"path": path})
+            
+            notes = []
+            if len(allowed) < len(matches):
+                notes.append(f"{len(matches) - len(allowed)} forbidden matches skipped")
+            if len(allowed) > MAX_GLOB_FILES:
+                notes.append(
+                    f"{len(allowed)} readable matches; only the first {MAX_GLOB_FILES} were read, "
+                    f"{len(allowed) - MAX_GLOB_FILES} left out (narrow the glob)"
+                )
+            if not allowed:
+                notes.append(f"glob matched no readable files: {glob}")
+            glob_note = "; ".join(notes) or None
+        
+        if not requests:
+            return {"error": glob_note or "Nothing to read: pass files and/or glob"}
+        
+        # Each file gets the same checks as read_file (path safety, size limit)
+        workers = max(1, min(len(requests), AGENT_CONFIG.max_parallel_tools))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                lambda entry: self._tool_read_file(entry["path"], entry.get("start_line"), entry.get("end_line")),
+                requests
+            ))
+        
+        budget = AGENT_CONFIG.read_files_budget
+        used = 0
+        entries = []
+        omitted = []
+        for request, result in zip(requests, results):
+            entry = {**request, **result}
+            if "content" in result:
+                remaining = budget - used
+                if remaining <= 0:
+                    omitted.append(request["path"])
+                    continue
+                if len(result["content"]) > remaining:
+                    entry["content"] = result["content"][:remaining]
+                    entry["truncated"] = True
+                used += len(entry["content"])
+            entries.append(entry)
+        
+        output = {"files": entries, "count": len(entries), "chars": used, "budget": budget}
+        if omitted:
+            output["omitted"] = omitted
+            output["note"] = "Size budget used up; read the omitted files in another call"
+        if glob_note:
+            output["glob_note"] = glob_note
+        return output
+    
     def _tool_write_file(self, path: str, content: str) -> Dict[str, Any]:
         """Write content to a file."""
         if not is_path_safe(path):
@@ -387,6 +851,7 @@ class ToolExecutor:
             with open(full_path, "w") as f:
                 f.write(content)
             
+            self._track_write(path)
             return {
                 "success": True,
                 "path": path,
@@ -421,6 +886,7 @@ class ToolExecutor:
             with open(full_path, "w") as f:
                 f.write(new_content)
             
+            self._track_write(path)
             return {
                 "success": True,
                 "path": path,
@@ -430,6 +896,76 @@ class ToolExecutor:
         except Exception as e:
             return {"error": f"Failed to edit file: {str(e)}"}
     
+    def _tool_multi_edit(self, edits: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply many replacements across files: all checked first, each file written atomically."""
+        if not edits:
+            return {"error": "No edits given"}
+        
+        # Validate and apply everything in memory, file by file, in order
+        originals: Dict[str, str] = {}
+        contents: Dict[str, str] = {}
+        statuses = []
+        for index, edit in enumerate(edits):
+            path = edit.get("path", "")
+            old_string = edit.get("old_string", "")
+            status = {"index": index, "path": path}
+            statuses.append(status)
+            
+            if not is_path_safe(path):
+                status["error"] = f"Access denied to path: {path}"
+                continue
+            if path not in contents:
+                try:
+                    full_path = self._resolve_path(path)
+                    with open(full_path, "r") as f:
+                        originals[path] = contents[path] = f.read()
+                except (OSError, ValueError) as e:
+                    status["error"] = f"Cannot read file: {str(e)}"
+                    continue
+            if not old_string:
+                status["error"] = "old_string is empty"
+                continue
+            
+            count = contents[path].count(old_string)
+            if count == 0:
+                note = " (after earlier edits to this file)" if contents[path] != originals[path] else ""
+                status["error"] = f"String not found{note}: {old_string[:50]}..."
+            elif count > 1 and not edit.get("replace_all"):
+                status["error"] = f"String found {count} times; add context or set replace_all"
+            else:
+                contents[path] = contents[path].replace(old_string, edit.get("new_string", ""))
+                status["replaced"] = count
+        
+        failed = [status for status in statuses if "error" in status]
+        if failed:
+            for status in statuses:
+                status.setdefault("error", "Not applied: other edits failed")
+            return {
+                "error": f"{len(failed)} of {len(edits)} edits failed; no files were changed",
+                "edits": statuses
+            }
+        
+        written = []
+        for path, content in contents.items():
+            if content == originals[path]:
+                continue
+            try:
+                _write_atomic(self._resolve_path(path), content)
+            except OSError as e:
+                return {
+                    "error": f"Failed to write {path}: {str(e)}",
+                    "files_written": written,
+                    "edits": statuses
+                }
+            written.append(path)
+            self._track_write(path)
+        
+        return {
+            "success": True,
+            "files_written": written,
+            "edits": statuses
+        }
+    
     def _tool_run_command(self, command: str, working_directory: str = None) -> Dict[str, Any]:
         """Run a shell command."""
         if not is_command_safe(command):
@@ -439,24 +975,28 @@ class ToolExecutor:
         if working_directory:
             cwd = self._resolve_path(working_directory)
         
+        timeout = self._timeout(60)
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                cwd=cwd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            result = _run_process(command, cwd, timeout=timeout, shell=True)
             
-            return {
-                "stdout": result.stdout[:5000],  # Limit output
-                "stderr": result.stderr[:2000],
+            stdout, stdout_handle = get_spool().preview(result.stdout, "run_command", 5000, head=2000, tail=3000)
+            stderr, stderr_handle = get_spool().preview(result.stderr, "run_command", 2000, head=500, tail=1500)
+            output = {
+                "stdout": stdout,
+                "stderr": stderr,
                 "exit_code": result.returncode,
                 "success": result.returncode == 0
             }
-        except subprocess.TimeoutExpired:
-            return {"error": "Command timed out after 60 seconds"}
+            if stdout_handle:
+                output["stdout_handle"] = stdout_handle
+            if stderr_handle:
+                output["stderr_handle"] = stderr_handle
+            return output
+        except subprocess.TimeoutExpired as e:
+            return {
+                "error": f"Command timed out after {timeout:.0f} seconds",
+                **_partial_output(e, "run_command", 5000, head=2000, tail=3000)
+            }
         except Exception as e:
             return {"error": f"Failed to run command: {str(e)}"}
     
@@ -467,13 +1007,7 @@ class ToolExecutor:
             if file_pattern:
                 cmd = ["grep", "-rn", f"--include={file_pattern}", pattern, "."]
             
-            result = subprocess.run(
-                cmd,
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            result = _run_process(cmd, PROJECT_ROOT, timeout=self._timeout(30))
             
             lines = result.stdout.strip().split("\n")[:max_results]
             
@@ -512,12 +1046,7 @@ class ToolExecutor:
     def _tool_git_status(self) -> Dict[str, Any]:
         """Get git status."""
         try:
-            result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True
-            )
+            result = _run_process(["git", "status", "--porcelain"], PROJECT_ROOT, timeout=self._timeout())
             
             lines = result.stdout.strip().split("\n") if result.stdout.strip() else []
             
@@ -534,25 +1063,30 @@ class ToolExecutor:
         if self.commits_today >= SAFETY.max_commits_per_agent:
             return {"error": f"Commit limit reached ({SAFETY.max_commits_per_agent} per day)"}
         
+        # In parallel mode other agents share the working tree, so an
+        # unscoped "git add -A" would sweep up their changes too.
+        if not files and AGENT_CONFIG.parallel_execution:
+            files = list(self.files_written)
+            if not files:
+                return {"error": "Nothing to commit: no files written by this agent"}
+        
         try:
-            # Stage files
-            if files:
-                for f in files:
-                    if not is_path_safe(f):
-                        return {"error": f"Cannot commit forbidden file: {f}"}
-                cmd = ["git", "add"] + list(files)
-                subprocess.run(cmd, cwd=PROJECT_ROOT, check=True)
-            else:
-                subprocess.run(["git", "add", "-A"], cwd=PROJECT_ROOT, check=True)
-            
-            # Commit
-            full_message = f"[{self.agent_name}] {message}"
-            result = subprocess.run(
-                ["git", "commit", "-m", full_message],
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True
-            )
+            with _GIT_LOCK:
+                # Stage files
+                if files:
+                    for f in files:
+                        if not is_path_safe(f):
+                            return {"error": f"Cannot commit forbidden file: {f}"}
+                    cmd = ["git", "add"] + list(files)
+                else:
+                    cmd = ["git", "add", "-A"]
+                staged = _run_process(cmd, PROJECT_ROOT, timeout=GIT_COMMIT_TIMEOUT)
+                if staged.returncode != 0:
+                    return {"error": f"git add failed (exit {staged.returncode})", "stderr": staged.stderr[-2000:]}
+                
+                # Commit
+                full_message = f"[{self.agent_name}] {message}"
+                result = _run_process(["git", "commit", "-m", full_message], PROJECT_ROOT, timeout=GIT_COMMIT_TIMEOUT)
             
             if result.returncode == 0:
                 self.commits_today += 1
@@ -562,8 +1096,17 @@ class ToolExecutor:
                     "commits_today": self.commits_today
                 }
             else:
-                return {"error": result.stderr or "Nothing to commit"}
+                return {
+                    "error": result.stderr.strip() or result.stdout.strip() or "Nothing to commit",
+                    "stderr": result.stderr[-2000:]
+                }
             
+        except subprocess.TimeoutExpired as e:
+            return {
+                "error": f"{' '.join(e.cmd[:2])} timed out after {GIT_COMMIT_TIMEOUT}s "
+                         "(a hook hung, or another git process holds .git/index.lock)",
+                "stderr": (e.stderr or "")[-2000:]
+            }
         except Exception as e:
             return {"error": f"Git commit failed: {str(e)}"}
     
@@ -574,68 +1117,79 @@ class ToolExecutor:
             if file:
                 cmd.append(file)
             
-            result = subprocess.run(
-                cmd,
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True
-            )
+            result = _run_process(cmd, PROJECT_ROOT, timeout=self._timeout())
             
-            return {
-                "diff": result.stdout[:10000],  # Limit diff output
-                "truncated": len(result.stdout) > 10000
+            diff, diff_handle = get_spool().preview(result.stdout, "git_diff", 10000, head=8000, tail=2000)
+            output = {
+                "diff": diff,
+                "truncated": diff_handle is not None
             }
+            if diff_handle:
+                output["output_handle"] = diff_handle
+            return output
         except Exception as e:
             return {"error": f"Git diff failed: {str(e)}"}
     
     def _tool_run_tests(self, test_pattern: str = None) -> Dict[str, Any]:
         """Run tests."""
+        timeout = self._timeout(120)
         try:
             cmd = "npm run test"
             if test_pattern:
                 cmd = f"npx vitest run -t '{test_pattern}'"
             
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            result = _run_process(cmd, PROJECT_ROOT, timeout=timeout, shell=True)
             
-            return {
-                "stdout": result.stdout[-5000:],  # Last 5000 chars
+            # Failures are usually summarized at the end
+            stdout, stdout_handle = get_spool().preview(result.stdout, "run_tests", 5000, head=1000, tail=4000)
+            output = {
+                "stdout": stdout,
                 "exit_code": result.returncode,
                 "passed": result.returncode == 0
             }
-        except subprocess.TimeoutExpired:
-            return {"error": "Tests timed out"}
+            if stdout_handle:
+                output["output_handle"] = stdout_handle
+            return output
+        except subprocess.TimeoutExpired as e:
+            return {
+                "error": f"Tests timed out after {timeout:.0f} seconds",
+                **_partial_output(e, "run_tests", 5000, head=1000, tail=4000)
+            }
         except Exception as e:
             return {"error": f"Tests failed: {str(e)}"}
     
     def _tool_run_lint(self, fix: bool = False) -> Dict[str, Any]:
         """Run linter."""
+        timeout = self._timeout(60)
         try:
             cmd = "npm run lint:fix" if fix else "npm run lint"
             
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            result = _run_process(cmd, PROJECT_ROOT, timeout=timeout, shell=True)
             
-            return {
-                "stdout": result.stdout[-3000:],
+            stdout, stdout_handle = get_spool().preview(result.stdout, "run_lint", 3000, head=1000, tail=2000)
+            output = {
+                "stdout": stdout,
                 "exit_code": result.returncode,
                 "passed": result.returncode == 0
             }
+            if stdout_handle:
+                output["output_handle"] = stdout_handle
+            return output
+        except subprocess.TimeoutExpired as e:
+            return {
+                "error": f"Lint timed out after {timeout:.0f} seconds",
+                **_partial_output(e, "run_lint", 3000, head=1000, tail=2000)
+            }
         except Exception as e:
             return {"error": f"Lint failed: {str(e)}"}
     
+    def _tool_read_output(self, handle: str, offset: int = 1, limit: int = 200, pattern: str = None) -> Dict[str, Any]:
+        """Page through or grep a spooled command output."""
+        try:
+            return get_spool().read(handle, offset, limit, pattern)
+        except Exception as e:
+            return {"error": f"Failed to read output: {str(e)}"}
+    
     def _tool_update_backlog(self, task_id: str, status: str, notes: str = None) -> Dict[str, Any]:
         """Update backlog task status."""
         backlog_path = PROJECT_ROOT / "docs" / "pm-agents" / "agents" / self.agent_name / "BACKLOG.md"
@@ -719,3 +1273,65 @@ class ToolExecutor:
     def get_work_log(self) -> List[Dict[str, Any]]:
         """Get all logged work."""
         return self.work_log
+
+
+
+class ToolScheduler:
+    """Runs an agent's tool calls concurrently where it is safe to.
+    
+    Read-only tools (see READ_ONLY_TOOLS) run in parallel on a thread pool.
+    Mutating tools (edit_file, write_file, git_commit, run_command, ...)
+    and run_tests / run_lint are barriers: each waits for every call submitted before it, and every
+    call submitted after it waits for it to finish. Callers get one Future
+    per call and can collect results in the original block order.
+    """
+    
+    def __init__(self, executor: ToolExecutor, max_workers: int = 4):
+        self.executor = executor
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix=f"{executor.agent_name}-tools"
+        )
+        self._barrier: Optional[Future] = None
+        self._since_barrier: List[Future] = []
+        
+        # Time spent inside tool calls, for per-iteration accounting
+        self._stats_lock = threading.Lock()
+        self.tool_seconds = 0.0
+        self.tool_calls = 0
+    
+    def submit(self, tool_name: str, tool_input: Dict[str, Any], tool_use_id: Optional[str] = None) -> Future:
+        """Schedule a tool call behind whatever it must not overtake."""
+        if is_read_only_tool(tool_name, tool_input):
+            wait_for = [self._barrier] if self._barrier else []
+            future = self._pool.submit(self._run_after, wait_for, tool_name, tool_input, tool_use_id)
+            self._since_barrier.append(future)
+        else:
+            wait_for = ([self._barrier] if self._barrier else []) + self._since_barrier
+            future = self._pool.submit(self._run_after, wait_for, tool_name, tool_input, tool_use_id)
+            self._barrier = future
+            self._since_barrier = []
+        return future
+    
+    def _run_after(
+        self,
+        wait_for: List[Future],
+        tool_name: str,
+        tool_input: Dict[str, Any],
+        tool_use_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        # Calls only ever wait on calls submitted earlier, and the pool
+        # starts work in submission order, so this cannot deadlock.
+        for future in wait_for:
+            future.exception()
+        start = time.perf_counter()
+        try:
+            return self.executor.execute(tool_name, tool_input, tool_use_id)
+        finally:
+            with self._stats_lock:
+                self.tool_seconds += time.perf_counter() - start
+                self.tool_calls += 1
+    
+    def shutdown(self):
+        """Wait for outstanding calls and release the worker threads."""
+        self._pool.shutdown(wait=True)
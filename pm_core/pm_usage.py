@@ -0,0 +1,172 @@
+"""
+PM Usage - Per-call token, latency and cost accounting.
+
+Every API response carries a `usage` block. PMAgent turns each one into a
+CallUsage record (tokens by prompt-cache status, API latency, time spent
+running that turn's tools, estimated cost) and AgentResult keeps the list,
+so reports can show real figures instead of hand estimates.
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .pm_config import (
+    MODEL_PRICING,
+    MIN_CACHEABLE_TOKENS,
+    BATCH_PRICE_MULTIPLIER,
+    CACHE_WRITE_PRICE_MULTIPLIER,
+    CACHE_READ_PRICE_MULTIPLIER
+)
+
+
+@dataclass
+class CallUsage:
+    """Usage of one agent iteration: one API call plus the tools it requested."""
+    iteration: int
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    api_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    tool_calls: int = 0
+    cost_usd: float = 0.0
+    replayed: bool = False
+    # Sent through the Message Batches API (half price)
+    batch: bool = False
+    # Why the model router picked this iteration's model
+    route_reason: str = ""
+    # Model the call was meant for, if a throttle moved it to `model`
+    fallback_from: str = ""
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def model_pricing(model: str) -> Optional[Tuple[float, float]]:
+    """(input, output) USD per million tokens for a model, or None if unknown."""
+    matches = [prefix for prefix in MODEL_PRICING if model.startswith(prefix)]
+    if not matches:
+        return None
+    return MODEL_PRICING[max(matches, key=len)]
+
+
+def min_cacheable_tokens(model: str) -> int:
+    """Shortest prompt prefix, in tokens, the API caches for a model."""
+    matches = [prefix for prefix in MIN_CACHEABLE_TOKENS if model.startswith(prefix)]
+    if not matches:
+        return 1024
+    return MIN_CACHEABLE_TOKENS[max(matches, key=len)]
+
+
+def estimate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+    batch: bool = False
+) -> float:
+    """Estimated USD cost of a call at list prices (0.0 for unknown models)."""
+    pricing = model_pricing(model)
+    if pricing is None:
+        return 0.0
+    input_price, output_price = pricing
+    multiplier = BATCH_PRICE_MULTIPLIER if batch else 1.0
+    return multiplier * (
+        input_tokens * input_price
+        + cache_write_tokens * input_price * CACHE_WRITE_PRICE_MULTIPLIER
+        + cache_read_tokens * input_price * CACHE_READ_PRICE_MULTIPLIER
+        + output_tokens * output_price
+    ) / 1_000_000
+
+
+def usage_from_response(
+    iteration: int,
+    response,
+    api_seconds: float,
+    replayed: bool = False,
+    batch: bool = False
+) -> CallUsage:
+    """Build a CallUsage from a Messages API response.
+    
+    Replayed responses were paid for when they were recorded, so their
+    tokens and cost are not counted again.
+    """
+    record = CallUsage(
+        iteration=iteration,
+        model=response.model,
+        api_seconds=api_seconds,
+        replayed=replayed,
+        batch=batch
+    )
+    if replayed:
+        return record
+    
+    usage = response.usage
+    record.input_tokens = usage.input_tokens
+    record.output_tokens = usage.output_tokens
+    record.cache_read_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+    record.cache_write_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+    record.cost_usd = estimate_cost(
+        record.model,
+        record.input_tokens,
+        record.output_tokens,
+        record.cache_read_tokens,
+        record.cache_write_tokens,
+        batch=batch
+    )
+    return record
+
+
+def sum_usage(records: Iterable[CallUsage]) -> Dict[str, Any]:
+    """Totals over a set of calls."""
+    totals = {
+        "api_calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_read_tokens": 0,
+        "cache_write_tokens": 0,
+        "api_seconds": 0.0,
+        "tool_seconds": 0.0,
+        "tool_calls": 0,
+        "cost_usd": 0.0,
+    }
+    for record in records:
+        totals["api_calls"] += 1
+        for name in totals:
+            if name != "api_calls":
+                totals[name] += getattr(record, name)
+    return totals
+
+
+def calls_by_model(records: Iterable[CallUsage]) -> Dict[str, int]:
+    """Number of calls per model, most used first."""
+    counts: Dict[str, int] = {}
+    for record in records:
+        counts[record.model] = counts.get(record.model, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+
+def fallback_summary(records: Iterable[CallUsage]) -> str:
+    """Calls moved to another model by a throttle and what they cost, or ""."""
+    fallbacks = [record for record in records if record.fallback_from]
+    if not fallbacks:
+        return ""
+    cost = sum(record.cost_usd for record in fallbacks)
+    return f"{len(fallbacks)} calls on {', '.join(calls_by_model(fallbacks))}, est. {format_cost(cost)}"
+
+
+def format_tokens(count: int) -> str:
+    """Compact token count for reports, e.g. 12.3k."""
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M"
+    if count >= 1_000:
+        return f"{count / 1_000:.1f}k"
+    return str(count)
+
+
+def format_cost(usd: float) -> str:
+    """Dollar amount for reports; sub-dollar amounts keep four decimals."""
+    return f"${usd:.2f}" if usd >= 1 else f"${usd:.4f}"
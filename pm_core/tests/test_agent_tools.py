@@ -0,0 +1,47 @@
+"""Per-agent tool subsets in requests, and the full-list fallback for caching."""
+
+import pytest
+
+from pm_core import pm_prompts, pm_tools
+from pm_core.pm_agents import PMAgent
+from pm_core.pm_config import AGENT
+from pm_core.pm_tools import TOOL_NAMES
+
+
+@pytest.fixture(autouse=True)
+def state(tmp_path, monkeypatch):
+    monkeypatch.setattr(pm_tools, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(pm_prompts, "_PROMPT_CACHE", pm_prompts.PromptArtifactCache(tmp_path / "prompts"))
+    monkeypatch.setattr(AGENT, "model_routing", False)
+
+
+def names(agent):
+    return [tool["name"] for tool in agent.tool_definitions]
+
+
+def test_subset_sent_in_full_list_order(monkeypatch):
+    monkeypatch.setattr(AGENT, "model", "claude-sonnet-4-20250514")
+    agent = PMAgent("PM-Research")
+    assert set(names(agent)) == set(AGENT.agent_tools["PM-Research"])
+    assert names(agent) == [name for name in TOOL_NAMES if name in names(agent)]
+    assert "Skip any step" not in agent._build_user_prompt()
+
+
+def test_agents_with_the_same_subset_send_identical_tools(monkeypatch):
+    monkeypatch.setattr(AGENT, "model", "claude-sonnet-4-20250514")
+    monkeypatch.setitem(AGENT.agent_tools, "PM-Context", list(reversed(AGENT.agent_tools["PM-Research"])))
+    assert PMAgent("PM-Context").tool_definitions == PMAgent("PM-Research").tool_definitions
+
+
+def test_uncacheable_subset_falls_back_to_full_list(monkeypatch):
+    # Haiku won't cache a prefix under 2048 tokens; the full list is longer
+    monkeypatch.setattr(AGENT, "model", "claude-3-haiku-20240307")
+    agent = PMAgent("PM-Research")
+    assert names(agent) == TOOL_NAMES
+    assert agent.tool_executor.execute("run_command", {"command": "ls"})["error"].startswith("Tool not available")
+    assert "Skip any step" in agent._build_user_prompt()
+
+
+def test_agents_without_a_subset_get_every_tool(monkeypatch):
+    monkeypatch.setattr(AGENT, "model", "claude-sonnet-4-20250514")
+    assert names(PMAgent("PM-Context")) == TOOL_NAMES
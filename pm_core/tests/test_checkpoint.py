@@ -0,0 +1,86 @@
+"""Run checkpoints: saved state, finished agents, and resuming a run."""
+
+import json
+
+import pytest
+
+from pm_core import pm_agents, pm_prompts, pm_tools
+from pm_core.pm_checkpoint import RunCheckpoint, list_runs
+from pm_core.pm_config import RATE_LIMIT, REPLAY
+
+
+def test_state_is_a_snapshot(tmp_path):
+    checkpoint = RunCheckpoint("r1", tmp_path).for_agent("PM-QA")
+    state = {"iteration": 1, "completed": False, "messages": [{"role": "user", "content": "go"}]}
+    checkpoint.save_state(state)
+    state["messages"].append({"role": "assistant", "content": "later"})
+    
+    reloaded = RunCheckpoint("r1", tmp_path).for_agent("PM-QA")
+    assert len(reloaded.state["messages"]) == 1
+    assert not reloaded.finished
+
+
+def test_finished_needs_completed_state_and_result(tmp_path):
+    run = RunCheckpoint("r1", tmp_path)
+    run.save_meta({"agents": ["PM-QA", "PM-Context", "PM-Research"]})
+    run.for_agent("PM-QA").save_state({"iteration": 3, "completed": True})
+    run.for_agent("PM-QA").save_result({"agent_name": "PM-QA", "success": True})
+    # Loop ended but the result wasn't saved before the run died
+    run.for_agent("PM-Context").save_state({"iteration": 2, "completed": True})
+    run.for_agent("PM-Research").save_state({"iteration": 1, "completed": False})
+    
+    reloaded = RunCheckpoint("r1", tmp_path)
+    assert reloaded.exists
+    assert reloaded.load_meta()["run_id"] == "r1"
+    assert list(reloaded.finished_results(["PM-QA", "PM-Context", "PM-Research"])) == ["PM-QA"]
+    assert list_runs(tmp_path) == ["r1"]
+
+
+def test_no_temp_files_left_behind(tmp_path):
+    run = RunCheckpoint("r1", tmp_path)
+    run.save_meta({"agents": ["PM-QA"]})
+    run.for_agent("PM-QA").save_state({"iteration": 1, "completed": False})
+    assert sorted(p.name for p in run.run_dir.iterdir()) == ["PM-QA.json", "run.json"]
+
+
+@pytest.fixture
+def mock_api(tmp_path, monkeypatch):
+    pytest.importorskip("anthropic")
+    from pm_core.pm_mock_server import MockAnthropicServer
+    
+    monkeypatch.setattr(pm_tools, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(pm_prompts, "_PROMPT_CACHE", pm_prompts.PromptArtifactCache(tmp_path / "prompts"))
+    monkeypatch.setattr(RATE_LIMIT, "state_file", tmp_path / "rate-limit.json")
+    monkeypatch.setattr(REPLAY, "mode", "off")
+    with MockAnthropicServer(latency=0.01) as server:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "mock-key")
+        yield server
+
+
+def test_resume_skips_finished_agents(tmp_path, mock_api, monkeypatch):
+    names = ["PM-QA", "PM-Context"]
+    runs_dir = tmp_path / "runs"
+    call_api = pm_agents.PMAgent._call_api
+    
+    def outage_after_first_turn(self, client, system_prompt, messages, errors, *args, **kwargs):
+        if self.agent_name == "PM-Context" and len(messages) > 2:
+            errors.append("API error: simulated outage")
+            return None
+        return call_api(self, client, system_prompt, messages, errors, *args, **kwargs)
+    
+    monkeypatch.setattr(pm_agents.PMAgent, "_call_api", outage_after_first_turn)
+    first = pm_agents.PMOrchestrator().run_agents(names, RunCheckpoint("r1", runs_dir))
+    assert [r.success for r in first] == [True, False]
+    saved = json.loads((runs_dir / "r1" / "PM-Context.json").read_text())["state"]
+    assert saved["iteration"] == 1 and not saved["completed"]
+    
+    monkeypatch.setattr(pm_agents.PMAgent, "_call_api", call_api)
+    before = mock_api.stats["requests"]
+    resumed = pm_agents.PMOrchestrator().run_agents(names, RunCheckpoint("r1", runs_dir))
+    assert [r.success for r in resumed] == [True, True]
+    # PM-QA comes from its checkpoint; PM-Context keeps its first call and
+    # makes only the two it hadn't
+    assert [c.iteration for c in resumed[0].calls] == [c.iteration for c in first[0].calls]
+    assert [c.iteration for c in resumed[1].calls] == [1, 2, 3]
+    assert mock_api.stats["requests"] - before == 2
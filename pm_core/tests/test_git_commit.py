@@ -0,0 +1,56 @@
+"""git_commit: staging and committing through the shared process runner."""
+
+import subprocess
+
+import pytest
+
+from pm_core import pm_tools
+from pm_core.pm_tools import ToolExecutor
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(pm_tools, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(pm_tools, "LOGS_DIR", tmp_path / "logs")
+    for cmd in (
+        ["git", "init", "-q"],
+        ["git", "config", "user.email", "pm@example.com"],
+        ["git", "config", "user.name", "PM Test"],
+    ):
+        subprocess.run(cmd, cwd=tmp_path, check=True)
+    (tmp_path / "a.txt").write_text("one\n")
+    return tmp_path
+
+
+def commit(**inputs):
+    return ToolExecutor("PM-Test").execute("git_commit", {"message": "test", **inputs})
+
+
+def test_commits_listed_files(repo):
+    result = commit(files=["a.txt"])
+    assert result["success"]
+    assert result["message"] == "[PM-Test] test"
+    log = subprocess.run(["git", "log", "--format=%s"], cwd=repo, capture_output=True, text=True)
+    assert log.stdout.strip() == "[PM-Test] test"
+
+
+def test_failed_add_returns_stderr(repo):
+    result = commit(files=["missing.txt"])
+    assert result["error"] == "git add failed (exit 128)"
+    assert "missing.txt" in result["stderr"]
+
+
+def test_nothing_to_commit(repo):
+    assert commit()["success"]
+    result = commit()
+    assert "nothing to commit" in result["error"]
+
+
+def test_hung_hook_times_out(repo, monkeypatch):
+    monkeypatch.setattr(pm_tools, "GIT_COMMIT_TIMEOUT", 1)
+    hook = repo / ".git" / "hooks" / "pre-commit"
+    hook.write_text("#!/bin/sh\necho checking >&2\nsleep 30\n")
+    hook.chmod(0o755)
+    result = commit()
+    assert result["error"].startswith("git commit timed out after 1s")
+    assert "checking" in result["stderr"]
@@ -0,0 +1,92 @@
+"""multi_edit: every edit is checked before any file is written."""
+
+import pytest
+
+from pm_core import pm_tools
+from pm_core.pm_tools import ToolExecutor
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(pm_tools, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(pm_tools, "LOGS_DIR", tmp_path / "logs")
+    (tmp_path / "a.py").write_text("x = 1\ny = 2\n")
+    (tmp_path / "b.py").write_text("def f():\n    return 1\n")
+    return tmp_path
+
+
+def multi_edit(edits):
+    executor = ToolExecutor("PM-Test")
+    return executor, executor.execute("multi_edit", {"edits": edits})
+
+
+def test_applies_edits_across_files(project):
+    executor, result = multi_edit([
+        {"path": "a.py", "old_string": "x = 1", "new_string": "x = 10"},
+        {"path": "b.py", "old_string": "return 1", "new_string": "return 2"},
+    ])
+    assert result["success"]
+    assert result["files_written"] == ["a.py", "b.py"]
+    assert executor.files_written == ["a.py", "b.py"]
+    assert (project / "a.py").read_text() == "x = 10\ny = 2\n"
+    assert (project / "b.py").read_text() == "def f():\n    return 2\n"
+
+
+def test_one_failure_changes_nothing(project):
+    _, result = multi_edit([
+        {"path": "a.py", "old_string": "x = 1", "new_string": "x = 10"},
+        {"path": "b.py", "old_string": "return 3", "new_string": "return 4"},
+    ])
+    assert result["error"] == "1 of 2 edits failed; no files were changed"
+    assert result["edits"][0]["error"] == "Not applied: other edits failed"
+    assert result["edits"][1]["error"].startswith("String not found: return 3")
+    assert (project / "a.py").read_text() == "x = 1\ny = 2\n"
+    assert (project / "b.py").read_text() == "def f():\n    return 1\n"
+
+
+def test_edits_to_one_file_apply_in_order(project):
+    _, result = multi_edit([
+        {"path": "a.py", "old_string": "x = 1", "new_string": "x = 10"},
+        {"path": "a.py", "old_string": "x = 10", "new_string": "x = 100"},
+    ])
+    assert result["success"]
+    assert result["files_written"] == ["a.py"]
+    assert (project / "a.py").read_text() == "x = 100\ny = 2\n"
+
+
+def test_not_found_after_earlier_edit_says_so(project):
+    _, result = multi_edit([
+        {"path": "a.py", "old_string": "x = 1", "new_string": "x = 10"},
+        {"path": "a.py", "old_string": "x = 1\n", "new_string": "x = 2\n"},
+    ])
+    assert result["edits"][1]["error"].startswith("String not found (after earlier edits to this file)")
+    assert (project / "a.py").read_text() == "x = 1\ny = 2\n"
+
+
+def test_ambiguous_match_needs_replace_all(project):
+    (project / "c.py").write_text("a = 0\na = 0\n")
+    _, result = multi_edit([{"path": "c.py", "old_string": "a = 0", "new_string": "a = 1"}])
+    assert "String found 2 times" in result["edits"][0]["error"]
+    assert (project / "c.py").read_text() == "a = 0\na = 0\n"
+    
+    _, result = multi_edit([
+        {"path": "c.py", "old_string": "a = 0", "new_string": "a = 1", "replace_all": True}
+    ])
+    assert result["edits"][0]["replaced"] == 2
+    assert (project / "c.py").read_text() == "a = 1\na = 1\n"
+
+
+def test_forbidden_path_blocks_the_whole_call(project):
+    (project / ".env").write_text("KEY=1\n")
+    _, result = multi_edit([
+        {"path": "a.py", "old_string": "x = 1", "new_string": "x = 10"},
+        {"path": ".env", "old_string": "KEY=1", "new_string": "KEY=2"},
+    ])
+    assert result["edits"][1]["error"] == "Access denied to path: .env"
+    assert (project / "a.py").read_text() == "x = 1\ny = 2\n"
+    assert (project / ".env").read_text() == "KEY=1\n"
+
+
+def test_no_leftover_temp_files(project):
+    multi_edit([{"path": "a.py", "old_string": "y = 2", "new_string": "y = 3"}])
+    assert sorted(p.name for p in project.iterdir() if p.is_file()) == ["a.py", "b.py"]
@@ -0,0 +1,65 @@
+"""ReadTracker: repeat reads become references or diffs."""
+
+from pm_core.pm_tools import ReadTracker
+
+
+KEY = ("/project/src/App.tsx", None, None)
+ORIGINAL = "".join(f"line {i}\n" for i in range(50))
+EDITED = ORIGINAL.replace("line 10\n", "line ten\n")
+
+
+def test_first_read_is_sent_in_full():
+    tracker = ReadTracker()
+    assert tracker.check(KEY, "src/App.tsx", ORIGINAL, "t1") is None
+
+
+def test_unchanged_read_refers_to_full_read():
+    tracker = ReadTracker()
+    tracker.check(KEY, "src/App.tsx", ORIGINAL, "t1")
+    result = tracker.check(KEY, "src/App.tsx", ORIGINAL, "t2")
+    assert result["unchanged_since"] == "t1"
+    assert "content" not in result
+    assert tracker.deduped == 1
+
+
+def test_changed_read_is_a_diff():
+    tracker = ReadTracker()
+    tracker.check(KEY, "src/App.tsx", ORIGINAL, "t1")
+    result = tracker.check(KEY, "src/App.tsx", EDITED, "t2")
+    assert result["changed_since"] == "t1"
+    assert "+line ten" in result["diff"]
+    assert tracker.diffed == 1
+
+
+def test_unchanged_after_diff_is_sent_in_full():
+    # read -> edit -> read (diff) -> read: t2 holds only a diff, so the
+    # model has no single result with the current text to refer to
+    tracker = ReadTracker()
+    tracker.check(KEY, "src/App.tsx", ORIGINAL, "t1")
+    assert "diff" in tracker.check(KEY, "src/App.tsx", EDITED, "t2")
+    assert tracker.check(KEY, "src/App.tsx", EDITED, "t3") is None
+    
+    # ...and t3 is the full read later references point at
+    assert tracker.check(KEY, "src/App.tsx", EDITED, "t4")["unchanged_since"] == "t3"
+
+
+def test_rewritten_file_is_sent_in_full():
+    tracker = ReadTracker()
+    tracker.check(KEY, "src/App.tsx", ORIGINAL, "t1")
+    rewritten = "".join(f"other {i}\n" for i in range(50))
+    assert tracker.check(KEY, "src/App.tsx", rewritten, "t2") is None
+    assert tracker.check(KEY, "src/App.tsx", rewritten, "t3")["unchanged_since"] == "t2"
+
+
+def test_forget_resends_compacted_files():
+    tracker = ReadTracker()
+    tracker.check(KEY, "src/App.tsx", ORIGINAL, "t1")
+    tracker.forget(["t1"])
+    assert tracker.check(KEY, "src/App.tsx", ORIGINAL, "t2") is None
+
+
+def test_line_ranges_are_tracked_separately():
+    tracker = ReadTracker()
+    tracker.check(KEY, "src/App.tsx", ORIGINAL, "t1")
+    ranged = (KEY[0], 1, 10)
+    assert tracker.check(ranged, "src/App.tsx", ORIGINAL, "t2") is None
@@ -0,0 +1,49 @@
+"""Record/replay: responses are keyed by the request the agent issued."""
+
+import pytest
+
+from pm_core import pm_agents, pm_prompts, pm_tools
+from pm_core.pm_config import AGENT, RATE_LIMIT
+from pm_core.pm_replay import ResponseCache
+from pm_core.pm_router import ModelRouter
+
+
+@pytest.fixture
+def mock_api(tmp_path, monkeypatch):
+    pytest.importorskip("anthropic")
+    from pm_core.pm_mock_server import MockAnthropicServer
+    
+    monkeypatch.setattr(pm_tools, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(pm_prompts, "_PROMPT_CACHE", pm_prompts.PromptArtifactCache(tmp_path / "prompts"))
+    monkeypatch.setattr(RATE_LIMIT, "state_file", tmp_path / "rate-limit.json")
+    with MockAnthropicServer(latency=0.01) as server:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "mock-key")
+        yield server
+
+
+def call(agent, cache, router, monkeypatch):
+    monkeypatch.setattr(pm_agents, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(pm_agents, "get_model_router", lambda: router)
+    errors = []
+    messages = [{"role": "user", "content": agent._build_user_prompt()}]
+    client = pm_agents.get_api_client("mock-key")
+    response = agent._call_api(client, agent._build_system_prompt(), messages, errors)
+    assert not errors
+    return response
+
+
+def test_fallback_response_replays_for_original_request(tmp_path, mock_api, monkeypatch):
+    agent = pm_agents.PMAgent("PM-QA")
+    
+    # Recorded while the fast model was throttled, so the strong model served it
+    throttled = ModelRouter(AGENT.model, AGENT.strong_model, throttle_fallback=True)
+    throttled.on_throttle(AGENT.model, 60)
+    call(agent, ResponseCache(tmp_path / "replay", mode="record"), throttled, monkeypatch)
+    assert agent.last_fallback_from == AGENT.model
+    
+    replay = ResponseCache(tmp_path / "replay", mode="replay")
+    response = call(agent, replay, ModelRouter(AGENT.model, AGENT.strong_model), monkeypatch)
+    assert agent.last_response_replayed
+    assert response.model == AGENT.strong_model
+    assert replay.hits == 1
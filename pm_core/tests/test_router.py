@@ -0,0 +1,33 @@
+"""ModelRouter: routing on/off and the opt-in throttle fallback."""
+
+from pm_core.pm_router import ModelRouter, RouteSignals
+
+
+def router(**options):
+    return ModelRouter("fast", "strong", threshold=3, **options)
+
+
+def test_routing_off_always_picks_fast_model():
+    model, reason = router(enabled=False).choose(RouteSignals(iteration=2, task_effort="XL", previous_errors=2))
+    assert (model, reason) == ("fast", "routing off")
+
+
+def test_hard_iteration_goes_to_strong_model():
+    model, _ = router().choose(RouteSignals(iteration=2, task_effort="L", previous_tools=["read_file"]))
+    assert model == "strong"
+
+
+def test_no_fallback_unless_enabled():
+    plain = router(enabled=False)
+    plain.on_throttle("fast", 30)
+    assert plain.is_throttled("fast")
+    assert plain.fallback_for("fast") is None
+    assert plain.choose(RouteSignals(iteration=1))[0] == "fast"
+
+
+def test_fallback_to_unthrottled_model():
+    fallback = router(throttle_fallback=True)
+    fallback.on_throttle("fast", 30)
+    assert fallback.fallback_for("fast") == "strong"
+    fallback.on_throttle("strong", 30)
+    assert fallback.fallback_for("fast") is None
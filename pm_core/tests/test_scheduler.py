@@ -0,0 +1,100 @@
+"""TokenBudgetScheduler: admission under the token budget and rate learning."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from pm_core.pm_scheduler import AgentEstimate, TokenBudgetScheduler
+
+
+@dataclass
+class FakeResult:
+    agent_name: str
+    duration_seconds: float
+    calls: List[object] = field(default_factory=list)
+
+
+class Tracker:
+    """Runs fake agents and records how many ran at once."""
+    
+    def __init__(self, seconds: float = 0.2, calls: int = 3):
+        self.seconds = seconds
+        self.calls = calls
+        self.running = 0
+        self.peak = 0
+        self.order: List[str] = []
+        self._lock = threading.Lock()
+    
+    def __call__(self, index: int, name: str) -> FakeResult:
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.order.append(name)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+        return FakeResult(name, self.seconds, [object()] * self.calls)
+
+
+def small(name: str) -> AgentEstimate:
+    return AgentEstimate(name, 2000, 3000)
+
+
+def test_small_agents_run_at_the_same_time():
+    # 3k tokens/call x 6 calls/min = 18k/min each; two fit in 45k
+    scheduler = TokenBudgetScheduler(45000, 3, 6.0, max_calls_per_minute=50)
+    tracker = Tracker()
+    results = scheduler.run([small("PM-A"), small("PM-B")], tracker)
+    
+    assert tracker.peak == 2
+    assert [r.agent_name for r in results] == ["PM-A", "PM-B"]
+
+
+def test_short_agents_keep_later_agents_parallel():
+    # Agents finishing in 0.2s must not be read as 900 calls/min
+    scheduler = TokenBudgetScheduler(45000, 2, 6.0, max_calls_per_minute=50)
+    tracker = Tracker()
+    scheduler.run([small(f"PM-{i}") for i in range(6)], tracker)
+    
+    assert scheduler.calls_per_minute == 3.0
+    assert scheduler.load(small("PM-X")) == 9000
+    assert tracker.peak == 2
+
+
+def test_agents_over_budget_run_one_at_a_time():
+    heavy = [AgentEstimate(f"PM-{i}", 20000, 30000) for i in range(3)]
+    scheduler = TokenBudgetScheduler(45000, 3, 1.0)
+    tracker = Tracker(seconds=0.05)
+    scheduler.run(heavy, tracker)
+    
+    assert tracker.peak == 1
+    assert tracker.order == ["PM-0", "PM-1", "PM-2"]
+
+
+def test_light_agent_skips_ahead_of_heavy_one():
+    estimates = [
+        AgentEstimate("PM-Heavy1", 20000, 30000),
+        AgentEstimate("PM-Heavy2", 20000, 30000),
+        AgentEstimate("PM-Light", 1000, 1000),
+    ]
+    scheduler = TokenBudgetScheduler(45000, 3, 1.0)
+    tracker = Tracker(seconds=0.1)
+    scheduler.run(estimates, tracker)
+    
+    # Both started before PM-Heavy2; which of the two got its thread first varies
+    assert set(tracker.order[:2]) == {"PM-Heavy1", "PM-Light"}
+    assert tracker.order[2] == "PM-Heavy2"
+
+
+def test_observed_rate_is_capped_by_the_limiter():
+    scheduler = TokenBudgetScheduler(45000, 3, 6.0, max_calls_per_minute=50)
+    scheduler.observe(api_calls=300, duration_seconds=120)
+    assert scheduler.calls_per_minute == 50
+
+
+def test_observed_rate_over_long_runs():
+    scheduler = TokenBudgetScheduler(None, 3, 6.0)
+    scheduler.observe(api_calls=10, duration_seconds=120)
+    scheduler.observe(api_calls=4, duration_seconds=30)
+    assert scheduler.calls_per_minute == (5.0 + 4.0) / 2
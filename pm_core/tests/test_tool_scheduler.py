@@ -0,0 +1,57 @@
+"""ToolScheduler: read-only calls overlap, everything else runs alone."""
+
+import threading
+import time
+
+from pm_core.pm_tools import ToolScheduler
+
+
+class FakeExecutor:
+    """Records which tool calls were running at the same time."""
+    
+    agent_name = "PM-Test"
+    
+    def __init__(self):
+        self.running = set()
+        self.overlaps = {}
+        self._lock = threading.Lock()
+    
+    def execute(self, tool_name, tool_input, tool_use_id=None):
+        name = tool_input["id"]
+        with self._lock:
+            self.overlaps[name] = set(self.running)
+            for other in self.running:
+                self.overlaps[other].add(name)
+            self.running.add(name)
+        time.sleep(0.05)
+        with self._lock:
+            self.running.discard(name)
+        return {"success": True}
+
+
+def run(calls):
+    executor = FakeExecutor()
+    scheduler = ToolScheduler(executor, max_workers=4)
+    futures = [scheduler.submit(tool, {"id": name}) for name, tool in calls]
+    for future in futures:
+        future.result()
+    scheduler.shutdown()
+    return executor.overlaps
+
+
+def test_reads_run_together():
+    overlaps = run([("r1", "read_file"), ("r2", "search_codebase"), ("r3", "git_diff")])
+    assert overlaps["r1"] == {"r2", "r3"}
+
+
+def test_tests_and_lint_run_alone():
+    overlaps = run([
+        ("r1", "read_file"),
+        ("tests", "run_tests"),
+        ("lint", "run_lint"),
+        ("r2", "read_file"),
+        ("r3", "list_directory"),
+    ])
+    assert overlaps["tests"] == set()
+    assert overlaps["lint"] == set()
+    assert overlaps["r2"] == {"r3"}